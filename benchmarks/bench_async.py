@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark pages per second of the serial audit() against the asyncio engine,
+using a local HTTP server that answers with a fixed latency. The Google API
+checks (indexation and Core Web Vitals) are turned off.
+
+Usage:
+    python benchmarks/bench_async.py [--urls 100] [--latency 0.05] [--concurrency 1 8 32]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from bench_parse import make_page
+from common import FixtureServer, load_checklist, offline_checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=100, help='URLs to audit.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency in seconds.')
+    parser.add_argument('--products', type=int, default=50, help='Products on each page.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--per-host', type=int, default=16)
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    offline_checks(seo)
+
+    page = make_page(args.products)
+    pages = {f'/page/{i}': page for i in range(args.urls)}
+
+    with FixtureServer(pages, latency=args.latency) as server:
+        urls = [f'{server.base_url}/page/{i}' for i in range(args.urls)]
+        print(f'{args.urls} URLs, {len(page) / 1024:.0f} KiB per page, {args.latency * 1000:.0f} ms latency')
+
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if concurrency == 1:
+                    seo.audit(urls, output=None)
+                else:
+                    seo.audit_async(urls, output=None, concurrency=concurrency, per_host=args.per_host)
+            elapsed = time.perf_counter() - start
+
+            name = 'serial audit()' if concurrency == 1 else f'audit_async(concurrency={concurrency})'
+            print(f'{name:<36} {elapsed:7.2f} s  {args.urls / elapsed:7.1f} pages/s')
+
+
+if __name__ == '__main__':
+    main()
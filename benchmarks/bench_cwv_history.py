@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the Core Web Vitals history: save --days days of synthetic PSI
+results for --urls URLs spread over a few templates to a CWVHistory, then
+time a month long query, the percentile report and the regression report.
+One template gets slower in the last week, the regression report must find
+it (and nothing else).
+
+It also times classify_cwv() against cwv_threshold() called once per value,
+and checks they agree.
+
+Usage:
+    python benchmarks/bench_cwv_history.py [--urls 5000] [--days 90] [--history cwv.sqlite]
+"""
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from common import load_checklist
+
+TEMPLATES = ['blog', 'shop', 'news', 'docs', 'help']
+
+# The template that regresses in the last week
+SLOW = 'shop'
+
+
+def metrics(rng, slower=1.0):
+    '''
+    Return synthetic PSI results, as PSIClient.fetch() returns them.
+    '''
+    values = {
+        'largest-contentful-paint': rng.lognormvariate(7.6, 0.4) * slower,
+        'cumulative-layout-shift': rng.expovariate(15),
+        'speed-index': rng.lognormvariate(8.0, 0.3),
+        'first-contentful-paint': rng.lognormvariate(7.2, 0.3),
+        'total-blocking-time': rng.expovariate(1 / 250) * slower,
+    }
+    return {audit: {'displayValue': f'{value:.2f}', 'numericValue': value} for audit, value in values.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--history', metavar='FILE', help='Keep the history in this file (default: a temporary one).')
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    rng = random.Random(0)
+    urls = [f'https://example.com/{TEMPLATES[i % len(TEMPLATES)]}/{i}/page' for i in range(args.urls)]
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.history or os.path.join(tmp, 'cwv.sqlite')
+        start = time.perf_counter()
+        for day in range(args.days):
+            history = seo.CWVHistory(path, day=day)
+            slower = 1.5 if day >= args.days - 7 else 1.0
+            for url in urls:
+                history.add(url, 'mobile', metrics(rng, slower if f'/{SLOW}/' in url else 1.0))
+            history.close()
+        rows = args.urls * args.days
+        elapsed = time.perf_counter() - start
+        print(f'insert         {rows / elapsed:10.0f} rows/s    ({rows} rows, '
+              f'{os.path.getsize(path) / 2 ** 20:.0f} MiB on disk)')
+
+        history = seo.CWVHistory(path)
+        end = history.last_day()
+        # Don't time the pandas import
+        history.load(end, end)
+        start = time.perf_counter()
+        month = history.load(end - 29, end)
+        print(f'load 30 days   {(time.perf_counter() - start) * 1000:10.0f} ms      ({len(month)} rows)')
+
+        start = time.perf_counter()
+        report = seo.cwv_percentiles(month)
+        print(f'percentiles    {(time.perf_counter() - start) * 1000:10.0f} ms      ({len(report)} templates)')
+
+        start = time.perf_counter()
+        regressions = seo.cwv_regressions(history, days=7)
+        print(f'regressions    {(time.perf_counter() - start) * 1000:10.0f} ms')
+        found = sorted(set(regressions.loc[regressions['regression'] != 'ok ✅', 'template']))
+        if found != [f'example.com/{SLOW}/']:
+            print(f'FAILED regressions found in {found}, expected example.com/{SLOW}/ only')
+            failed = True
+        history.close()
+
+        values = month['lcp'].to_numpy()
+        start = time.perf_counter()
+        scalar = [seo.cwv_threshold(value, 2500, 4000) for value in values]
+        scalar_s = time.perf_counter() - start
+        start = time.perf_counter()
+        vector = seo.classify_cwv(values, 2500, 4000)
+        vector_s = time.perf_counter() - start
+        print(f'classify       {len(values) / scalar_s:10.0f} values/s one by one, '
+              f'{len(values) / vector_s:.0f} values/s vectorized')
+        if list(vector) != scalar:
+            print('FAILED classify_cwv() and cwv_threshold() disagree')
+            failed = True
+
+    # ru_maxrss is in KiB on Linux
+    print(f'peak RSS       {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:10.0f} MiB')
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark head-only streaming fetches against full downloads on multi-MB pages,
+served by a local server with limited bandwidth. Reports the body bytes sent
+by the server and the time per page for:
+
+- the head checks only (meta viewport, meta robots, canonical, X-Robots-Tag),
+  which stop reading after the </head>,
+- all page checks, which need the whole body for microdata and RDFa,
+- the bot accessibility probes, which only need the status code.
+
+Usage:
+    python benchmarks/bench_head.py [--products 20000] [--urls 5] [--bandwidth 50]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from bench_parse import make_page
+from common import FixtureServer, load_checklist, offline_checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=20000, help='Products on each page.')
+    parser.add_argument('--urls', type=int, default=5, help='Pages to fetch per run.')
+    parser.add_argument('--bandwidth', type=float, default=50, help='Server bandwidth in MiB/s.')
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    offline_checks(seo)
+
+    page = make_page(args.products)
+    pages = {f'/page/{i}': page for i in range(args.urls)}
+    print(f'{args.urls} pages of {len(page) / 1024 / 1024:.1f} MiB, {args.bandwidth:g} MiB/s')
+
+    head_checks = [check.name for check in seo.CHECKS if check.argument == 'page' and check.inputs != seo.DOM]
+    runs = [
+        ('head checks, full download', head_checks, False),
+        ('head checks, head only', head_checks, True),
+        ('all page checks', [check.name for check in seo.CHECKS if check.argument == 'page'], None),
+        ('response header check', ['check_x_robots_tag_noindex'], None),
+        ('bot accessibility', ['bot_accessibility'], None),
+    ]
+
+    for label, checks, head_only in runs:
+        with FixtureServer(pages, bandwidth=args.bandwidth * 1024 * 1024) as server:
+            urls = [f'{server.base_url}/page/{i}' for i in range(args.urls)]
+            # Force the old full download by pretending a body check runs
+            page_mode = seo.page_mode
+            if head_only is False:
+                seo.page_mode = lambda checks=None: False
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                seo.audit(urls, output=None, collect=False, checks=checks)
+            elapsed = time.perf_counter() - start
+            seo.page_mode = page_mode
+
+            print(f'{label:<28} {server.bytes_sent / args.urls / 1024:9.0f} KiB/page '
+                  f'{elapsed / args.urls * 1000:8.0f} ms/page  ({server.requests} requests)')
+
+
+if __name__ == '__main__':
+    main()
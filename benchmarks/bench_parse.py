@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the parse-once ParsedDocument against the old path, where the four
+HTML checks each built their own BeautifulSoup tree with html.parser.
+
+Usage:
+    python benchmarks/bench_parse.py [--products 2000] [--repeat 5] [page.html ...]
+"""
+
+import argparse
+import json
+
+from bs4 import BeautifulSoup
+
+from common import load_checklist, timeit
+
+
+def make_page(products):
+    '''
+    Build a large e-commerce style page with a product grid and JSON-LD.
+    '''
+    head = ('<head><meta charset="utf-8"><title>Shop</title>'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">'
+            '<meta name="robots" content="index, follow">'
+            '<link rel="canonical" href="https://example.com/shop/">'
+            '<script type="application/ld+json">'
+            + json.dumps({'@context': 'https://schema.org', '@type': 'ItemList',
+                          'itemListElement': [{'@type': 'ListItem', 'position': i} for i in range(products)]})
+            + '</script></head>')
+    items = ''.join(
+        f'<div class="product" itemscope itemtype="https://schema.org/Product">'
+        f'<a href="/p/{i}"><img src="/img/{i}.jpg" alt="Product {i}"></a>'
+        f'<span itemprop="name">Product {i}</span>'
+        f'<div itemprop="offers" itemscope itemtype="https://schema.org/Offer">'
+        f'<span itemprop="price">{i}.99</span></div></div>'
+        for i in range(products))
+    return f'<!DOCTYPE html><html>{head}<body><main>{items}</main></body></html>'.encode('utf-8')
+
+
+def legacy_checks(content):
+    '''
+    The pre parse-once path: one html.parser tree per HTML check.
+    '''
+    soup = BeautifulSoup(content, 'html.parser')
+    soup.find('meta', attrs={'name': 'viewport'})
+
+    soup = BeautifulSoup(content, 'html.parser')
+    soup.find('meta', attrs={'name': 'robots'})
+
+    soup = BeautifulSoup(content, 'html.parser')
+    soup.find('link', {'rel': 'canonical'})
+
+    soup = BeautifulSoup(content, 'html.parser')
+    for script_tag in soup.find_all('script', type='application/ld+json'):
+        json.loads(script_tag.string)
+    soup.find_all(attrs={"itemtype": True})
+    soup.find_all(attrs={"typeof": True})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to benchmark instead of the generated one.')
+    parser.add_argument('--products', type=int, default=2000, help='Products on the generated page.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    seo = load_checklist()
+
+    if args.pages:
+        corpus = [open(path, 'rb').read() for path in args.pages]
+    else:
+        corpus = [make_page(args.products)]
+    size = sum(len(content) for content in corpus)
+    print(f'Corpus: {len(corpus)} page(s), {size / 1024:.0f} KiB')
+
+    backends = ['html.parser']
+    if seo.LXML_AVAILABLE:
+        backends.append('lxml')
+    if seo.SELECTOLAX_AVAILABLE:
+        backends.append('selectolax')
+
+    baseline = timeit(lambda: [legacy_checks(content) for content in corpus], args.repeat)
+    print(f'{"4x BeautifulSoup html.parser (old)":<40} {baseline * 1000:9.1f} ms')
+    for backend in backends:
+        elapsed = timeit(lambda: [seo.ParsedDocument(content, backend) for content in corpus], args.repeat)
+        print(f'{"ParsedDocument " + backend:<40} {elapsed * 1000:9.1f} ms  {baseline / elapsed:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark parsing pages in a process pool, from 1 to N processes, on a saved
+page corpus. First parsing alone, then a full audit_async() run against a
+local server with parsing in the check threads (0) or in parse_workers
+processes. The Google API checks are turned off.
+
+Usage:
+    python benchmarks/bench_parse_pool.py [--corpus DIR] [--pages 200] [--products 500]
+                                          [--workers 0 1 2 4] [--backend html.parser]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench_parse import make_page
+from common import FixtureServer, load_checklist, offline_checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Folder of saved .html pages. Generated pages are used if not given.')
+    parser.add_argument('--pages', type=int, default=200, help='Pages to generate when there is no corpus.')
+    parser.add_argument('--products', type=int, default=500, help='Products on each generated page.')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({0, 1, 2, 4, os.cpu_count() or 1}),
+                        help='Parse processes to try, 0 parses in threads.')
+    parser.add_argument('--backend', default='html.parser', help='Parser backend (default: html.parser).')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    offline_checks(seo)
+    seo.PARSER_BACKEND = args.backend
+
+    if args.corpus:
+        corpus = [open(path, 'rb').read() for path in sorted(glob.glob(os.path.join(args.corpus, '*.html')))]
+    else:
+        corpus = [make_page(args.products)] * args.pages
+    size = sum(len(content) for content in corpus)
+    print(f'Corpus: {len(corpus)} pages, {size / 1024 / 1024:.1f} MiB, {args.backend}, {os.cpu_count()} cores')
+
+    print('Parsing only:')
+    for workers in args.workers:
+        start = time.perf_counter()
+        if workers == 0:
+            for content in corpus:
+                seo.parse_document(content, args.backend)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(seo.parse_document, corpus, [args.backend] * len(corpus), chunksize=4))
+        elapsed = time.perf_counter() - start
+        print(f'  {workers:>2} processes: {len(corpus) / elapsed:7.1f} pages/s')
+
+    print(f'audit_async, concurrency {args.concurrency}, only page checks:')
+    pages = {f'/page/{i}': content for i, content in enumerate(corpus)}
+    checks = [check.name for check in seo.CHECKS if check.argument == 'page']
+    with FixtureServer(pages) as server:
+        urls = [f'{server.base_url}/page/{i}' for i in range(len(corpus))]
+        for workers in args.workers:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                seo.audit_async(urls, output=None, collect=False, checks=checks,
+                                concurrency=args.concurrency, per_host=args.concurrency,
+                                parse_workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f'  {workers:>2} processes: {len(urls) / elapsed:7.1f} pages/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the PageSpeed Insights client against a local stub PSI server that
+answers with a fixed latency and a per second quota: a cold run with
+fetch_many() at several worker counts, then a warm run served from the cache.
+
+Usage:
+    python benchmarks/bench_psi.py [--urls 40] [--latency 0.5] [--quota 10] [--workers 1 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import PSI_PATH, FixtureServer, StubPSI, load_checklist
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=40, help='URLs to analyze.')
+    parser.add_argument('--latency', type=float, default=0.5, help='Stub PSI latency in seconds.')
+    parser.add_argument('--quota', type=int, default=10, help='Stub PSI calls allowed per second.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--strategies', nargs='+', default=['mobile', 'desktop'])
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    urls = [f'https://example.com/page/{i}' for i in range(args.urls)]
+    calls = args.urls * len(args.strategies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            stub = StubPSI(quota=args.quota)
+            with FixtureServer({PSI_PATH: stub}, latency=args.latency) as server:
+                cache = seo.PSICache(os.path.join(tmp, f'psi-{workers}.sqlite'))
+                client = seo.PSIClient(endpoint=server.base_url + PSI_PATH, cache=cache,
+                                       rate=args.quota, max_workers=workers, backoff=0.5)
+
+                start = time.perf_counter()
+                results = client.fetch_many(urls, args.strategies)
+                cold = time.perf_counter() - start
+                errors = sum(isinstance(r, seo.PSIError) for r in results.values())
+
+                start = time.perf_counter()
+                client.fetch_many(urls, args.strategies)
+                warm = time.perf_counter() - start
+
+                print(f'{workers:>3} workers: cold {calls / cold:7.1f} calls/s ({cold:.2f}s, '
+                      f'{stub.throttled} throttled, {errors} errors), '
+                      f'warm {calls / warm:9.1f} calls/s, {server.requests} PSI requests')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Memory and throughput of collecting check results: the old way (a DataFrame
+per check, pd.concat for every column and then for every URL) against
+AuditRecord + ResultBuffer.
+
+The old path is slow, so it runs on --legacy-urls URLs and is extrapolated to
+--urls.
+
+Usage:
+    python benchmarks/bench_results.py [--urls 100000] [--legacy-urls 1000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from common import load_checklist
+
+
+def make_columns(seo):
+    '''
+    The report columns of a full audit, each with a typical result string.
+    '''
+    columns = ['Mobile Friendly'] + list(seo.BOT_USER_AGENTS) + [
+        'Indexation', 'No index Meta Tag', 'No index Response Header', 'Canonical', 'Schema.org',
+        'Largest Contentful Paint', 'LCP Result', 'Cumulative Layout Shift', 'CLS Results',
+        'Speed Index', 'SI Result', 'First Contentful Paint', 'FCP Result', 'Total Blocking Time', 'TBT Result']
+    return columns
+
+
+def legacy(urls, columns):
+    rows = []
+    for url in urls:
+        df = pd.DataFrame(columns=[])
+        df = pd.concat([df, pd.DataFrame({'URL': [url]})], ignore_index=True)
+        for column in columns:
+            df = pd.concat([df, pd.DataFrame({column: [f'{column} result for {url} ✅']})], axis=1)
+        rows.append(df)
+    return pd.concat(rows, ignore_index=True)
+
+
+def buffered(seo, urls, columns):
+    buffer = seo.ResultBuffer()
+    for url in urls:
+        record = seo.AuditRecord(url)
+        for column in columns:
+            record.set(column, f'{column} result for {url} ✅')
+        buffer.append(record)
+    return buffer.to_dataframe()
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=100000)
+    parser.add_argument('--legacy-urls', type=int, default=1000)
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    columns = make_columns(seo)
+
+    urls = [f'https://example.com/page/{i}' for i in range(args.legacy_urls)]
+    _, elapsed, peak = measure(lambda: legacy(urls, columns))
+    scale = args.urls / args.legacy_urls
+    print(f'{"pd.concat per check (old)":<30} {args.legacy_urls:>7} URLs {elapsed:8.2f} s '
+          f'{args.legacy_urls / elapsed:9.0f} URLs/s  peak {peak / 2**20:7.1f} MiB  '
+          f'(~{elapsed * scale:.0f} s for {args.urls} URLs)')
+
+    urls = [f'https://example.com/page/{i}' for i in range(args.urls)]
+    df, elapsed, peak = measure(lambda: buffered(seo, urls, columns))
+    print(f'{"ResultBuffer":<30} {args.urls:>7} URLs {elapsed:8.2f} s '
+          f'{args.urls / elapsed:9.0f} URLs/s  peak {peak / 2**20:7.1f} MiB')
+    assert df.shape == (args.urls, len(columns) + 1)
+
+
+if __name__ == '__main__':
+    main()
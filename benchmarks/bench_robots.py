@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark robots.txt lookups on a generated robots.txt with thousands of
+rules, for every URL x bot pair, against the standard library's
+urllib.robotparser (which scans every rule and doesn't support wildcards).
+
+Usage:
+    python benchmarks/bench_robots.py [--rules 5000] [--urls 20000]
+"""
+
+import argparse
+import random
+import time
+import urllib.robotparser
+
+from common import load_checklist
+
+
+def make_robots(rules, seed=0):
+    '''
+    Build a robots.txt with a '*' group and a Googlebot group, mixing plain
+    prefixes with '*' and '$' patterns.
+    '''
+    rng = random.Random(seed)
+    lines = []
+    for agent in ('*', 'Googlebot'):
+        lines.append(f'User-agent: {agent}')
+        for i in range(rules // 2):
+            section = f'/section-{rng.randrange(500)}/item-{i}'
+            kind = rng.random()
+            if kind < 0.7:
+                lines.append(f'Disallow: {section}')
+            elif kind < 0.85:
+                lines.append(f'Allow: {section}/public')
+            else:
+                lines.append(f'Disallow: {section}/*.pdf$')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def make_urls(count, seed=1):
+    rng = random.Random(seed)
+    return [f'https://example.com/section-{rng.randrange(500)}/item-{rng.randrange(5000)}/page-{i}'
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rules', type=int, default=5000, help='Rules in the robots.txt.')
+    parser.add_argument('--urls', type=int, default=20000, help='URLs to look up.')
+    parser.add_argument('--stdlib-urls', type=int, default=500,
+                        help='URLs to look up with urllib.robotparser, it is much slower.')
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    text = make_robots(args.rules)
+    urls = make_urls(args.urls)
+    agents = [f'{name} {user_agent}' for name, user_agent in seo.BOT_USER_AGENTS.items()]
+
+    start = time.perf_counter()
+    rules = seo.RobotsRules(text)
+    print(f'{args.rules} rules parsed in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    start = time.perf_counter()
+    blocked = sum(not rules.can_fetch(agent, url) for url in urls for agent in agents)
+    elapsed = time.perf_counter() - start
+    lookups = len(urls) * len(agents)
+    print(f'RobotsRules:      {lookups / elapsed:10,.0f} lookups/s ({lookups} lookups, {blocked} blocked)')
+
+    parser = urllib.robotparser.RobotFileParser()
+    parser.parse(text.splitlines())
+    sample = urls[:args.stdlib_urls]
+    start = time.perf_counter()
+    for url in sample:
+        for agent in agents:
+            parser.can_fetch(agent, url)
+    elapsed = time.perf_counter() - start
+    print(f'urllib.robotparser: {len(sample) * len(agents) / elapsed:8,.0f} lookups/s')
+
+
+if __name__ == '__main__':
+    main()
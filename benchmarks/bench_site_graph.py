@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the site graph at crawl scale: add --urls synthetic pages (random
+content hashes, with a share of near duplicates, canonical chains, loops and
+canonicals to 404 pages) to a SiteGraph, then run the site analysis. Reports
+pages/sec for both steps and the peak RSS, and checks the planted problems
+are all found.
+
+Usage:
+    python benchmarks/bench_site_graph.py [--urls 200000] [--graph graph.sqlite]
+"""
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from common import load_checklist
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=200000)
+    parser.add_argument('--graph', metavar='FILE', help='Keep the graph in this file (default: a temporary one).')
+    args = parser.parse_args()
+
+    seo = load_checklist()
+    rng = random.Random(0)
+    # One in 100 pages is planted: a near duplicate of the page before it, a
+    # chain, a loop or a canonical to a 404
+    plants = {'duplicates': 0, 'chains': 0, 'loops': 0, 'broken': 0}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = seo.SiteGraph(args.graph or os.path.join(tmp, 'graph.sqlite'))
+        start = time.perf_counter()
+        simhash = 0
+        for i in range(args.urls):
+            url = f'https://example.com/page/{i}'
+            kind = i % 100
+            if kind == 1:
+                # Flip two bits of the previous page's hash
+                simhash ^= (1 << rng.randrange(64)) | (1 << rng.randrange(64))
+                graph.add(url, 200, canonical=url, simhash=simhash)
+                plants['duplicates'] += 1
+            elif kind == 2:
+                graph.add(url, 200, canonical=f'https://example.com/page/{i + 1}', simhash=rng.getrandbits(64))
+                graph.add(f'https://example.com/page/{i + 1}/', 200, canonical=f'https://example.com/page/{i + 2}',
+                          simhash=rng.getrandbits(64))
+                plants['chains'] += 1
+            elif kind == 5:
+                graph.add(url, 200, canonical=f'https://example.com/page/{i + 1}', simhash=rng.getrandbits(64))
+                graph.add(f'http://example.com/page/{i + 1}', 200, canonical=url, simhash=rng.getrandbits(64))
+                plants['loops'] += 1
+            elif kind == 7:
+                graph.add(url, 200, canonical=f'https://example.com/gone/{i}', simhash=rng.getrandbits(64))
+                graph.add(f'https://example.com/gone/{i}', 404)
+                plants['broken'] += 1
+            elif kind not in (3, 6):
+                simhash = rng.getrandbits(64)
+                graph.add(url, 200, canonical=url, simhash=simhash)
+        added = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = {'duplicates': 0, 'chains': 0, 'loops': 0, 'broken': 0}
+        for issue in seo.analyze_site_graph(graph):
+            kind = issue['Issue']
+            if kind.startswith('Near duplicate'):
+                found['duplicates'] += 1
+            elif kind.startswith('Canonical chain'):
+                found['chains'] += 1
+            elif kind.startswith('Canonical loop'):
+                found['loops'] += 1
+            elif kind.startswith('Canonical to non-200'):
+                found['broken'] += 1
+        analyzed = time.perf_counter() - start
+        graph.close()
+
+    print(f'{args.urls} URLs: add {args.urls / added:8.0f} pages/s, analyze {args.urls / analyzed:8.0f} pages/s, '
+          f'{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB peak RSS')
+    # Every duplicate pair is two rows and every loop is found from both ends.
+    # Random hashes can add a few more duplicates by chance.
+    expected = dict(plants, duplicates=plants['duplicates'] * 2, loops=plants['loops'] * 2)
+    for kind, count in expected.items():
+        mark = '✅' if found[kind] >= count else '❌'
+        print(f'    {kind:<10} planted {count:>6}, found {found[kind]:>6} {mark}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark how long the checklist takes to start: the import time of the
+script itself (from python -X importtime, minus what the interpreter imports
+anyway) and the wall time of `seo-checklist.py --help`.
+
+It also makes sure the heavy libraries (pandas, BeautifulSoup, halo,
+termcolor) are not imported until they are used. It exits with status 1
+if one of them is, or if the import time is over --budget-ms.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 250] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'seo-checklist.py')
+
+LOAD = ('import importlib.util, sys\n'
+        'spec = importlib.util.spec_from_file_location("seo_checklist", sys.argv[1])\n'
+        'module = importlib.util.module_from_spec(spec)\n'
+        'spec.loader.exec_module(module)\n'
+        'print(" ".join(sorted(sys.modules)))\n')
+
+# Only imported when a check, a report or the spinner needs them
+LAZY = ['pandas', 'bs4', 'halo', 'termcolor']
+
+
+def importtime(code, *args):
+    '''
+    Run code under -X importtime and return ({top level module: cumulative us}, stdout).
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code, *args],
+                            check=True, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented, their time is already in their parent's
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative)
+    return modules, result.stdout
+
+
+def measure(repeat):
+    '''
+    Return the startup measurements, the median of repeat runs.
+    '''
+    baseline, _ = importtime('pass')
+    import_ms = []
+    for _ in range(repeat):
+        modules, loaded = importtime(LOAD, SCRIPT)
+        import_ms.append(sum(us for name, us in modules.items() if name not in baseline) / 1000)
+    slowest = sorted(((us / 1000, name) for name, us in modules.items() if name not in baseline), reverse=True)
+
+    help_ms = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, '--help'], check=True, capture_output=True)
+        help_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'import_ms': statistics.median(import_ms),
+        'help_ms': statistics.median(help_ms),
+        'slowest_imports': slowest[:5],
+        'eager': [name for name in LAZY if name in loaded.split()],
+    }
+
+
+def check(startup, budget_ms):
+    '''
+    Return the problems with the startup measurements, as strings.
+    '''
+    problems = [f'{name} is imported at startup' for name in startup['eager']]
+    if budget_ms and startup['import_ms'] > budget_ms:
+        problems.append(f"import takes {startup['import_ms']:.0f} ms, the budget is {budget_ms:.0f} ms")
+    return problems
+
+
+def report(startup):
+    print(f"import          {startup['import_ms']:7.1f} ms")
+    print(f"--help          {startup['help_ms']:7.1f} ms")
+    for ms, name in startup['slowest_imports']:
+        print(f'    {name:<24} {ms:7.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=250, help='Import time budget (0 for none).')
+    parser.add_argument('--json', metavar='FILE', help='Save the results here.')
+    args = parser.parse_args()
+
+    startup = measure(args.repeat)
+    report(startup)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(startup, f, indent=2)
+
+    problems = check(startup, args.budget_ms)
+    for problem in problems:
+        print(f'FAILED {problem}')
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark coordinator/worker audits (--queue) with 1..N local worker
+processes against several local hosts, and check the per host politeness
+limits hold across workers for every request a host sees: the page GET, the
+bot probes and robots.txt. No more than --per-host requests in flight to one
+host at once and, with --per-host 1, at least --crawl-delay seconds between
+two of them.
+
+The default check set runs, with PageSpeed Insights stubbed on a server of
+its own and indexation read from a list, so nothing leaves the machine.
+
+Usage:
+    python benchmarks/bench_workers.py [--hosts 4] [--urls 100] [--workers 1 2 4]
+                                       [--per-host 1] [--crawl-delay 0.05] [--latency 0.05]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import PSI_PATH, ROOT, FixtureServer, StubPSI
+from corpus import URL, build_corpus
+
+
+class HostLog:
+    '''
+    Records when every request to a host started and how many were in
+    flight at once.
+    '''
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.starts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def serve(self, body):
+        '''
+        Return a FixtureServer page that answers with body and logs every request.
+        '''
+        def page(query):
+            with self.lock:
+                self.starts.append(time.monotonic())
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(self.latency)
+            with self.lock:
+                self.active -= 1
+            return 200, body
+        return page
+
+    def min_gap(self):
+        starts = sorted(self.starts)
+        return min((b - a for a, b in zip(starts, starts[1:])), default=float('inf'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=4)
+    parser.add_argument('--urls', type=int, default=100, help='URLs in total, spread over the hosts.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--per-host', type=int, default=1)
+    parser.add_argument('--crawl-delay', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.05, help='Server time per page in seconds.')
+    args = parser.parse_args()
+
+    body, _, _ = build_corpus()['small']
+    failed = False
+    for workers in args.workers:
+        logs = [HostLog(args.latency) for _ in range(args.hosts)]
+        servers = [FixtureServer({'/page': log.serve(body.replace(URL, b'/')),
+                                  '/robots.txt': log.serve(b'User-agent: *\nDisallow: /private/\n')})
+                   for log in logs]
+        servers.append(FixtureServer({PSI_PATH: StubPSI()}))
+        for server in servers:
+            server.__enter__()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                urls = os.path.join(tmp, 'urls.txt')
+                with open(urls, 'w', encoding='utf-8') as f:
+                    for i in range(args.urls):
+                        f.write(f'{servers[i % args.hosts].base_url}/page?{i}\n')
+                output = os.path.join(tmp, 'report.jsonl')
+                command = [sys.executable, os.path.join(ROOT, 'seo-checklist.py'), '--urls', urls,
+                           '--queue', os.path.join(tmp, 'queue.sqlite'), '--workers', str(workers),
+                           '--per-host', str(args.per_host), '--crawl-delay', str(args.crawl_delay),
+                           '--psi-endpoint', servers[-1].base_url + PSI_PATH, '--psi-rate', '1000',
+                           '--indexation', 'list', '--indexation-file', urls,
+                           '--output', output, '--quiet']
+                start = time.perf_counter()
+                subprocess.run(command, check=True, capture_output=True)
+                elapsed = time.perf_counter() - start
+                with open(output, encoding='utf-8') as f:
+                    rows = [json.loads(line) for line in f]
+        finally:
+            for server in servers:
+                server.__exit__(None, None, None)
+
+        requests = sum(len(log.starts) for log in logs)
+        max_active = max(log.max_active for log in logs)
+        min_gap = min(log.min_gap() for log in logs)
+        print(f'{workers} workers: {args.urls / elapsed:6.1f} pages/s, {len(rows)} rows, {requests} requests, '
+              f'max {max_active} in flight per host, min gap {min_gap * 1000:.0f} ms')
+
+        # The gap is measured at the server, allow a little scheduling jitter
+        # Every URL is at least the page and one probe per bot
+        if (len(rows) != args.urls or requests < args.urls * 2 or max_active > args.per_host
+                or (args.per_host == 1 and min_gap < args.crawl_delay * 0.9)):
+            print('    FAILED: politeness limits not kept or URLs missing')
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
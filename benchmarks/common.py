@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_checklist():
+    '''
+    Import seo-checklist.py as a module. The file name has a dash, so it can't
+    be imported with a normal import statement.
+
+    Returns
+    -------
+    module: The loaded seo-checklist module.
+
+    '''
+    if 'seo_checklist' in sys.modules:
+        return sys.modules['seo_checklist']
+
+    spec = importlib.util.spec_from_file_location('seo_checklist', os.path.join(ROOT, 'seo-checklist.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['seo_checklist'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timeit(func, repeat=5):
+    '''
+    Run func repeat times and return the best wall time in seconds.
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class FixtureServer:
+    '''
+    A local threaded HTTP server for benchmarks. Runs in a background thread.
+
+    Parameters
+    ----------
+    pages (dict): Maps a path such as '/index.html' to the bytes served for it,
+        or to a function taking the query string and returning (status, body)
+        or (status, body, headers).
+    latency (float): Seconds to sleep before answering, to mimic a real network.
+    bandwidth (float, optional): Bytes per second to send bodies at. Unlimited if None.
+
+    Attributes
+    ----------
+    requests (int): Requests answered.
+    bytes_sent (int): Body bytes actually sent, less than the body if the client hung up early.
+
+    '''
+
+    def __init__(self, pages, latency=0.0, bandwidth=None):
+        self.pages = pages
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.bytes_sent = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Send headers and body in one segment, otherwise delayed ACKs add
+            # ~40 ms to every request on a kept-alive connection
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_HEAD(self):
+                self.do_GET(head=True)
+
+            def do_GET(self, head=False):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                path, _, query = self.path.partition('?')
+                body = server.pages.get(path)
+                status, headers = 200, {}
+                if body is None:
+                    status, body = 404, b'Not found'
+                elif callable(body):
+                    status, body, *extra = body(query)
+                    headers = extra[0] if extra else {}
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if head:
+                    return
+                if not server.bandwidth:
+                    self.wfile.write(body)
+                    server.bytes_sent += len(body)
+                    return
+
+                chunk_size = 16 * 1024
+                try:
+                    for start in range(0, len(body), chunk_size):
+                        chunk = body[start:start + chunk_size]
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                        server.bytes_sent += len(chunk)
+                        time.sleep(len(chunk) / server.bandwidth)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading, e.g. after the </head>
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def offline_checks(seo):
+    '''
+    Replace the checks that call Google APIs with no-ops, so benchmarks only
+    measure the local fetching and parsing.
+    '''
+    seo.indexation_status = lambda url, record: record
+    seo.core_web_vitals = lambda url, record: record
+
+
+PSI_PATH = '/pagespeedonline/v5/runPagespeed'
+
+
+class StubPSI:
+    '''
+    A stand-in for the PageSpeed Insights endpoint, served by FixtureServer at
+    PSI_PATH. Answers with a fixed Lighthouse result and a 429 when more than
+    quota calls arrive within one second.
+
+    Parameters
+    ----------
+    quota (int, optional): Calls allowed per second. No limit if None.
+
+    '''
+
+    def __init__(self, quota=None):
+        self.quota = quota
+        self.calls = []
+        self.throttled = 0
+        self._lock = threading.Lock()
+        audits = {
+            'largest-contentful-paint': ('2.1 s', 2100.0),
+            'cumulative-layout-shift': ('0.05', 0.05),
+            'speed-index': ('3.9 s', 3900.0),
+            'first-contentful-paint': ('1.2 s', 1200.0),
+            'total-blocking-time': ('350 ms', 350.0),
+        }
+        self.body = json.dumps({'lighthouseResult': {'audits': {
+            audit: {'displayValue': display, 'numericValue': value}
+            for audit, (display, value) in audits.items()}}}).encode()
+
+    def __call__(self, query):
+        now = time.monotonic()
+        with self._lock:
+            recent = [t for t in self.calls if now - t < 1]
+            if self.quota is not None and len(recent) >= self.quota:
+                self.throttled += 1
+                return 429, b'{"error": {"code": 429, "message": "Quota exceeded"}}'
+            self.calls = recent + [now]
+        return 200, self.body
+
+
+SEARCH_PATH = '/search'
+
+
+class StubGoogle:
+    '''
+    A stand-in for Google search, served by FixtureServer at SEARCH_PATH.
+    "site:URL" lists URL if it is indexed, "site:host" lists every indexed URL
+    of the host, as links like Google's own result pages.
+
+    Parameters
+    ----------
+    indexed (iterable of str): The URLs that are indexed.
+
+    '''
+
+    def __init__(self, indexed=()):
+        self.indexed = set(indexed)
+
+    def __call__(self, query):
+        target = parse_qs(query).get('q', [''])[0]
+        target = target[len('site:'):] if target.startswith('site:') else target
+        if '/' in target:
+            found = [target] if target in self.indexed else []
+        else:
+            found = [url for url in self.indexed if urlsplit(url).netloc == target]
+        links = ''.join(f'<a href="/url?q={quote(url, safe="")}&amp;sa=U">{url}</a>' for url in sorted(found))
+        return 200, f'<html><body>{links}</body></html>'.encode()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+The page corpus for the benchmark suite. Pages are built from a fixed seed so
+every run serves exactly the same bytes, and can be saved to (and loaded from)
+a folder to benchmark recorded real pages instead.
+
+Every page uses __URL__ where its own URL goes (e.g. in a self canonical);
+the suite replaces it once the server's address is known.
+
+Usage:
+    python benchmarks/corpus.py --save corpus/
+"""
+
+import argparse
+import json
+import os
+import random
+
+from bench_parse import make_page
+
+
+URL = b'__URL__'
+
+HEAD = (b'<meta charset="utf-8"><title>%s</title>'
+        b'<meta name="viewport" content="width=device-width, initial-scale=1">')
+
+
+def page(title, head=b'', body=b''):
+    return b'<!DOCTYPE html><html><head>' + HEAD % title + head + b'</head><body>' + body + b'</body></html>'
+
+
+def lorem(rng, words):
+    vocabulary = [b'seo', b'page', b'crawl', b'index', b'search', b'content', b'product', b'shop', b'blog', b'news']
+    return b' '.join(rng.choice(vocabulary) for _ in range(words))
+
+
+def build_corpus(seed=0):
+    '''
+    Build the corpus.
+
+    Returns
+    -------
+    dict: Maps each page name to (body, headers, expected), where expected
+        maps report columns to the mark ('✅' or '❌') the checks should give.
+    '''
+    rng = random.Random(seed)
+    canonical = b'<link rel="canonical" href="' + URL + b'">'
+    paragraphs = b''.join(b'<p>' + lorem(rng, 80) + b'</p>' for _ in range(20))
+
+    schema = b''.join(
+        b'<script type="application/ld+json">' + json.dumps({
+            '@context': 'https://schema.org', '@type': kind, 'name': f'{kind} {i}',
+            'description': lorem(rng, 30).decode()}).encode() + b'</script>'
+        for i, kind in enumerate(['Organization', 'WebSite', 'BreadcrumbList', 'Product', 'FAQPage'] * 10))
+    microdata = b''.join(
+        b'<div itemscope itemtype="https://schema.org/Review"><span itemprop="reviewBody">'
+        + lorem(rng, 20) + b'</span></div>' for _ in range(200))
+    rdfa = b''.join(b'<div vocab="https://schema.org/" typeof="Event"><span property="name">'
+                    + lorem(rng, 5) + b'</span></div>' for _ in range(100))
+
+    bloat = (b'<style>' + b''.join(b'.c%d{margin:%dpx;padding:%dpx}' % (i, i % 40, i % 13) for i in range(20000))
+             + b'</style><script>var config = ' + json.dumps({f'k{i}': lorem(rng, 5).decode() for i in range(5000)}).encode()
+             + b';</script>')
+
+    large = make_page(5000).replace(b'https://example.com/shop/', URL)
+
+    good = {'Mobile Friendly': '✅', 'No index Meta Tag': '✅', 'No index Response Header': '✅', 'Canonical': '✅'}
+    return {
+        'small': (page(b'Small', canonical, paragraphs[:2000]), {}, dict(good, **{'Schema.org': '❌'})),
+        'large': (large, {}, dict(good, **{'Schema.org': '✅'})),
+        'schema_heavy': (page(b'Schema', canonical + schema, microdata + rdfa), {}, dict(good, **{'Schema.org': '✅'})),
+        'head_bloated': (page(b'Bloated', bloat + canonical, paragraphs), {}, good),
+        'noindex': (page(b'Noindex', canonical + b'<meta name="robots" content="noindex, follow">', paragraphs),
+                    {'X-Robots-Tag': 'noindex'},
+                    dict(good, **{'No index Meta Tag': '❌', 'No index Response Header': '❌'})),
+        'canonical_other': (page(b'Other', b'<link rel="canonical" href="https://example.com/elsewhere">', paragraphs),
+                            {}, dict(good, Canonical='❌')),
+        'canonical_relative': (page(b'Relative', b'<link rel="canonical" href="/relative">', paragraphs),
+                               {}, dict(good, Canonical='❌')),
+        'canonical_missing': (page(b'Missing', b'', paragraphs), {}, dict(good, Canonical='❌')),
+        'canonical_multiple': (page(b'Multiple', canonical + b'<link rel="canonical" href="https://example.com/b">',
+                                    paragraphs), {}, good),
+        'no_viewport': (page(b'No viewport', canonical, paragraphs).replace(b'<meta name="viewport"', b'<meta name="x"'),
+                        {}, dict(good, **{'Mobile Friendly': '❌'})),
+    }
+
+
+def save_corpus(corpus, folder):
+    '''
+    Save a corpus as name.html files, with the headers and expectations in corpus.json.
+    '''
+    os.makedirs(folder, exist_ok=True)
+    meta = {}
+    for name, (body, headers, expected) in corpus.items():
+        with open(os.path.join(folder, f'{name}.html'), 'wb') as f:
+            f.write(body)
+        meta[name] = {'headers': headers, 'expected': expected}
+    with open(os.path.join(folder, 'corpus.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+
+def load_corpus(folder):
+    '''
+    Load a corpus saved with save_corpus(), or any folder of recorded .html
+    pages (those have no headers and no expectations).
+    '''
+    meta_path = os.path.join(folder, 'corpus.json')
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    corpus = {}
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith('.html'):
+            name = filename[:-len('.html')]
+            with open(os.path.join(folder, filename), 'rb') as f:
+                body = f.read()
+            info = meta.get(name, {})
+            corpus[name] = (body, info.get('headers', {}), info.get('expected', {}))
+    return corpus
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', required=True, metavar='DIR', help='Folder to save the corpus to.')
+    args = parser.parse_args()
+    corpus = build_corpus()
+    save_corpus(corpus, args.save)
+    for name, (body, _, _) in corpus.items():
+        print(f'{name:<20} {len(body) / 1024:8.0f} KiB')
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+End to end benchmark suite. Runs the full checklist pipeline (every check,
+report written to a JSONL file) against a local server that serves the page
+corpus (see corpus.py) and stubs PageSpeed Insights, Google search and
+robots.txt, so it runs offline and is reproducible.
+
+Every concurrency level runs in its own process, and reports pages/sec,
+peak RSS and p50/p95/p99 latency per check. The startup time is measured
+too (see bench_startup.py). The results can be saved with --json and
+compared with a saved baseline: the suite exits with status 1 if pages/sec
+dropped (or a check's p95 or the import time grew) by more than --tolerance.
+
+Usage:
+    python benchmarks/suite.py [--urls 200] [--concurrency 1 16] [--latency 0.02]
+                               [--corpus DIR] [--json results.json] [--baseline old.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import bench_startup
+from common import PSI_PATH, SEARCH_PATH, FixtureServer, StubGoogle, StubPSI, load_checklist
+from corpus import URL, build_corpus, load_corpus
+
+ROBOTS = b'User-agent: *\nDisallow: /private/\n'
+
+
+def run_once(args):
+    '''
+    Audit args.urls corpus pages at args.concurrency[0] in this process and
+    return the measurements.
+    '''
+    seo = load_checklist()
+    seo.set_quiet()
+
+    corpus = load_corpus(args.corpus) if args.corpus else build_corpus()
+    names = list(corpus)
+    concurrency = args.concurrency[0]
+
+    pages = {'/robots.txt': ROBOTS}
+    psi = StubPSI()
+    google = StubGoogle()
+    pages[PSI_PATH] = psi
+    pages[SEARCH_PATH] = google
+
+    with FixtureServer(pages, latency=args.latency) as server:
+        urls = []
+        expected = {}
+        for i in range(args.urls):
+            name = names[i % len(names)]
+            body, headers, expect = corpus[name]
+            url = f'{server.base_url}/p/{i}-{name}'
+            body = body.replace(URL, url.encode())
+            pages[f'/p/{i}-{name}'] = lambda query, body=body, headers=headers: (200, body, headers)
+            urls.append(url)
+            expected[url] = expect
+            if expect.get('No index Meta Tag') != '❌':
+                google.indexed.add(url)
+
+        seo.configure_session(pool_size=max(10, concurrency))
+        seo.configure_psi(endpoint=server.base_url + PSI_PATH, rate=100000, strategies=['mobile'])
+        seo.configure_indexation(seo.GoogleSearchBackend(endpoint=server.base_url + SEARCH_PATH, rate=100000))
+        seo.configure_robots()
+
+        summary = seo.TimingSummary()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'report.jsonl')
+            start = time.perf_counter()
+            if concurrency > 1:
+                seo.audit_async(urls, output=output, collect=False, timings=summary,
+                                concurrency=concurrency, per_host=concurrency)
+            else:
+                seo.audit(urls, output=output, collect=False, timings=summary)
+            elapsed = time.perf_counter() - start
+
+            # Make sure we benchmarked a working checklist
+            mismatches = []
+            with open(output, encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    for column, mark in expected[row['URL']].items():
+                        if mark not in str(row.get(column)):
+                            mismatches.append(f"{row['URL']} {column}: {row.get(column)}")
+
+    return {
+        'urls': args.urls,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'pages_per_sec': args.urls / elapsed,
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'checks': {name: {'count': count, 'p50': p50, 'p95': p95, 'p99': p99}
+                   for name, count, p50, p95, p99, _ in summary.rows()},
+        'mismatches': mismatches,
+    }
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Return the regressions of results against a baseline, as strings.
+    '''
+    regressions = []
+    was = baseline.get('startup')
+    now = results['startup']
+    # Ignore a few milliseconds of noise
+    if was and now['import_ms'] > max(was['import_ms'] * (1 + tolerance), was['import_ms'] + 5):
+        regressions.append(f"startup: import {was['import_ms']:.0f} -> {now['import_ms']:.0f} ms")
+    old = {(run['urls'], run['concurrency']): run for run in baseline['runs']}
+    for run in results['runs']:
+        before = old.get((run['urls'], run['concurrency']))
+        if before is None:
+            continue
+        label = f"concurrency {run['concurrency']}"
+        if run['pages_per_sec'] < before['pages_per_sec'] * (1 - tolerance):
+            regressions.append(f"{label}: {before['pages_per_sec']:.1f} -> {run['pages_per_sec']:.1f} pages/s")
+        for name, stats in run['checks'].items():
+            was = before['checks'].get(name)
+            # Ignore sub-millisecond noise
+            if was and stats['p95'] > max(was['p95'] * (1 + tolerance), was['p95'] + 0.001):
+                regressions.append(f"{label}: {name} p95 {was['p95'] * 1000:.1f} -> {stats['p95'] * 1000:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=200, help='URLs to audit per run.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('--latency', type=float, default=0.02, help='Server latency in seconds.')
+    parser.add_argument('--corpus', metavar='DIR', help='Saved or recorded corpus to serve instead of the built one.')
+    parser.add_argument('--json', metavar='FILE', help='Save the results here.')
+    parser.add_argument('--baseline', metavar='FILE', help='Results of an earlier run to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown (default: 0.2, i.e. 20%%).')
+    parser.add_argument('--budget-ms', type=float, default=250, help='Startup import time budget (0 for none).')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_once(args)))
+        return
+
+    startup = bench_startup.measure(repeat=3)
+    bench_startup.report(startup)
+    problems = bench_startup.check(startup, args.budget_ms)
+
+    results = []
+    for concurrency in args.concurrency:
+        command = [sys.executable, os.path.abspath(__file__), '--single', '--urls', str(args.urls),
+                   '--concurrency', str(concurrency), '--latency', str(args.latency)]
+        if args.corpus:
+            command += ['--corpus', args.corpus]
+        # The audit prints its own summary, the results are the last line
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        results.append(run)
+
+        print(f"concurrency {concurrency:>3}: {run['pages_per_sec']:7.1f} pages/s, "
+              f"{run['peak_rss_mib']:6.0f} MiB peak RSS, {run['seconds']:.1f}s for {run['urls']} URLs")
+        for name, stats in run['checks'].items():
+            print(f"    {name:<28} p50 {stats['p50'] * 1000:8.1f} ms  p95 {stats['p95'] * 1000:8.1f} ms  "
+                  f"p99 {stats['p99'] * 1000:8.1f} ms")
+        for mismatch in run['mismatches'][:10]:
+            print(f'    unexpected result: {mismatch}')
+
+    results = {'startup': startup, 'runs': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    for problem in problems:
+        print(f'FAILED {problem}')
+    failed = bool(problems) or any(run['mismatches'] for run in results['runs'])
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
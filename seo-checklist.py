@@ -8,543 +8,5416 @@ Created on Mon Apr 17 11:04:15 2023
 
 #core web vitals
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import argparse
+import array
+import collections
+import contextlib
+import csv
+import functools
+import gzip
+import hashlib
+import html
+import importlib
+import importlib.util
+import itertools
+import json
+import math
+import os
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urljoin, urlsplit, urlunsplit
+from xml.etree import ElementTree
+
+
+# =============================================================================
+# Lazy Imports
+# =============================================================================
+# pandas, BeautifulSoup, termcolor, halo and asyncio are only imported the
+# first time they are used, so the CLI starts fast and runs that never build a
+# DataFrame (e.g. a JSONL report) never pay for pandas.
+
+class LazyModule:
+    '''
+    Stands in for a module and imports it on first attribute access.
+
+    Parameters
+    ----------
+    name (str): The module to import.
+
+    '''
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+#core web vitals
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+asyncio = LazyModule('asyncio')
+
 
 #mobile Friendly
-from bs4 import BeautifulSoup
-import pandas as pd
-from termcolor import colored
+def BeautifulSoup(*args, **kwargs):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(*args, **kwargs)
+
+
+def colored(*args, **kwargs):
+    from termcolor import colored
+    return colored(*args, **kwargs)
+
+
+def Halo(*args, **kwargs):
+    from halo import Halo
+    return Halo(*args, **kwargs)
+
+
+# Optional faster HTML parsers, the parsed document picks the fastest one installed
+SELECTOLAX_AVAILABLE = importlib.util.find_spec('selectolax') is not None
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+
+
+def selectolax_parser():
+    '''
+    Return selectolax's HTML parser class, Lexbor if this version has it.
+    '''
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+        return HTMLParser
+
+
+
+#https://www.semrush.com/blog/on-page-seo-checklist
+
+
+# =============================================================================
+# HTTP Session
+# =============================================================================
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+
+# Status codes worth retrying, the server may answer fine a moment later
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class ConnectionStats:
+    '''
+    Counts the requests sent through a session and the TCP/TLS connections
+    opened for them. Every request that did not open a connection reused one.
+    '''
+
+    def __init__(self, requests=0, opened=0):
+        self.requests = requests
+        self.opened = opened
+        self._lock = threading.Lock()
+
+    @property
+    def reused(self):
+        return self.requests - self.opened
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.opened += 1
+
+    def copy(self):
+        return ConnectionStats(self.requests, self.opened)
+
+    def __sub__(self, other):
+        return ConnectionStats(self.requests - other.requests, self.opened - other.opened)
+
+    def __str__(self):
+        return f'{self.requests} requests, {self.opened} connections opened, {self.reused} reused'
+
+
+class HostLimiter:
+    '''
+    Spaces the requests to each host at least delay seconds apart. Every
+    request of the shared session waits for its turn here once it has a
+    connection, so redirects, bot probes and robots.txt fetches count too.
+
+    Parameters
+    ----------
+    delay (float): Minimum seconds between the starts of two requests to the same host.
+    wait_turn (callable, optional): Called with the host (as in the URL, e.g.
+        example.com:8080) instead, to share the turns with other processes,
+        see WorkQueue.wait_turn().
+
+    '''
+
+    def __init__(self, delay=0.0, wait_turn=None):
+        self.delay = delay
+        self.wait_turn = wait_turn
+        self.next_at = {}
+        self._lock = threading.Lock()
+        self._host_locks = {}
+
+    def wait(self, host):
+        '''
+        Wait until the next request to host may start.
+        '''
+        if self.wait_turn is not None:
+            self.wait_turn(host)
+            return
+        if not self.delay:
+            return
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        # Requests to the same host take turns, and the delay counts from when
+        # the previous one really went, not from when it asked
+        with host_lock:
+            wait = self.next_at.get(host, 0) - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.next_at[host] = time.monotonic() + self.delay
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    '''
+    HTTPAdapter that reports to a ConnectionStats how many connections its
+    pools open and how many requests it sends, makes every request wait for
+    its turn with a HostLimiter and gives the ones without a timeout the
+    session's.
+    '''
+
+    def __init__(self, stats, limiter=None, timeout=None, **kwargs):
+        self.stats = stats
+        self.limiter = limiter
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+        limiter = self.limiter
+
+        class CountingPool:
+            def _new_conn(self):
+                stats.count_connection()
+                return super()._new_conn()
+
+            def _get_conn(self, timeout=None):
+                # With a blocking pool this waits for a free connection first,
+                # so the turn is taken when the request can really start
+                conn = super()._get_conn(timeout)
+                if limiter is not None:
+                    default_port = 443 if self.scheme == 'https' else 80
+                    host = self.host if self.port in (None, default_port) else f'{self.host}:{self.port}'
+                    try:
+                        limiter.wait(host)
+                    except BaseException:
+                        self._put_conn(conn)
+                        raise
+                return conn
+
+        class CountingHTTPConnectionPool(CountingPool, HTTPConnectionPool):
+            pass
+
+        class CountingHTTPSConnectionPool(CountingPool, HTTPSConnectionPool):
+            pass
+
+        self.poolmanager.pool_classes_by_scheme = {'http': CountingHTTPConnectionPool,
+                                                   'https': CountingHTTPSConnectionPool}
+
+    def send(self, request, **kwargs):
+        self.stats.count_request()
+        # Requests that don't set their own timeout get the session's
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(pool_size=10, keep_alive=True, per_host=None, delay=0.0, timeout=30, retries=2, backoff=0.5):
+    '''
+    Create a requests session with a connection pool shared by all checks.
+
+    Parameters
+    ----------
+    pool_size (int): Connections kept open per host, and hosts kept in the pool.
+    keep_alive (bool): Keep connections open between requests.
+    per_host (int, optional): Maximum requests in flight to the same host,
+        across every thread. Further requests wait for a free connection. No
+        limit if None.
+    delay (float): Minimum seconds between two requests to the same host, see HostLimiter.
+    timeout (float, optional): Seconds to wait for a server, for every request
+        that doesn't set its own. No timeout if None.
+    retries (int): How many times fetch_page() and probe_page() retry a network
+        error or a status in RETRY_STATUS_CODES.
+    backoff (float): Seconds to wait before the first retry, doubled every retry.
+
+    Returns
+    -------
+    requests.Session: The session. Its ConnectionStats is at session.stats,
+        its HostLimiter at session.limiter, and the retry policy at
+        session.retries and session.backoff.
+
+    '''
+    session = requests.Session()
+    session.stats = ConnectionStats()
+    session.limiter = HostLimiter(delay)
+    session.retries = retries
+    session.backoff = backoff
+
+    # A blocking pool of per_host connections is what caps the requests in
+    # flight, a connection is only given back once its response is read
+    adapter = PooledHTTPAdapter(session.stats, session.limiter, timeout, pool_connections=pool_size,
+                                pool_maxsize=per_host or pool_size, pool_block=per_host is not None)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    # gzip is always decoded, brotli only when the brotli package is installed
+    session.headers['Accept-Encoding'] = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+
+    return session
+
+
+_session = None
+_api_session = None
+
+# Politeness limits are for the audited sites, not for the APIs they are checked with
+SITE_ONLY_OPTIONS = ('per_host', 'delay')
+
+
+def get_session():
+    '''
+    Return the shared session for the audited sites, creating it with the
+    defaults on first use.
+    '''
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+
+def get_api_session():
+    '''
+    Return the shared session for PageSpeed Insights and Google search. It has
+    no per host or crawl delay limits, the API clients have their own rate limits.
+    '''
+    global _api_session
+    if _api_session is None:
+        _api_session = create_session()
+    return _api_session
+
+
+def configure_session(**options):
+    '''
+    Replace the shared sessions with ones built with create_session(**options).
+    The API session gets the same options but per_host and delay.
+
+    Returns
+    -------
+    requests.Session: The new session for the audited sites.
+
+    '''
+    global _session, _api_session
+    for session in (_session, _api_session):
+        if session is not None:
+            session.close()
+    _session = create_session(**options)
+    _api_session = create_session(**{name: value for name, value in options.items()
+                                     if name not in SITE_ONLY_OPTIONS})
+    return _session
+
+
+# =============================================================================
+# Page Fetching
+# =============================================================================
+
+class Page:
+    '''
+    A fetched page. It is downloaded once and handed to every check, so the
+    checks never need to hit the network themselves.
+
+    Attributes
+    ----------
+    url (str): The URL that was requested.
+    final_url (str): The URL after following redirects.
+    user_agent (str or None): The User-Agent the page was fetched with.
+    status_code (int or None): The HTTP status code.
+    headers (requests.structures.CaseInsensitiveDict): The response headers.
+    content (bytes): The response body.
+    encoding (str or None): The encoding used to decode the body.
+    elapsed (float): Seconds until the response headers arrived.
+    download_time (float): Seconds until the whole body was downloaded.
+    error (Exception or None): The error raised while fetching, if any.
+    from_cache (bool): Whether the server answered 304 and the body came from the HTTP cache.
+    truncated (bool): Whether only the <head> was downloaded, see fetch_page(head_only=True).
+    size (int): Body bytes downloaded, after decompression.
+    redirects (list): (status code, URL) of every redirect that was followed.
+    probe (bool): Whether this is a HEAD or Range probe without a body, see probe_page().
+    retries (int): How many times the fetch was retried.
+
+    '''
+
+    def __init__(self, url, user_agent=None, status_code=None, headers=None, content=b'',
+                 encoding=None, final_url=None, elapsed=0.0, download_time=0.0, error=None,
+                 from_cache=False, cache=None, truncated=False, size=None, redirects=None, probe=False):
+        self.url = url
+        self.user_agent = user_agent
+        self.status_code = status_code
+        self.headers = headers if headers is not None else requests.structures.CaseInsensitiveDict()
+        self.content = content
+        self.encoding = encoding
+        self.final_url = final_url or url
+        self.elapsed = elapsed
+        self.download_time = download_time
+        self.error = error
+        self.from_cache = from_cache
+        self.truncated = truncated
+        self.size = len(content) if size is None else size
+        self.redirects = redirects or []
+        self.probe = probe
+        self.retries = 0
+        self._cache = cache
+        self._text = None
+        self._document = None
+
+    @property
+    def text(self):
+        '''The response body decoded to str.'''
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or 'utf-8', errors='replace')
+        return self._text
+
+    @property
+    def document(self):
+        '''The ParsedDocument for the body, parsed the first time it is needed.'''
+        if self._document is None:
+            self.set_document(ParsedDocument(self.content))
+        return self._document
+
+    def set_document(self, document):
+        '''Use a document parsed somewhere else, e.g. in a parsing process.'''
+        self._document = document
+        # Keep the parse results next to the cached body so a 304 next run skips parsing.
+        # Only full pages stored in the cache (or served from it) have a cache here.
+        if self._cache is not None:
+            self._cache.store_document(self.url, self.user_agent, document)
+            self._cache = None
+
+    def raise_for_error(self):
+        '''Re-raise the fetch error so each check can report it on its own.'''
+        if self.error is not None:
+            raise self.error
+
+    def __repr__(self):
+        return f'<Page [{self.status_code}] {self.url}>'
+
+
+class CacheStats:
+    '''
+    Counts how often the HTTP cache saved a download.
+
+    Attributes
+    ----------
+    requests (int): Requests sent through the cache.
+    hits (int): Requests the server answered with 304 Not Modified.
+    bytes_saved (int): Body bytes not downloaded thanks to a 304.
+
+    '''
+
+    def __init__(self, requests=0, hits=0, bytes_saved=0):
+        self.requests = requests
+        self.hits = hits
+        self.bytes_saved = bytes_saved
+
+    @property
+    def hit_ratio(self):
+        return self.hits / self.requests if self.requests else 0.0
+
+    def copy(self):
+        return CacheStats(self.requests, self.hits, self.bytes_saved)
+
+    def __sub__(self, other):
+        return CacheStats(self.requests - other.requests, self.hits - other.hits,
+                          self.bytes_saved - other.bytes_saved)
+
+    def __str__(self):
+        return (f'{self.hits}/{self.requests} cache hits ({self.hit_ratio:.0%}), '
+                f'{self.bytes_saved / 1024:.0f} KiB saved')
+
+
+class HTTPCache:
+    '''
+    On disk cache of fetched pages for repeat audits. Stores the body, headers
+    and validators of every response with an ETag or Last-Modified header, plus
+    the ParsedDocument results once a check parsed the page.
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+
+    '''
+
+    def __init__(self, path):
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT NOT NULL,
+                user_agent TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                encoding TEXT,
+                final_url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                document TEXT,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (url, user_agent)
+            )""")
+        self.connection.commit()
+
+    def lookup(self, url, user_agent):
+        '''
+        Return the cached entry for url and user_agent as a dict, or None.
+        '''
+        with self._lock:
+            cursor = self.connection.execute(
+                'SELECT * FROM http_cache WHERE url = ? AND user_agent = ?', (url, user_agent or ''))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def validators(self, entry):
+        '''
+        Return the conditional request headers for a cached entry.
+        '''
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def count(self, bytes_saved=None):
+        '''
+        Count a request sent through the cache, and a hit if bytes_saved is given.
+        '''
+        with self._lock:
+            self.stats.requests += 1
+            if bytes_saved is not None:
+                self.stats.hits += 1
+                self.stats.bytes_saved += bytes_saved
+
+    def store(self, page):
+        '''
+        Cache a freshly downloaded page. Pages without validators can't be
+        revalidated and head only pages aren't complete, so they are skipped.
+
+        Returns
+        -------
+        bool: Whether the page was stored.
+
+        '''
+        etag = page.headers.get('ETag')
+        last_modified = page.headers.get('Last-Modified')
+        if page.status_code != 200 or page.truncated or not (etag or last_modified):
+            return False
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)',
+                (page.url, page.user_agent or '', page.status_code, json.dumps(dict(page.headers)),
+                 page.content, page.encoding, page.final_url, etag, last_modified, time.time()))
+            self.connection.commit()
+        return True
+
+    def store_document(self, url, user_agent, document):
+        '''
+        Save the parse results of a cached page.
+        '''
+        with self._lock:
+            self.connection.execute(
+                'UPDATE http_cache SET document = ? WHERE url = ? AND user_agent = ?',
+                (json.dumps(document.to_dict()), url, user_agent or ''))
+            self.connection.commit()
+
+    def page(self, entry, url, user_agent, elapsed, download_time, size=0):
+        '''
+        Build a Page from a cached entry after a 304, reusing the cached parse
+        results. Its size is the body bytes of the 304 (size), not of the
+        cached body.
+        '''
+        page = Page(url,
+                    user_agent=user_agent,
+                    status_code=entry['status_code'],
+                    headers=requests.structures.CaseInsensitiveDict(json.loads(entry['headers'])),
+                    content=entry['content'],
+                    encoding=entry['encoding'],
+                    final_url=entry['final_url'],
+                    elapsed=elapsed,
+                    download_time=download_time,
+                    size=size,
+                    from_cache=True,
+                    # Only entries without parse results need them written back
+                    cache=None if entry['document'] else self)
+        if entry['document']:
+            page._document = ParsedDocument.from_dict(json.loads(entry['document']))
+        return page
+
+    def close(self):
+        self.connection.close()
+
+
+_http_cache = None
+
+
+def get_http_cache():
+    '''
+    Return the shared HTTPCache, or None if caching is off.
+    '''
+    return _http_cache
+
+
+def configure_http_cache(path=None):
+    '''
+    Turn the shared HTTP cache on with a SQLite file, or off if path is None.
+
+    Returns
+    -------
+    HTTPCache or None: The new cache.
+
+    '''
+    global _http_cache
+    if _http_cache is not None:
+        _http_cache.close()
+    _http_cache = HTTPCache(path) if path else None
+    return _http_cache
+
+
+def print_cache_stats(before):
+    '''
+    Print the HTTP cache hits since the before snapshot, if the cache is on.
+    '''
+    cache = get_http_cache()
+    if cache is not None and before is not None:
+        print(f"🗄️ HTTP cache: {cache.stats - before}")
+
+
+def cache_stats():
+    '''
+    Snapshot of the shared HTTP cache counters, None if the cache is off.
+    '''
+    cache = get_http_cache()
+    return cache.stats.copy() if cache is not None else None
+
+
+class HeadScanner:
+    '''
+    Incremental tokenizer that finds where the <head> of an HTML document ends,
+    fed one chunk at a time. The head ends at "</head>", "<body" or the first
+    tag that can't be in a head, like browsers do. Comments and the contents
+    of <title>, <script>, <style>, <noscript> and <template> are skipped, so
+    tags inside them don't count.
+
+    Attributes
+    ----------
+    end (int or None): Offset in buffer where the head ends, once found.
+
+    '''
+
+    TAG = re.compile(rb'<(!--|/?[a-zA-Z][a-zA-Z0-9-]*)')
+    HEAD_TAGS = {b'html', b'head', b'title', b'base', b'link', b'meta', b'style', b'script',
+                 b'noscript', b'template'}
+    # Elements whose contents are text up to their closing tag. <title> isn't
+    # raw text in HTML, but a "<" in it doesn't open a tag either.
+    RAW_TEXT = {b'title', b'script', b'style', b'noscript', b'template'}
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.pos = 0
+        self.closing = None
+        self.end = None
+
+    def feed(self, chunk):
+        '''
+        Add a chunk of the body.
+
+        Returns
+        -------
+        bool: True once the end of the head has been found.
+
+        '''
+        self.buffer += chunk
+        buffer = self.buffer
+        while self.end is None:
+            if self.closing is not None:
+                # Inside a comment or raw text element, look for its end only
+                match = self.closing.search(buffer, self.pos)
+                if match is None:
+                    # Keep a few bytes in case the closing tag is split between chunks
+                    self.pos = max(self.pos, len(buffer) - 16)
+                    break
+                self.pos = match.end()
+                self.closing = None
+                continue
+
+            match = self.TAG.search(buffer, self.pos)
+            if match is None:
+                self.pos = max(self.pos, len(buffer) - 3)
+                break
+            if match.end() == len(buffer):
+                # The tag name may go on in the next chunk
+                self.pos = match.start()
+                break
+
+            name = match.group(1).lower()
+            self.pos = match.end()
+            if name == b'!--':
+                self.closing = re.compile(rb'-->')
+            elif name in (b'/head', b'body') or name.lstrip(b'/') not in self.HEAD_TAGS:
+                self.end = match.start()
+            elif name in self.RAW_TEXT:
+                self.closing = re.compile(rb'</' + name, re.IGNORECASE)
+        return self.end is not None
+
+
+# Bytes of body left after the </head> that are still read (and dropped) to
+# keep the connection reusable. Anything bigger closes the connection instead.
+HEAD_DRAIN_LIMIT = 64 * 1024
+
+
+def retry_fetch(fetch, retries=0, backoff=0.5):
+    '''
+    Call fetch() until it returns a page without a network error or a status
+    in RETRY_STATUS_CODES, at most retries more times.
+
+    Parameters
+    ----------
+    fetch (callable): Fetches once and returns a Page.
+    retries (int): How many times to retry.
+    backoff (float): Seconds to wait before the first retry, doubled every retry.
+
+    Returns
+    -------
+    Page: The last page fetched, with the retries it took.
+
+    '''
+    for attempt in range(retries + 1):
+        page = fetch()
+        page.retries = attempt
+        if page.error is None and page.status_code not in RETRY_STATUS_CODES:
+            break
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    return page
+
+
+def fetch_page(url, user_agent=None, timeout=None, session=None, head_only=False, retries=None):
+    '''
+    Download a URL once and wrap the result in a Page.
+
+    Network errors are not raised here, they are stored on the page so every
+    check can still report the failure in its own column.
+
+    Parameters
+    ----------
+    url (str): The URL to fetch.
+    user_agent (str, optional): The User-Agent header to send.
+    timeout (float, optional): Seconds to wait for the server before giving up.
+        The session's timeout if None.
+    session (requests.Session, optional): Session to send the request with.
+        The shared pooled session is used if not given.
+    head_only (bool): Stream the body and stop reading once the </head> is
+        reached. The page keeps only the head and is marked truncated.
+    retries (int, optional): How many times to retry a network error or a
+        status in RETRY_STATUS_CODES. The session's retries if None.
+
+    If the shared HTTP cache is on, a conditional request is sent for pages
+    fetched before and a 304 answer is served from the cache.
+
+    Returns
+    -------
+    Page: The fetched page.
+
+    '''
+    session = session or get_session()
+    retries = getattr(session, 'retries', 0) if retries is None else retries
+    return retry_fetch(lambda: _fetch_page(url, user_agent, timeout, session, head_only),
+                       retries, getattr(session, 'backoff', 0.5))
+
+
+def _fetch_page(url, user_agent, timeout, session, head_only):
+    cache = get_http_cache()
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    entry = cache.lookup(url, user_agent) if cache is not None else None
+    if entry is not None:
+        headers.update(cache.validators(entry))
+
+    start = time.perf_counter()
+    try:
+        response = session.get(url, headers=headers, timeout=timeout, stream=head_only)
+        truncated, size = False, None
+        if head_only:
+            content, truncated, size = read_head(response)
+        else:
+            content = response.content
+    except requests.exceptions.RequestException as e:
+        return Page(url, user_agent=user_agent, error=e, download_time=time.perf_counter() - start)
+
+    if cache is not None:
+        not_modified = response.status_code == 304 and entry is not None
+        cache.count(len(entry['content']) if not_modified else None)
+        if not_modified:
+            # Only the 304 itself came over the wire, not the cached body
+            return cache.page(entry, url, user_agent, response.elapsed.total_seconds(),
+                              time.perf_counter() - start, len(content) if size is None else size)
+
+    page = Page(url,
+                user_agent=user_agent,
+                status_code=response.status_code,
+                headers=response.headers,
+                content=content,
+                encoding=response.encoding,
+                final_url=response.url,
+                elapsed=response.elapsed.total_seconds(),
+                download_time=time.perf_counter() - start,
+                truncated=truncated,
+                size=size,
+                redirects=[(r.status_code, r.url) for r in response.history])
+    if cache is not None and cache.store(page):
+        page._cache = cache
+    return page
+
+
+def probe_page(url, user_agent=None, timeout=None, session=None, retries=None):
+    '''
+    Check a URL without downloading its body: a HEAD request, or a GET for
+    the first byte only if the server refuses HEAD. Redirects are followed.
+
+    Parameters
+    ----------
+    url (str): The URL to probe.
+    user_agent (str, optional): The User-Agent header to send.
+    timeout (float, optional): Seconds to wait for the server before giving up.
+        The session's timeout if None.
+    session (requests.Session, optional): Session to send the request with.
+    retries (int, optional): How many times to retry, see fetch_page().
+
+    Returns
+    -------
+    Page: A page without content, marked as a probe. A 206 answer to the
+        Range GET is reported as 200.
+
+    '''
+    session = session or get_session()
+    retries = getattr(session, 'retries', 0) if retries is None else retries
+    return retry_fetch(lambda: _probe_page(url, user_agent, timeout, session),
+                       retries, getattr(session, 'backoff', 0.5))
+
+
+def _probe_page(url, user_agent, timeout, session):
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    start = time.perf_counter()
+    try:
+        response = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        # Some servers reject or mishandle HEAD, ask for a single byte instead
+        if response.status_code >= 400 and response.status_code not in (404, 410):
+            response = session.get(url, headers=dict(headers, Range='bytes=0-0'), timeout=timeout, stream=True)
+            if response.status_code == 206:
+                response.content
+            response.close()
+    except requests.exceptions.RequestException as e:
+        return Page(url, user_agent=user_agent, error=e, download_time=time.perf_counter() - start, probe=True)
+
+    return Page(url,
+                user_agent=user_agent,
+                status_code=200 if response.status_code == 206 else response.status_code,
+                headers=response.headers,
+                final_url=response.url,
+                elapsed=response.elapsed.total_seconds(),
+                download_time=time.perf_counter() - start,
+                truncated=True,
+                size=0,
+                redirects=[(r.status_code, r.url) for r in response.history],
+                probe=True)
+
+
+def response_signature(page):
+    '''
+    What two responses must share to count as the same for every bot: the
+    status, the redirect chain and the final URL, with the URLs normalized.
+    Lengths are left out, dynamic pages differ in size on every request.
+    '''
+    redirects = tuple((status, normalize_url(url)) for status, url in page.redirects)
+    return (page.status_code, redirects, normalize_url(page.final_url))
+
+
+TITLE_TAG = re.compile(rb'<title\b[^>]*>(.*?)</title', re.IGNORECASE | re.DOTALL)
+
+
+def head_fields(page):
+    '''
+    The parts of a page's <head> that change how search engines index it: the
+    title, the robots directives (meta tag and X-Robots-Tag header) and the
+    canonical. Whitespace and case don't count, and the canonical is normalized.
+    '''
+    match = TITLE_TAG.search(page.content)
+    title = html.unescape(match.group(1).decode(page.encoding or 'utf-8', errors='replace')) if match else ''
+    document = page.document
+    robots = ' '.join(filter(None, (document.meta_robots, page.headers.get('X-Robots-Tag'))))
+    canonical = normalize_url(document.canonical, base=page.final_url) if document.canonical else None
+    return (' '.join(title.split()), ''.join(robots.lower().split()), canonical)
+
+
+def read_head(response, chunk_size=16 * 1024):
+    '''
+    Read a streamed response until the end of its <head>.
+
+    Parameters
+    ----------
+    response (requests.Response): A response opened with stream=True.
+    chunk_size (int): Bytes to read at a time.
+
+    Returns
+    -------
+    tuple: (content, truncated, size) with the bytes up to the </head>, whether
+        the rest of the body was skipped and the body bytes actually read.
+
+    '''
+    scanner = HeadScanner()
+    size = 0
+    chunks = response.iter_content(chunk_size)
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            if scanner.feed(chunk):
+                break
+        else:
+            # The whole body was read without finding the end of the head
+            return bytes(scanner.buffer), False, size
+
+        # A short remainder is cheaper to read than a new connection, and then
+        # the page is complete anyway
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) - response.raw.tell() <= HEAD_DRAIN_LIMIT:
+            for chunk in chunks:
+                size += len(chunk)
+                scanner.buffer += chunk
+            return bytes(scanner.buffer), False, size
+        return bytes(scanner.buffer[:scanner.end]), True, size
+    finally:
+        response.close()
+
+
+class PageFetcher:
+    '''
+    Fetches each URL at most once per User-Agent and remembers the result for
+    the rest of the audit.
+    '''
+
+    def __init__(self):
+        self.pages = {}
+        self.probes = {}
+
+    def fetch(self, url, user_agent=None, head_only=False):
+        '''
+        Return the Page for url and user_agent, downloading it only the first time.
+
+        Parameters
+        ----------
+        url (str): The URL to fetch.
+        user_agent (str, optional): The User-Agent header to send.
+        head_only (bool or str): Whether a page with only the <head> is enough. A head
+            only page is downloaded again in full when the full body is asked for.
+            'probe' is enough with just the headers, see probe_page().
+
+        Returns
+        -------
+        Page: The fetched page.
+
+        '''
+        key = (url, user_agent)
+        page = self.pages.get(key)
+        if head_only == 'probe':
+            if page is None:
+                page = self.probes.get(key) or self.probe(url, [user_agent])[0]
+            return page
+        if page is None or (page.truncated and not head_only):
+            page = self.pages[key] = fetch_page(url, user_agent, head_only=head_only)
+        return page
+
+    def store(self, page):
+        '''
+        Remember a page that was fetched somewhere else, e.g. by the async engine.
+
+        Parameters
+        ----------
+        page (Page): The fetched page.
+
+        '''
+        if page.probe:
+            self.probes[(page.url, page.user_agent)] = page
+        else:
+            self.pages[(page.url, page.user_agent)] = page
+
+    def probe(self, url, user_agents):
+        '''
+        Probe url with every User-Agent concurrently, see probe_page(). Probes
+        already made are not repeated.
+
+        Parameters
+        ----------
+        url (str): The URL to probe.
+        user_agents (iterable of str): The User-Agent headers to send.
+
+        Returns
+        -------
+        list of Page: One probe per User-Agent, in the same order.
+
+        '''
+        user_agents = list(user_agents)
+        missing = [user_agent for user_agent in user_agents if (url, user_agent) not in self.probes]
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                for page in executor.map(lambda user_agent: probe_page(url, user_agent), missing):
+                    self.store(page)
+        return [self.probes[(url, user_agent)] for user_agent in user_agents]
+
+
+# =============================================================================
+# Parsed Document
+# =============================================================================
+
+def default_parser_backend():
+    '''
+    Return the fastest HTML parser backend that is installed.
+
+    Returns
+    -------
+    str: One of 'selectolax', 'lxml' or 'html.parser'.
+
+    '''
+    if SELECTOLAX_AVAILABLE:
+        return 'selectolax'
+    if LXML_AVAILABLE:
+        return 'lxml'
+    return 'html.parser'
+
+
+PARSER_BACKEND = default_parser_backend()
+
+
+class ParsedDocument:
+    '''
+    A page parsed once, with the facts the checks need extracted up front.
+
+    Attributes
+    ----------
+    backend (str): The parser backend that built the document.
+    viewport (str or None): Content of <meta name="viewport">, None if missing.
+    meta_robots (str or None): Content of <meta name="robots">, None if missing.
+    canonical (str or None): Href of <link rel="canonical">, None if missing.
+    has_canonical (bool): Whether a <link rel="canonical"> tag exists.
+    json_ld (list): The decoded JSON-LD blocks. Invalid blocks are skipped.
+    itemtypes (list): The microdata itemtype attribute values.
+    typeofs (list): The RDFa typeof attribute values.
+    parse_time (float): Seconds spent parsing, 0 if rebuilt with from_dict().
+
+    '''
+
+    def __init__(self, content, backend=None):
+        start = time.perf_counter()
+        self.backend = backend or PARSER_BACKEND
+        self.viewport = None
+        self.meta_robots = None
+        self.canonical = None
+        self.has_canonical = False
+        self.json_ld = []
+        self.itemtypes = []
+        self.typeofs = []
+
+        if self.backend == 'selectolax':
+            self._extract_selectolax(content)
+        else:
+            self._extract_soup(content)
+        self.parse_time = time.perf_counter() - start
+
+    def _extract_soup(self, content):
+        soup = BeautifulSoup(content, self.backend)
+
+        viewport_tag = soup.find('meta', attrs={'name': 'viewport'})
+        if viewport_tag is not None:
+            self.viewport = viewport_tag.get('content', '')
+
+        meta_robots = soup.find('meta', attrs={'name': 'robots'})
+        if meta_robots is not None:
+            self.meta_robots = meta_robots.get('content', '')
+
+        canonical_tag = soup.find('link', {'rel': 'canonical'})
+        if canonical_tag is not None:
+            self.has_canonical = True
+            self.canonical = canonical_tag.get('href')
+
+        for script_tag in soup.find_all('script', type='application/ld+json'):
+            self._add_json_ld(script_tag.string)
+
+        self.itemtypes = [tag['itemtype'] for tag in soup.find_all(attrs={"itemtype": True})]
+        self.typeofs = [tag['typeof'] for tag in soup.find_all(attrs={"typeof": True})]
+
+    def _extract_selectolax(self, content):
+        tree = selectolax_parser()(content)
+
+        viewport_tag = tree.css_first('meta[name="viewport"]')
+        if viewport_tag is not None:
+            self.viewport = viewport_tag.attributes.get('content') or ''
+
+        meta_robots = tree.css_first('meta[name="robots"]')
+        if meta_robots is not None:
+            self.meta_robots = meta_robots.attributes.get('content') or ''
+
+        canonical_tag = tree.css_first('link[rel~="canonical"]')
+        if canonical_tag is not None:
+            self.has_canonical = True
+            self.canonical = canonical_tag.attributes.get('href')
+
+        for script_tag in tree.css('script[type="application/ld+json"]'):
+            self._add_json_ld(script_tag.text(deep=False))
+
+        self.itemtypes = [tag.attributes['itemtype'] for tag in tree.css('[itemtype]')]
+        self.typeofs = [tag.attributes['typeof'] for tag in tree.css('[typeof]')]
+
+    FIELDS = ('backend', 'viewport', 'meta_robots', 'canonical', 'has_canonical', 'json_ld',
+              'itemtypes', 'typeofs')
+
+    def to_dict(self):
+        '''Return the extracted facts as a JSON serializable dict.'''
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''Rebuild a document from to_dict() output without parsing anything.'''
+        document = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(document, field, data[field])
+        document.parse_time = 0.0
+        return document
+
+    def _add_json_ld(self, raw):
+        if not raw:
+            return
+        try:
+            self.json_ld.append(json.loads(raw))
+        except json.JSONDecodeError:
+            pass
+
+    def schema_types(self):
+        '''
+        Collect the schema.org types declared as JSON-LD, microdata or RDFa.
+
+        Returns
+        -------
+        list: The distinct types in the order they were found.
+
+        '''
+        schema_types = {}
+
+        # JSON-LD
+        for data in self.json_ld:
+            items = data if isinstance(data, list) else [data]
+            for item in items:
+                if isinstance(item, dict) and '@type' in item:
+                    item_type = item['@type']
+                    if isinstance(item_type, list):
+                        item_type = ', '.join(map(str, item_type))
+                    schema_types[item_type] = None
+
+        # Microdata and RDFa
+        for schema_type in self.itemtypes + self.typeofs:
+            schema_types[schema_type] = None
+
+        return list(schema_types)
+
+
+def parse_document(content, backend=None):
+    '''
+    Parse a page body and return the ParsedDocument as a dict. Module level and
+    picklable, so it can run in a process pool.
+
+    Parameters
+    ----------
+    content (bytes): The page body.
+    backend (str, optional): The parser backend. PARSER_BACKEND if None.
+
+    Returns
+    -------
+    dict: See ParsedDocument.to_dict().
+
+    '''
+    return ParsedDocument(content, backend).to_dict()
+
+
+# =============================================================================
+# Results
+# =============================================================================
+
+class AuditRecord:
+    '''
+    The results of every check for a single URL.
+
+    Checks add their column(s) with set() or update(), or with error() when they
+    failed, so failures are always reported in the check's own column.
+
+    Attributes
+    ----------
+    url (str): The audited URL.
+    values (dict): Maps each report column to its value, starting with 'URL'.
+    failed (set): The columns whose check failed.
+    checks (dict): Maps the name of every check that ran to the columns it wrote.
+    timings (dict): How long the URL took, see run_checks().
+
+    '''
+
+    __slots__ = ('url', 'values', 'failed', 'checks', 'timings')
+
+    def __init__(self, url):
+        self.url = url
+        self.values = {'URL': url}
+        self.failed = set()
+        self.checks = {}
+        self.timings = {}
+
+    def set(self, column, value):
+        self.values[column] = value
+
+    def update(self, values):
+        self.values.update(values)
+
+    def error(self, column, message):
+        self.values[column] = message
+        self.failed.add(column)
+
+    def check_failed(self, name):
+        '''Whether any column written by the check called name failed.'''
+        return any(column in self.failed for column in self.checks.get(name, ()))
+
+    def __getitem__(self, column):
+        return self.values[column]
+
+    def __repr__(self):
+        return f'<AuditRecord {self.url} ({len(self.values)} columns, {len(self.failed)} failed)>'
+
+
+class ResultBuffer:
+    '''
+    Collects AuditRecords column by column and converts them to a DataFrame
+    (or Arrow table) once at the end, instead of concatenating DataFrames for
+    every check of every URL.
+
+    Attributes
+    ----------
+    columns (dict): Maps each report column to the list of its values, one per URL.
+
+    '''
+
+    def __init__(self):
+        self.columns = {'URL': []}
+        self.rows = 0
+
+    def append(self, record):
+        '''
+        Add a record as a new row. Columns the record doesn't have are left empty.
+
+        Parameters
+        ----------
+        record (AuditRecord): The record to add.
+
+        '''
+        values = record.values
+        for column in values:
+            if column not in self.columns:
+                # A column seen for the first time is empty for the previous rows
+                self.columns[column] = [None] * self.rows
+        for column, cells in self.columns.items():
+            cells.append(values.get(column))
+        self.rows += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return self.rows
+
+    def to_dataframe(self):
+        '''
+        Returns
+        -------
+        pandas.DataFrame: The report, one row per URL.
+        '''
+        return pd.DataFrame(self.columns)
+
+    def to_arrow(self):
+        '''
+        Returns
+        -------
+        pyarrow.Table: The report, one row per URL. Needs pyarrow installed.
+        '''
+        import pyarrow
+        return pyarrow.table(self.columns)
+
+
+# =============================================================================
+# Instrumentation
+# =============================================================================
+
+def percentile(values, p):
+    '''
+    The p-th percentile of values (nearest rank), None if there are none.
+    '''
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class TimingSummary:
+    '''
+    Collects the timings of every URL in an audit: p50/p95/p99 per check and
+    for fetches, plus total bytes and retries. Durations are kept in compact
+    arrays of doubles.
+
+    Parameters
+    ----------
+    path (str, optional): JSONL file to write every URL's timing record to.
+
+    '''
+
+    def __init__(self, path=None):
+        self.urls = 0
+        self.checks = {}
+        self.fetches = array.array('d')
+        self.parses = array.array('d')
+        self.bytes = 0
+        self.retries = 0
+        self.file = open(path, 'w', encoding='utf-8') if path else None
+
+    def add(self, record):
+        timings = record.timings
+        if not timings:
+            return
+        self.urls += 1
+        for name, seconds in timings['checks'].items():
+            self.checks.setdefault(name, array.array('d')).append(seconds)
+        for fetch in timings['fetches']:
+            self.fetches.append(fetch['seconds'])
+            if fetch['parse']:
+                self.parses.append(fetch['parse'])
+            self.bytes += fetch['bytes'] or 0
+            self.retries += fetch['retries']
+        if self.file is not None:
+            self.file.write(json.dumps(timings) + '\n')
+
+    def rows(self):
+        '''
+        Returns
+        -------
+        list of tuple: (name, count, p50, p95, p99, total seconds) for every check,
+            then for the fetches and the parsing.
+        '''
+        series = list(self.checks.items()) + [('fetch', self.fetches), ('parse', self.parses)]
+        return [(name, len(values), percentile(values, 50), percentile(values, 95), percentile(values, 99),
+                 sum(values)) for name, values in series if values]
+
+    def __str__(self):
+        lines = [f"{'':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}"]
+        for name, count, p50, p95, p99, total in self.rows():
+            lines.append(f"{name:<28}{count:>8}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}{p99 * 1000:>10.1f}{total:>10.2f}")
+        lines.append(f"{self.urls} URLs, {len(self.fetches)} fetches, {self.bytes / 1024 / 1024:.1f} MiB, "
+                     f"{self.retries} retries")
+        return '\n'.join(lines)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class _NoSpinner:
+    '''Stands in for Halo in quiet mode.'''
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start(self):
+        return self
+
+    def stop(self):
+        return self
+
+    def stop_and_persist(self, *args, **kwargs):
+        return self
+
+
+QUIET = False
+
+
+def set_quiet(quiet=True):
+    '''
+    Turn the per-check output and the spinner off (or back on). Audit
+    summaries still print.
+    '''
+    global QUIET
+    QUIET = quiet
+
+
+def say(*args, **kwargs):
+    '''print() for the per-check output, silent in quiet mode.'''
+    if not QUIET:
+        print(*args, **kwargs)
+
+
+def say_colored(text, color=None, **kwargs):
+    '''
+    say() a termcolor colored() line. Nothing is colored in quiet mode, so
+    termcolor isn't even imported.
+    '''
+    if not QUIET:
+        print(colored(text, color, **kwargs))
+
+
+def spinner(**kwargs):
+    '''A started Halo spinner, or one that does nothing in quiet mode.'''
+    return (_NoSpinner() if QUIET else Halo(**kwargs)).start()
+
+
+@contextlib.contextmanager
+def profiled(profiler='cprofile', output=None):
+    '''
+    Profile the code in the with block.
+
+    Only the calling thread is profiled, so profile serial runs
+    (--concurrency 1) to see the checks themselves.
+
+    Parameters
+    ----------
+    profiler (str): 'cprofile' or 'pyinstrument' (needs the pyinstrument package).
+    output (str, optional): File to save the profile to: pstats data for
+        cProfile, HTML for pyinstrument. The top of the profile is printed if None.
+
+    '''
+    if profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+        profile = Profiler()
+        profile.start()
+        try:
+            yield profile
+        finally:
+            profile.stop()
+            if output:
+                with open(output, 'w', encoding='utf-8') as f:
+                    f.write(profile.output_html())
+            else:
+                print(profile.output_text())
+        return
+
+    import cProfile
+    import pstats
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        if output:
+            profile.dump_stats(output)
+        else:
+            pstats.Stats(profile).sort_stats('cumulative').print_stats(30)
+
+
+# =============================================================================
+# Report Writers
+# =============================================================================
+
+# Columns written by the checks, in report order. Used by the writers that need
+# to know every column up front (CSV header, Parquet schema).
+CHECK_COLUMNS = ['Mobile Friendly', '<bots>', 'Bot Responses', 'Bot Accessibility', 'Indexation', 'No index Meta Tag', 'No index Response Header',
+                 'Canonical', 'Schema.org', '<cwv>']
+
+
+def report_columns():
+    '''
+    Return every column a report can have, in order.
+
+    Returns
+    -------
+    list of str: 'URL' followed by the check columns, one per bot for bot
+        accessibility and one set per PSI strategy for Core Web Vitals.
+
+    '''
+    columns = ['URL']
+    for column in CHECK_COLUMNS:
+        if column == '<bots>':
+            columns.extend(BOT_USER_AGENTS)
+        elif column == '<cwv>':
+            for strategy in PSI_STRATEGIES:
+                columns.extend(cwv_columns(strategy))
+        else:
+            columns.append(column)
+    return columns
+
+
+class ReportWriter:
+    '''
+    Base class for report writers. Records are written as soon as each URL is
+    done, so a crawl that dies half way still leaves the finished rows on disk.
+
+    Writers are context managers:
+
+        with open_writer('report.jsonl') as writer:
+            writer.write(record)
+
+    '''
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self.rows = 0
+
+    def write(self, record):
+        self._write(record.values)
+        self.rows += 1
+
+    def _write(self, values):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONLReportWriter(ReportWriter):
+    '''
+    Writes one JSON object per line and flushes after every URL.
+    '''
+
+    def __init__(self, path, append=False, columns=None):
+        super().__init__(path, append)
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, values):
+        self.file.write(json.dumps(values, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CSVReportWriter(ReportWriter):
+    '''
+    Writes one CSV row per URL with the columns of report_columns() and flushes
+    after every URL.
+    '''
+
+    def __init__(self, path, append=False, columns=None):
+        super().__init__(path, append)
+        self.columns = columns or report_columns()
+        new_file = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction='ignore')
+        if new_file:
+            self.writer.writeheader()
+
+    def _write(self, values):
+        self.writer.writerow(values)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+PARQUET_PART = re.compile(r'part-(\d+)\.parquet')
+
+
+class ParquetReportWriter(ReportWriter):
+    '''
+    Writes the report as a Parquet dataset: a directory with one part file per
+    row group of row_group_size URLs. Every part file is complete on its own,
+    so finished row groups survive a crash. Needs pyarrow installed.
+
+    Parameters
+    ----------
+    path (str): The dataset directory.
+    append (bool): Add part files to an existing dataset instead of replacing it.
+    row_group_size (int): URLs per part file.
+    columns (list of str, optional): The report columns. report_columns() by default.
+
+    '''
+
+    def __init__(self, path, append=False, row_group_size=1000, columns=None):
+        import pyarrow
+        import pyarrow.parquet
+
+        super().__init__(path, append)
+        self._pyarrow = pyarrow
+        self._parquet = pyarrow.parquet
+        self.row_group_size = row_group_size
+        self.columns = columns or report_columns()
+        self.schema = pyarrow.schema([(column, pyarrow.string()) for column in self.columns])
+        self.parts = 0
+        self._pending = {column: [] for column in self.columns}
+        self._pending_rows = 0
+
+        os.makedirs(path, exist_ok=True)
+        existing = [name for name in os.listdir(path) if name.endswith('.parquet')]
+        if append:
+            # Continue numbering after the last part of a previous run, a count
+            # would overwrite it if an earlier part was removed
+            numbers = [int(match.group(1)) for match in map(PARQUET_PART.fullmatch, existing) if match]
+            self.parts = max(numbers, default=-1) + 1
+        else:
+            for name in existing:
+                os.remove(os.path.join(path, name))
+
+    def _write(self, values):
+        for column, cells in self._pending.items():
+            value = values.get(column)
+            cells.append(None if value is None else str(value))
+        self._pending_rows += 1
+        if self._pending_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending_rows:
+            return
+        table = self._pyarrow.table(self._pending, schema=self.schema)
+        part = os.path.join(self.path, f'part-{self.parts:05d}.parquet')
+        # Write to a temporary name first so a crash never leaves a half written part
+        self._parquet.write_table(table, part + '.tmp')
+        os.replace(part + '.tmp', part)
+        self.parts += 1
+        self._pending = {column: [] for column in self.columns}
+        self._pending_rows = 0
+
+    def close(self):
+        self._flush()
+
+
+class ExcelReportWriter(ReportWriter):
+    '''
+    Keeps every row in memory and saves the Excel file when closed. This is the
+    classic data.xlsx output, fine for small audits. Use JSONL, CSV or Parquet
+    for large crawls and convert_report() to get an Excel file at the end.
+    '''
+
+    def __init__(self, path, append=False, columns=None):
+        super().__init__(path, append)
+        self.buffer = ResultBuffer()
+        if append and os.path.exists(path):
+            for values in pd.read_excel(path).to_dict('records'):
+                record = AuditRecord(values['URL'])
+                record.update(values)
+                self.buffer.append(record)
+
+    def write(self, record):
+        self.buffer.append(record)
+        self.rows += 1
+
+    def close(self):
+        self.buffer.to_dataframe().to_excel(self.path, index=False)
+
+
+REPORT_WRITERS = {
+    '.jsonl': JSONLReportWriter,
+    '.csv': CSVReportWriter,
+    '.parquet': ParquetReportWriter,
+    '.xlsx': ExcelReportWriter,
+}
+
+
+def open_writer(path, append=False, columns=None):
+    '''
+    Open the report writer that matches the file extension of path.
+
+    Parameters
+    ----------
+    path (str): The report file, ending in .jsonl, .csv, .parquet or .xlsx.
+    append (bool): Add to an existing report instead of replacing it.
+    columns (list of str, optional): The columns, for the formats that need them
+        up front. report_columns() by default.
+
+    Returns
+    -------
+    ReportWriter: The writer.
+
+    '''
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in REPORT_WRITERS:
+        raise ValueError(f"Unknown report format '{extension}'. Use one of: {', '.join(REPORT_WRITERS)}")
+    return REPORT_WRITERS[extension](path, append=append, columns=columns)
+
+
+def read_report(path):
+    '''
+    Load a report written by any of the report writers into a DataFrame.
+
+    A URL that was checked again by a resumed run appears more than once in the
+    file, only its latest row is kept.
+    '''
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.jsonl':
+        df = pd.read_json(path, lines=True)
+    elif extension == '.csv':
+        df = pd.read_csv(path)
+    elif extension == '.parquet':
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_excel(path)
+    return df.drop_duplicates('URL', keep='last').reset_index(drop=True)
+
+
+def convert_report(path, excel_path):
+    '''
+    Convert a finished JSONL, CSV or Parquet report to an Excel file.
+
+    Parameters
+    ----------
+    path (str): The report to convert.
+    excel_path (str): The Excel file to write.
+
+    '''
+    read_report(path).to_excel(excel_path, index=False)
+
+
+
+#Function that runs all other checklist functions
+def checklist(url, output='data.xlsx', checks=None):
+    '''
+    Run the checks on a single URL.
+
+    Parameters
+    ----------
+    url (str): The URL to check. https:// is added if it has no scheme.
+    output (str, optional): Report file to save to, .xlsx, .jsonl, .csv or .parquet. Nothing is saved if None.
+    checks (list of str, optional): Names of the checks to run, see select_checks(). All of them if None.
+
+    Returns
+    -------
+    pandas.DataFrame: A single row DataFrame with the result of every check.
+
+    '''
+    cached = cache_stats()
+    record = check_url(url, checks=checks)
+    print_cache_stats(cached)
+
+    buffer = ResultBuffer()
+    buffer.append(record)
+    df = buffer.to_dataframe()
+    
+    if output:
+        with open_writer(output) as writer:
+            writer.write(record)
+    
+    say(df)
+
+    return df
+
+
+def with_scheme(url):
+    '''
+    Add https:// to a URL that has no scheme.
+    '''
+    if not url.startswith(("https://", "http://")):
+        url = "https://" + url
+    return url
+
+
+def check_url(url, record=None, checks=None):
+    '''
+    Run every check on a single URL, showing a spinner while it runs.
+
+    Parameters
+    ----------
+    url (str): The URL to check. https:// is added if it has no scheme.
+    record (AuditRecord, optional): Record with results from an earlier run to add to.
+    checks (list of str, optional): Names of the checks to run. All of them if None.
+
+    Returns
+    -------
+    AuditRecord: The result of every check.
+
+    '''
+    
+    #making sure URL has https
+    url = with_scheme(url)
+    
+    #creating the record where we will store all checks
+    if record is None:
+        record = AuditRecord(url)
+    
+    # Start the spinner animation
+    progress = spinner(text='', spinner='dots')
+
+    stats = get_session().stats.copy()
+
+    record = run_checks(url, record, checks=checks)
+    
+    # Stop the spinner
+    progress.stop_and_persist(symbol='🤖'.encode('utf-8'), text='All Checks have been finalized!')
+    say(f"🔌 {get_session().stats - stats}")
+
+    return record
+
+
+# =============================================================================
+# Check Registry
+# =============================================================================
+
+# What a check reads, from the cheapest to the most expensive to get. The page
+# is only fetched and parsed as far as the selected checks need it.
+HEADERS = 'headers'  # the response status and headers, a HEAD request is enough
+HEAD = 'head'        # the parsed <head>, the download stops after the </head>
+DOM = 'dom'          # the whole parsed page
+API = 'api'          # an external API, the page itself isn't fetched
+
+PAGE_INPUTS = [HEADERS, HEAD, DOM]
+
+
+class Check:
+    '''
+    A check the checklist can run, and what it needs to run.
+
+    Parameters
+    ----------
+    name (str): The check's name. Unless function is given, it is also the name
+        of the check function, looked up on every run so it can be swapped out
+        (e.g. in benchmarks).
+    column (str): The report column an unexpected error is recorded in.
+    inputs (str): What the check reads: HEADERS, HEAD, DOM or API.
+    argument (str, optional): What the check is called with besides url and
+        record: 'page' (the fetched page), 'fetcher' (the PageFetcher, for checks
+        that fetch on their own) or None. Defaults to 'page' unless inputs is API.
+    function (callable, optional): The check function, for checks defined
+        outside this script.
+
+    '''
+
+    __slots__ = ('name', 'column', 'inputs', 'argument', 'function')
+
+    def __init__(self, name, column, inputs, argument='page', function=None):
+        if inputs not in PAGE_INPUTS and inputs != API:
+            raise ValueError(f'Unknown check input {inputs!r}')
+        self.name = name
+        self.column = column
+        self.inputs = inputs
+        self.argument = None if inputs == API else argument
+        self.function = function
+
+    def run(self, url, record, fetcher, page_mode):
+        '''
+        Run the check on url and return the record with its results.
+        '''
+        check = self.function or globals()[self.name]
+        if self.argument == 'page':
+            return check(url, record, fetcher.fetch(url, head_only=page_mode))
+        if self.argument == 'fetcher':
+            return check(url, record, fetcher)
+        return check(url, record)
+
+    def __repr__(self):
+        return f'<Check {self.name} ({self.inputs})>'
+
+
+# Every check in report order
+CHECKS = [
+    Check('mobile_friendly', 'Mobile Friendly', HEAD),
+    Check('bot_accessibility', 'Bot Accessibility', HEADERS, argument='fetcher'),
+    Check('indexation_status', 'Indexation', API),
+    Check('robots_meta_tag', 'No index Meta Tag', HEAD),
+    Check('check_x_robots_tag_noindex', 'No index Response Header', HEADERS),
+    Check('check_canonical', 'Canonical', HEAD),
+    Check('check_schema_org', 'Schema.org', DOM),
+    Check('core_web_vitals', 'Core Web Vitals', API),
+]
+
+CHECK_NAMES = [check.name for check in CHECKS]
+
+
+def register_check(check, columns=()):
+    '''
+    Add a check to the checklist, after the built-in ones.
+
+    Parameters
+    ----------
+    check (Check): The check. A check with the same name is replaced.
+    columns (list of str, optional): The report columns it writes, so the
+        writers that need every column up front know about them.
+
+    '''
+    for i, registered in enumerate(CHECKS):
+        if registered.name == check.name:
+            CHECKS[i] = check
+            break
+    else:
+        CHECKS.append(check)
+        CHECK_NAMES.append(check.name)
+    CHECK_COLUMNS.extend(column for column in columns if column not in CHECK_COLUMNS)
+
+
+def select_checks(include=None, exclude=None):
+    '''
+    Pick the checks to run by name or by input, e.g. exclude=['api'] skips
+    every check that calls an external API.
+
+    Parameters
+    ----------
+    include (list of str, optional): Check names or inputs to run. All checks if None.
+    exclude (list of str, optional): Check names or inputs not to run.
+
+    Returns
+    -------
+    list of str or None: The names of the selected checks in report order,
+        None when that is every check.
+
+    '''
+    def matching(names):
+        selected = set()
+        for name in names:
+            found = {check.name for check in CHECKS if name in (check.name, check.inputs)}
+            if not found:
+                raise ValueError(f"Unknown check {name!r}, use one of: {', '.join(CHECK_NAMES + PAGE_INPUTS + [API])}")
+            selected |= found
+        return selected
+
+    included = matching(include) if include else set(CHECK_NAMES)
+    excluded = matching(exclude) if exclude else set()
+    if not include and not excluded:
+        return None
+    return [name for name in CHECK_NAMES if name in included and name not in excluded]
+
+
+def selected_checks(checks=None):
+    '''
+    Return the registered Checks named in checks (all of them if None), in report order.
+    '''
+    return [check for check in CHECKS if checks is None or check.name in checks]
+
+
+def page_mode(checks=None):
+    '''
+    How much of the page the checks (all of them if None) need, as the
+    head_only argument of PageFetcher.fetch(): False for the whole page, True
+    for the head, 'probe' for just the headers and None for nothing at all.
+    '''
+    inputs = {check.inputs for check in selected_checks(checks) if check.argument == 'page'}
+    if DOM in inputs:
+        return False
+    if HEAD in inputs:
+        return True
+    if HEADERS in inputs:
+        return 'probe'
+    return None
+
+
+def run_checks(url, record=None, fetcher=None, checks=None):
+    '''
+    Run the checks on a URL and add the results to its record.
+
+    The page is only downloaded (and parsed) as far as the selected checks need,
+    so re-running e.g. core_web_vitals alone doesn't fetch the page again. The
+    checks that don't read the page (external APIs and bot probes) run in their
+    own threads while the page is fetched and the page checks run.
+
+    Parameters
+    ----------
+    url (str): The URL to check.
+    record (AuditRecord, optional): The record to add the results to. A new one is created if not given.
+    fetcher (PageFetcher, optional): Fetcher holding pages that were already downloaded.
+    checks (list of str, optional): Names of the checks to run. All of them if None.
+
+    Returns
+    -------
+    AuditRecord: The URL's record.
+
+    '''
+    if record is None:
+        record = AuditRecord(url)
+
+    # Download the page once, every check below works on this same response
+    if fetcher is None:
+        fetcher = PageFetcher()
+    mode = page_mode(checks)
+    selected = selected_checks(checks)
+    started = time.perf_counter()
+    check_times = {}
+
+    def run(check):
+        # Every check writes to a record of its own, so checks running at the
+        # same time don't mix their columns up
+        result = AuditRecord(url)
+        start = time.perf_counter()
+        try:
+            if check.argument == 'page':
+                # The download and the parse are timed with the fetch, not as
+                # part of whichever check reads the document first
+                page = fetcher.fetch(url, head_only=mode)
+                if mode in (True, False) and page.error is None:
+                    page.document
+                start = time.perf_counter()
+            result = check.run(url, result, fetcher, mode)
+        except Exception as e:
+            say(f"{check.column} check failed with error: {e}🚫🚫🚫🚫")
+            result.error(check.column, f"{check.column} check failed with error: {e} ")
+        check_times[check.name] = time.perf_counter() - start
+        return result
+
+    #Checklist functions starts here
+    independent = [check for check in selected if check.argument != 'page']
+    with ThreadPoolExecutor(max_workers=max(len(independent), 1)) as executor:
+        futures = {check.name: executor.submit(run, check) for check in independent}
+        results = {check.name: run(check) for check in selected if check.argument == 'page'}
+        results.update((name, future.result()) for name, future in futures.items())
+
+    # Merge in report order, whatever order the checks finished in
+    for check in selected:
+        result = results[check.name]
+        columns = [column for column in result.values if column != 'URL']
+        record.update({column: result.values[column] for column in columns})
+        record.failed.difference_update(columns)
+        record.failed.update(result.failed)
+        record.checks[check.name] = columns
+
+    record.timings = {
+        'url': url,
+        'total': time.perf_counter() - started,
+        'checks': {check.name: check_times[check.name] for check in selected},
+        'fetches': [fetch_timing(page) for page in itertools.chain(fetcher.pages.values(), fetcher.probes.values())],
+    }
+    return record
+
+
+def fetch_timing(page):
+    '''
+    The timing record of one fetch: wall time, time to the response headers,
+    body bytes, retries and parse time.
+    '''
+    document = page._document
+    return {
+        'user_agent': page.user_agent,
+        'status': page.status_code,
+        'seconds': page.download_time,
+        'ttfb': page.elapsed,
+        'bytes': page.size,
+        'retries': page.retries,
+        'cached': page.from_cache,
+        'probe': page.probe,
+        'parse': document.parse_time if document is not None else None,
+        'error': str(page.error) if page.error is not None else None,
+    }
+
+
+# =============================================================================
+# Checkpoints
+# =============================================================================
+
+class CheckpointStore:
+    '''
+    SQLite store of finished checks, keyed by run id, URL and check name.
+
+    A batch audit saves every URL's results as soon as it is done. Running the
+    same run id again skips the checks that already succeeded and only runs
+    the ones that failed or never ran, without fetching anything for the rest.
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+    run_id (str): Name of the audit run the results belong to.
+
+    '''
+
+    def __init__(self, path, run_id='default'):
+        self.path = path
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        # Worker processes may share the store, so wait for each other's writes
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                check_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                results TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, url, check_name)
+            )""")
+        self.connection.commit()
+
+    def has_results(self):
+        '''Whether this run already saved anything.'''
+        with self._lock:
+            row = self.connection.execute('SELECT 1 FROM checkpoints WHERE run_id = ? LIMIT 1',
+                                          (self.run_id,)).fetchone()
+        return row is not None
+
+    def save(self, record):
+        '''
+        Save the result of every check in record that ran in this session.
+
+        Parameters
+        ----------
+        record (AuditRecord): The URL's record.
+
+        '''
+        now = time.time()
+        rows = []
+        for name, columns in record.checks.items():
+            status = 'failed' if record.check_failed(name) else 'ok'
+            results = json.dumps({column: record.values.get(column) for column in columns}, ensure_ascii=False)
+            rows.append((self.run_id, record.url, name, status, results, now))
+
+        with self._lock:
+            self.connection.executemany('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.connection.commit()
+
+    def resume(self, url, checks=None):
+        '''
+        Prepare a URL for this run.
+
+        Parameters
+        ----------
+        url (str): The URL to check.
+        checks (list of str, optional): The checks wanted. All of them if None.
+
+        Returns
+        -------
+        tuple: (record, pending). record holds the results of every check that
+            already succeeded, so the report row stays complete. pending lists the
+            wanted checks still to run, it is empty when the URL is done.
+
+        '''
+        wanted = CHECK_NAMES if checks is None else checks
+        record = AuditRecord(url)
+
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT check_name, status, results FROM checkpoints WHERE run_id = ? AND url = ?',
+                (self.run_id, url)).fetchall()
+        # Keep the report's column order whatever order the checks were saved in
+        order = {name: i for i, name in enumerate(CHECK_NAMES)}
+        rows.sort(key=lambda row: order.get(row[0], len(order)))
+
+        done = {name for name, status, _ in rows if status == 'ok'}
+        pending = [name for name in wanted if name not in done]
+
+        # Failed checks that are not re-run this time keep their error message
+        for name, status, results in rows:
+            if name not in pending:
+                values = json.loads(results)
+                record.update(values)
+                if status == 'failed':
+                    record.checks[name] = list(values)
+                    record.failed.update(values)
+
+        return record, pending
+
+    def failed_urls(self, checks=None):
+        '''
+        Yield the URLs of this run that have a failed check.
+
+        Parameters
+        ----------
+        checks (list of str, optional): Only look at these checks, e.g. ['core_web_vitals'].
+
+        '''
+        query = 'SELECT DISTINCT url FROM checkpoints WHERE run_id = ? AND status = ?'
+        params = [self.run_id, 'failed']
+        if checks:
+            query += f" AND check_name IN ({', '.join('?' * len(checks))})"
+            params.extend(checks)
+
+        with self._lock:
+            urls = [url for (url,) in self.connection.execute(query, params)]
+        yield from urls
+
+    def close(self):
+        self.connection.close()
+
+
+# =============================================================================
+# Batch Audits
+# =============================================================================
+
+def read_url_list(path):
+    '''
+    Yield the URLs in a text file, one per line. Blank lines and lines starting
+    with # are skipped.
+
+    Parameters
+    ----------
+    path (str): The file to read, or '-' to read from stdin.
+
+    Yields
+    ------
+    str: Each URL in the file.
+
+    '''
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _open_sitemap(location):
+    '''
+    Open a sitemap URL or local file as a binary stream, un-gzipping .gz files.
+    '''
+    if location.startswith(('https://', 'http://')):
+        response = get_session().get(location, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        stream = response.raw
+    else:
+        stream = open(location, 'rb')
+
+    if location.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def iter_sitemap_urls(location, seen=None):
+    '''
+    Yield the page URLs of an XML sitemap. Sitemap indexes are followed
+    recursively, each sitemap once, so indexes that list themselves or each
+    other don't loop forever. The XML is read as a stream, so large sitemaps
+    never have to fit in memory.
+
+    Parameters
+    ----------
+    location (str): The sitemap URL or local file path.
+    seen (set, optional): The sitemaps already read, normalized. Filled in
+        while following an index.
+
+    Yields
+    ------
+    str: Each <loc> of the sitemap.
+
+    '''
+    if seen is None:
+        seen = set()
+    seen.add(sitemap_key(location))
+    stream = _open_sitemap(location)
+    try:
+        root = None
+        child_sitemaps = []
+        for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = element
+                continue
+            if event != 'end':
+                continue
+
+            # Strip the XML namespace from the tag
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag not in ('url', 'sitemap'):
+                continue
+
+            loc = next((child.text.strip() for child in element
+                        if child.tag.rsplit('}', 1)[-1] == 'loc' and child.text), None)
+            if loc:
+                if tag == 'url':
+                    yield loc
+                else:
+                    child_sitemaps.append(loc)
+
+            # Drop the parsed elements so memory stays flat
+            root.clear()
+    finally:
+        stream.close()
+
+    for child_sitemap in child_sitemaps:
+        if sitemap_key(child_sitemap) not in seen:
+            yield from iter_sitemap_urls(child_sitemap, seen)
+
+
+def sitemap_key(location):
+    '''
+    A sitemap URL normalized, or a local sitemap's absolute path, so the same
+    sitemap written two ways is only read once.
+    '''
+    if '://' in location:
+        return normalize_url(location)
+    return os.path.abspath(location)
+
+
+def plan_audit(urls, checkpoint=None, checks=None, lookahead=100):
+    '''
+    Yield what is left to do for each URL.
+
+    URLs are read lookahead at a time, and the ones that will get an
+    indexation check are announced to the IndexationChecker so they can be
+    looked up in batches per host.
+
+    Parameters
+    ----------
+    urls (iterable of str): The URLs to check.
+    checkpoint (CheckpointStore, optional): Store with the results of earlier runs.
+    checks (list of str, optional): Names of the checks to run. All of them if None.
+    lookahead (int): URLs read ahead of the one being yielded.
+
+    Yields
+    ------
+    tuple: (url, record, checks) for every URL that still has checks to run.
+
+    '''
+    urls = iter(urls)
+    while True:
+        jobs = []
+        for url in itertools.islice(urls, lookahead):
+            url = with_scheme(url)
+            if checkpoint is None:
+                jobs.append((url, AuditRecord(url), checks))
+                continue
+
+            record, pending = checkpoint.resume(url, checks)
+            if pending:
+                jobs.append((url, record, pending))
+        if not jobs:
+            return
+
+        get_indexation_checker().expect(
+            url for url, _, pending in jobs if pending is None or 'indexation_status' in pending)
+        get_psi_client().expect(
+            url for url, _, pending in jobs if pending is None or 'core_web_vitals' in pending)
+        yield from jobs
+
+
+def audit(urls, output='data.xlsx', collect=True, checkpoint=None, checks=None, timings=None):
+    '''
+    Run the checklist over many URLs and build one report row per URL.
+
+    Parameters
+    ----------
+    urls (iterable of str): The URLs to check.
+    output (str, optional): Report file (.xlsx, .jsonl, .csv or .parquet). Rows are
+        written as each URL finishes. Nothing is saved if None.
+    collect (bool): Also keep every row in memory and return them. Turn it off
+        for large crawls so memory stays flat.
+    checkpoint (CheckpointStore, optional): Save finished checks here and skip
+        the ones an earlier run of the same run id already finished. The report
+        is then appended to, with only the URLs that were (re)checked.
+    checks (list of str, optional): Names of the checks to run. All of them if None.
+    timings (str or TimingSummary, optional): JSONL file to write every URL's timing
+        record to, or a TimingSummary to collect them in. A p50/p95/p99 summary per
+        check is printed at the end either way.
+
+    Returns
+    -------
+    pandas.DataFrame or None: The report, one row per URL, if collect is True.
+
+    '''
+    stats = get_session().stats.copy()
+    cached = cache_stats()
+    summary = timings if isinstance(timings, TimingSummary) else TimingSummary(timings)
+
+    append = checkpoint is not None and checkpoint.has_results()
+    buffer = ResultBuffer() if collect else None
+    with (open_writer(output, append=append) if output else contextlib.nullcontext()) as writer:
+        for url, record, pending in plan_audit(urls, checkpoint, checks):
+            record = check_url(url, record, pending)
+            if checkpoint is not None:
+                checkpoint.save(record)
+            if writer is not None:
+                writer.write(record)
+            if buffer is not None:
+                buffer.append(record)
+            summary.add(record)
+
+    summary.close()
+    print(f"🔌 Audit total: {get_session().stats - stats}")
+    print_cache_stats(cached)
+    print(f"⏱️ Timings:\n{summary}")
+
+    return buffer.to_dataframe() if buffer is not None else None
+
+
+# =============================================================================
+# Async Engine
+# =============================================================================
+
+class AsyncAuditEngine:
+    '''
+    Runs the checklist over many URLs at once with asyncio.
+
+    Requests go through a worker thread pool, so the checks keep using requests.
+    In-flight requests are capped globally and per host. Every fetch has a
+    timeout and failed or throttled fetches are retried with exponential backoff,
+    waiting in the event loop instead of a thread. The requests the checks send
+    themselves use the shared session's timeout and retries.
+    The bot accessibility probes for one URL are fetched concurrently.
+
+    With parse_workers, page bodies are parsed in a process pool instead of
+    the checks' threads, so parsing isn't limited by the GIL. Network I/O stays
+    in the event loop and thread pool; at most parse_workers * 2 bodies wait
+    for a parser at once, and no more than concurrency URLs are in flight, so
+    memory stays bounded.
+
+    Parameters
+    ----------
+    concurrency (int): Maximum requests in flight overall.
+    per_host (int): Maximum requests in flight to the same host.
+    timeout (float, optional): Seconds to wait for a server before giving up. The session's if None.
+    retries (int, optional): How many times a failed fetch is retried. The session's if None.
+    backoff (float, optional): Seconds to wait before the first retry, doubled every retry.
+        The session's if None.
+    parse_workers (int): Processes to parse pages in. 0 parses in the check threads.
+
+    '''
+
+    def __init__(self, concurrency=20, per_host=4, timeout=None, retries=None, backoff=None, parse_workers=0):
+        session = get_session()
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = session.retries if retries is None else retries
+        self.backoff = session.backoff if backoff is None else backoff
+        self.parse_workers = parse_workers
+        self._global_limit = None
+        self._host_limits = {}
+        self._parse_pool = None
+        self._parse_limit = None
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def fetch(self, url, user_agent=None, head_only=False):
+        '''
+        Fetch a page while respecting the global and per host limits.
+
+        Parameters
+        ----------
+        url (str): The URL to fetch.
+        user_agent (str, optional): The User-Agent header to send.
+        head_only (bool or str): Stop downloading after the </head>, see fetch_page(),
+            or 'probe' to only send a HEAD request, see probe_page().
+
+        Returns
+        -------
+        Page: The fetched page. Errors are stored on the page like fetch_page does.
+
+        '''
+        for attempt in range(self.retries + 1):
+            async with self._global_limit, self._host_limit(url):
+                # Retried here, so the backoff doesn't hold a thread or a host slot
+                if head_only == 'probe':
+                    page = await asyncio.to_thread(probe_page, url, user_agent, self.timeout, None, 0)
+                else:
+                    page = await asyncio.to_thread(fetch_page, url, user_agent, self.timeout, None, head_only, 0)
+
+            page.retries = attempt
+            if page.error is None and page.status_code not in RETRY_STATUS_CODES:
+                break
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        return page
+
+    async def parse(self, page):
+        '''
+        Parse a page in the process pool and attach the document to it.
+
+        Parameters
+        ----------
+        page (Page): A fetched page.
+
+        '''
+        async with self._parse_limit:
+            data = await asyncio.get_running_loop().run_in_executor(
+                self._parse_pool, parse_document, page.content, PARSER_BACKEND)
+        page.set_document(ParsedDocument.from_dict(data))
+
+    async def audit_url(self, url, record=None, checks=None):
+        '''
+        Fetch a URL and all its bot probes concurrently, then run the checks.
+
+        Parameters
+        ----------
+        url (str): The URL to check.
+        record (AuditRecord, optional): Record with results from an earlier run to add to.
+        checks (list of str, optional): Names of the checks to run. All of them if None.
+
+        Returns
+        -------
+        AuditRecord: The result of every check.
+
+        '''
+        url = with_scheme(url)
+        if record is None:
+            record = AuditRecord(url)
+        mode = page_mode(checks)
+
+        # Only download what the selected checks will use. Bots only need the
+        # status, and the page only as much as the page checks read.
+        downloads = []
+        if mode is not None:
+            downloads.append((None, mode))
+        if any(check.argument == 'fetcher' for check in selected_checks(checks)):
+            bot_mode = 'probe' if BOT_PROBE == 'head' else True
+            downloads.extend((user_agent, bot_mode) for user_agent in BOT_USER_AGENTS.values())
+
+        fetcher = PageFetcher()
+        pages = await asyncio.gather(*(self.fetch(url, user_agent, head_only)
+                                       for user_agent, head_only in downloads))
+        for page in pages:
+            fetcher.store(page)
+
+        page = fetcher.pages.get((url, None))
+        if self._parse_pool is not None and page is not None and page.error is None and page._document is None:
+            await self.parse(page)
+
+        # The checks themselves are blocking (parsing, PSI and Google lookups)
+        async with self._global_limit:
+            return await asyncio.to_thread(run_checks, url, record, fetcher, checks)
+
+    @staticmethod
+    def failed_record(url, record, checks, error):
+        '''
+        Return the record of a URL whose audit raised, with the error in the
+        column of every check that was to run.
+        '''
+        url = with_scheme(url)
+        record = record if record is not None else AuditRecord(url)
+        for check in selected_checks(checks):
+            record.error(check.column, f"{check.column} check failed with error: {error} ")
+        return record
+
+    async def run(self, urls, on_result=None):
+        '''
+        Audit every URL and return the records in the same order as urls.
+
+        An error while auditing a URL is reported in that URL's columns. An
+        error from on_result (e.g. the report can't be written) or from the
+        parsing processes stops the run and is raised.
+
+        Parameters
+        ----------
+        urls (iterable): The URLs to check, or (url, record, checks) tuples
+            like plan_audit() yields.
+        on_result (callable, optional): Called with each AuditRecord as soon as
+            its URL is done. Records are then not kept, so memory stays flat.
+
+        Returns
+        -------
+        list of AuditRecord: One record per URL. Empty when on_result is given.
+
+        '''
+        self._global_limit = asyncio.Semaphore(self.concurrency)
+        self._host_limits = {}
+
+        # One thread per allowed in-flight request
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+
+        # A fixed set of workers pulls from a bounded queue, so huge URL lists
+        # never turn into huge numbers of pending tasks
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        results = {}
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                index, job = item
+                url, record, checks = job if isinstance(job, tuple) else (job, None, None)
+                try:
+                    record = await self.audit_url(url, record, checks)
+                except BrokenExecutor:
+                    # The parsing processes are gone, every URL after this one would fail too
+                    raise
+                except Exception as e:
+                    record = self.failed_record(url, record, checks, e)
+                # A failing writer or checkpoint stops the whole run, see below
+                if on_result is not None:
+                    on_result(record)
+                else:
+                    results[index] = record
+
+        async def produce(workers):
+            for item in enumerate(urls):
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+
+        if self.parse_workers:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+            self._parse_limit = asyncio.Semaphore(self.parse_workers * 2)
+
+        try:
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            tasks = [asyncio.create_task(produce(workers)), *workers]
+            # If any task dies the others would wait on the queue forever, so
+            # they are cancelled and the error goes to the caller
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            failed = next((task for task in done if task.exception() is not None), None)
+            if failed is not None:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise failed.exception()
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+
+        return [results[index] for index in sorted(results)]
+
+
+def audit_async(urls, output='data.xlsx', collect=True, checkpoint=None, checks=None, timings=None,
+                **engine_options):
+    '''
+    Like audit(), but checks many URLs at the same time with AsyncAuditEngine.
+
+    Parameters
+    ----------
+    urls (iterable of str): The URLs to check.
+    output (str, optional): Report file (.xlsx, .jsonl, .csv or .parquet). Rows are
+        written as each URL finishes, in completion order. Nothing is saved if None.
+    collect (bool): Also keep every row in memory and return them.
+    checkpoint (CheckpointStore, optional): Save finished checks here and skip
+        the ones an earlier run of the same run id already finished.
+    checks (list of str, optional): Names of the checks to run. All of them if None.
+    timings (str or TimingSummary, optional): See audit().
+    **engine_options: Passed to AsyncAuditEngine (concurrency, per_host, timeout, ...).
+
+    Returns
+    -------
+    pandas.DataFrame or None: The report, one row per URL, if collect is True.
+
+    '''
+    stats = get_session().stats.copy()
+    cached = cache_stats()
+    summary = timings if isinstance(timings, TimingSummary) else TimingSummary(timings)
+
+    engine = AsyncAuditEngine(**engine_options)
+    buffer = ResultBuffer() if collect else None
+
+    def on_result(record):
+        if checkpoint is not None:
+            checkpoint.save(record)
+        if writer is not None:
+            writer.write(record)
+        if buffer is not None:
+            buffer.append(record)
+        summary.add(record)
+
+    append = checkpoint is not None and checkpoint.has_results()
+    with (open_writer(output, append=append) if output else contextlib.nullcontext()) as writer:
+        asyncio.run(engine.run(plan_audit(urls, checkpoint, checks), on_result=on_result))
+
+    summary.close()
+    print(f"🔌 Audit total: {get_session().stats - stats}")
+    print_cache_stats(cached)
+    print(f"⏱️ Timings:\n{summary}")
+
+    return buffer.to_dataframe() if buffer is not None else None
+
+
+# =============================================================================
+# Site Graph
+# =============================================================================
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+PERCENT_ESCAPE = re.compile(r'%[0-9a-fA-F]{2}')
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize_url(url, base=None):
+    '''
+    Write a URL in a normal form, so URLs that only differ in how they are
+    written compare equal: the scheme and host are lowercased, default ports,
+    fragments and trailing slashes are dropped, percent escapes are uppercased
+    and query parameters are sorted.
+
+    Parameters
+    ----------
+    url (str): The URL, absolute or relative to base.
+    base (str, optional): The URL of the page the URL was found on.
+
+    Returns
+    -------
+    str: The normalized URL.
+
+    '''
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower() or 'https'
+
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f'[{host}]'
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f'{host}:{port}'
+
+    path = PERCENT_ESCAPE.sub(lambda match: match.group().upper(), parts.path)
+    path = path.rstrip('/') or '/'
+    query = '&'.join(sorted(param for param in parts.query.split('&') if param))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def url_key(url, base=None):
+    '''
+    The normalized URL without its scheme, so http:// and https:// versions
+    of a page compare equal. Used to compare and index URLs.
+    '''
+    return normalize_url(url, base).split('://', 1)[-1]
+
+
+# Words and tags for content_simhash(). Scripts, styles and comments aren't content.
+NOT_CONTENT = re.compile(rb'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+ANY_TAG = re.compile(rb'<[^>]*>')
+WORD = re.compile(r'\w+')
+
+
+def content_simhash(content, shingle=3):
+    '''
+    The 64 bit SimHash of a page's text. Pages with nearly the same text get
+    hashes that differ in only a few bits.
+
+    Parameters
+    ----------
+    content (bytes): The page's HTML.
+    shingle (int): Words per feature.
+
+    Returns
+    -------
+    int or None: The hash, None when the page has no text.
+
+    '''
+    text = ANY_TAG.sub(b' ', NOT_CONTENT.sub(b' ', content)).decode('utf-8', 'replace').lower()
+    words = WORD.findall(text)
+    features = {' '.join(words[i:i + shingle]) for i in range(max(len(words) - shingle + 1, 1 if words else 0))}
+    if not features:
+        return None
+
+    # Every feature votes on every bit, the hash keeps the bits most features set
+    digests = b''.join(hashlib.blake2b(feature.encode(), digest_size=8).digest() for feature in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(-1, 64)
+    votes = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(votes).tobytes(), 'big')
+
+
+def _signed(value):
+    # SQLite integers are signed 64 bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class SiteGraph:
+    '''
+    SQLite index of the site's pages for analyze_site_graph(): every audited
+    page's status, whether it is noindex, its canonical target and the SimHash
+    of its content.
+
+    URLs are normalized once with url_key() and interned to integer ids, and
+    canonicals are stored as ids, so the graph stays small. Everything lives
+    in the database, only a bounded cache of recent ids and the pages not yet
+    written are kept in memory, so it scales to millions of URLs. Pages are
+    written batch_size at a time, call flush() or close() when done. Worker
+    processes can share the file.
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+    distance (int): Most bits two SimHashes may differ in for the pages to count
+        as near duplicates. The hash is split in distance + 1 bands, so near
+        duplicates share at least one band exactly.
+    cache_size (int): URL ids kept in memory.
+    batch_size (int): Pages written per transaction.
+
+    '''
+
+    def __init__(self, path, distance=3, cache_size=100000, batch_size=500):
+        self.path = path
+        self.distance = distance
+        self.bands = distance + 1
+        self.band_bits = 64 // self.bands
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._ids = collections.OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                status INTEGER NOT NULL,
+                noindex INTEGER NOT NULL,
+                canonical INTEGER,
+                simhash INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS pages_canonical ON pages (canonical);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                PRIMARY KEY (band, value, id)
+            ) WITHOUT ROWID;""")
+        self.connection.commit()
+
+    def intern(self, url):
+        '''
+        Return the id of a URL, adding it to the index the first time.
+        '''
+        key = url_key(url)
+        id = self._ids.get(key)
+        if id is not None:
+            self._ids.move_to_end(key)
+            return id
+        self.connection.execute('INSERT OR IGNORE INTO urls (key, url) VALUES (?, ?)', (key, url))
+        (id,) = self.connection.execute('SELECT id FROM urls WHERE key = ?', (key,)).fetchone()
+        self._ids[key] = id
+        if len(self._ids) > self.cache_size:
+            self._ids.popitem(last=False)
+        return id
+
+    def add(self, url, status, noindex=False, canonical=None, simhash=None):
+        '''
+        Add an audited page, replacing what an earlier audit saved for it.
+
+        Parameters
+        ----------
+        url (str): The page's URL.
+        status (int): Its status code, the first one if it redirected. 0 if it couldn't be fetched.
+        noindex (bool): Whether a meta robots tag or X-Robots-Tag header says noindex.
+        canonical (str, optional): The absolute URL its canonical points to.
+        simhash (int, optional): The SimHash of its content, see content_simhash().
+
+        '''
+        with self._lock:
+            self._pending.append((url, status, noindex, canonical, simhash))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        '''Write the pages added since the last batch.'''
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pages, bands, stale = [], [], []
+        with self.connection:
+            # A page added twice in the batch only keeps its latest state
+            latest = {self.intern(url): page for url, *page in self._pending}
+            for id, (status, noindex, canonical, simhash) in latest.items():
+                target = self.intern(canonical) if canonical else None
+                # A page audited again drops the bands of its old hash, looked up by primary key
+                old = self.connection.execute('SELECT simhash FROM pages WHERE id = ?', (id,)).fetchone()
+                if old and old[0] is not None:
+                    stale.extend(self._bands(old[0] & ((1 << 64) - 1), id))
+                pages.append((id, status, int(noindex), target, None if simhash is None else _signed(simhash)))
+                if simhash is not None:
+                    bands.extend(self._bands(simhash, id))
+            self.connection.executemany('DELETE FROM bands WHERE band = ? AND value = ? AND id = ?', stale)
+            self.connection.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)', pages)
+            self.connection.executemany('INSERT OR IGNORE INTO bands VALUES (?, ?, ?)', bands)
+        self._pending = []
+
+    def _bands(self, simhash, id):
+        mask = (1 << self.band_bits) - 1
+        return [(band, (simhash >> (band * self.band_bits)) & mask, id) for band in range(self.bands)]
+
+    def url(self, id):
+        '''Return the URL of an id, as it was first seen.'''
+        return self.connection.execute('SELECT url FROM urls WHERE id = ?', (id,)).fetchone()[0]
+
+    def canonical(self, id):
+        '''Return the id a page's canonical points to, None if it has none or wasn't audited.'''
+        row = self.connection.execute('SELECT canonical FROM pages WHERE id = ?', (id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+# Columns of the site report written by write_site_report()
+SITE_REPORT_COLUMNS = ['URL', 'Issue', 'Target', 'Details']
+
+
+def _issue(url, issue, target=None, details=None):
+    record = AuditRecord(url)
+    record.update({'Issue': issue, 'Target': target, 'Details': details})
+    return record
+
+
+def canonical_issues(graph, max_hops=10):
+    '''
+    Yield the canonical problems in the site graph: canonicals to pages that
+    don't answer 200 or are noindex, chains (A -> B -> C) and loops.
+
+    Parameters
+    ----------
+    graph (SiteGraph): The graph.
+    max_hops (int): Chains are followed this far at most.
+
+    Yields
+    ------
+    AuditRecord: One row per problem, with SITE_REPORT_COLUMNS.
+
+    '''
+    connection = graph.connection
+    targets = connection.execute("""
+        SELECT page.id, page.canonical, target.status, target.noindex FROM pages page
+        JOIN pages target ON target.id = page.canonical
+        WHERE page.canonical != page.id AND (target.status != 200 OR target.noindex)""")
+    for id, target, status, noindex in targets:
+        if status != 200:
+            yield _issue(graph.url(id), 'Canonical to non-200 page ❌', graph.url(target),
+                         f'The canonical answers {status or "with an error"}')
+        if noindex:
+            yield _issue(graph.url(id), 'Canonical to noindex page ❌', graph.url(target),
+                         'The canonical page is noindex')
+
+    # Only pages whose canonical target canonicalizes elsewhere start a chain
+    starts = connection.execute("""
+        SELECT page.id FROM pages page JOIN pages target ON target.id = page.canonical
+        WHERE page.canonical != page.id AND target.canonical IS NOT NULL AND target.canonical != target.id""")
+    for (id,) in starts:
+        path = [id]
+        target = graph.canonical(id)
+        while target is not None and target not in path and len(path) <= max_hops:
+            path.append(target)
+            target = graph.canonical(target)
+
+        hops = ' -> '.join(graph.url(hop) for hop in path)
+        if target is None or target == path[-1]:
+            yield _issue(graph.url(id), 'Canonical chain ❌', graph.url(path[-1]), hops)
+        elif target in path:
+            yield _issue(graph.url(id), 'Canonical loop ❌', graph.url(path[1]), f'{hops} -> {graph.url(target)}')
+        else:
+            yield _issue(graph.url(id), 'Canonical chain ❌', graph.url(path[-1]), f'Longer than {max_hops} hops: {hops}')
+
+
+def duplicate_clusters(graph):
+    '''
+    Group pages with near duplicate content: SimHashes at most graph.distance
+    bits apart. Pages only get compared with the pages that share one of their
+    hash bands, which the database returns already sorted, so the work and
+    memory grow with the duplicates found, not with the square of the pages.
+
+    Returns
+    -------
+    list of list of int: The clusters of page ids, each with at least two pages.
+
+    '''
+    parent = {}
+
+    def find(id):
+        root = id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        # Point the whole path straight at the root so later finds are quick
+        while parent.get(id, id) != root:
+            parent[id], id = root, parent[id]
+        return root
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    rows = graph.connection.execute(
+        'SELECT band, value, id, simhash FROM bands JOIN pages USING (id) ORDER BY band, value')
+    for _, bucket in itertools.groupby(rows, key=lambda row: (row[0], row[1])):
+        # Pages with the exact same hash are joined right away, the others compared once per distinct hash
+        hashes = {}
+        for _, _, id, simhash in bucket:
+            if simhash in hashes:
+                union(hashes[simhash], id)
+            else:
+                hashes[simhash] = id
+        if len(hashes) < 2:
+            continue
+        distinct = list(hashes.items())
+        for i, (a, first) in enumerate(distinct):
+            for b, second in distinct[i + 1:]:
+                if ((a ^ b) & ((1 << 64) - 1)).bit_count() <= graph.distance:
+                    union(first, second)
+
+    clusters = collections.defaultdict(list)
+    for id in parent:
+        clusters[find(id)].append(id)
+    for root, members in clusters.items():
+        if root not in members:
+            members.append(root)
+    return sorted(sorted(members) for members in clusters.values())
+
+
+def duplicate_issues(graph):
+    '''
+    Yield a row for every page in a near duplicate cluster, unless all the
+    cluster's pages already canonicalize to the same page.
+    '''
+    for number, cluster in enumerate(duplicate_clusters(graph), 1):
+        canonicals = {graph.canonical(id) for id in cluster}
+        if len(canonicals) == 1 and None not in canonicals:
+            continue
+        for id in cluster:
+            yield _issue(graph.url(id), 'Near duplicate content ⚠️', graph.url(cluster[0]),
+                         f'Cluster {number} of {len(cluster)} pages')
+
+
+def analyze_site_graph(graph, max_hops=10):
+    '''
+    Yield every site level problem of the graph, see canonical_issues() and
+    duplicate_issues().
+    '''
+    graph.flush()
+    yield from canonical_issues(graph, max_hops)
+    yield from duplicate_issues(graph)
+
+
+def write_site_report(graph, path):
+    '''
+    Analyze the site graph and write the problems found to a report file
+    (.jsonl, .csv, .parquet or .xlsx).
+
+    Returns
+    -------
+    int: How many rows were written.
+
+    '''
+    with open_writer(path, columns=SITE_REPORT_COLUMNS) as writer:
+        for issue in analyze_site_graph(graph):
+            writer.write(issue)
+        return writer.rows
+
+
+_site_graph = None
+
+
+def get_site_graph():
+    '''
+    Return the site graph pages are added to, None unless configure_site_graph() was called.
+    '''
+    return _site_graph
+
+
+def configure_site_graph(path=None, **options):
+    '''
+    Build a site graph of the audited pages in a SQLite file, by adding the
+    site_graph check to the checklist.
+
+    Parameters
+    ----------
+    path (str, optional): The SQLite file. No graph is built if None.
+    **options: Passed to SiteGraph (distance, cache_size).
+
+    '''
+    global _site_graph
+    if _site_graph is not None:
+        _site_graph.close()
+    _site_graph = SiteGraph(path, **options) if path else None
+    if path:
+        register_check(Check('site_graph', 'Site Graph', DOM), columns=['Site Graph'])
+
+
+# =============================================================================
+# Work Queue
+# =============================================================================
+
+class WorkQueue:
+    '''
+    SQLite work queue for audits split over several worker processes, on this
+    machine or on others sharing the file.
+
+    URLs are sharded by host. A worker leases a batch of URLs of one host at
+    a time, and the per host limits are kept in the queue itself so they hold
+    across every worker: at most per_host workers hold a lease on the same
+    host, and requests to a host start at least delay seconds apart when
+    every request waits for wait_turn() (workers hook it into the shared
+    session's HostLimiter). A worker that dies loses its lease after
+    lease_timeout seconds and its URLs go back to the queue.
+
+    Several processes can use the same file, SQLite locks it. Workers on other
+    machines need a shared filesystem with working file locks (not every
+    network filesystem has them).
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+    run_id (str): Name of the audit run the URLs belong to.
+    per_host (int): Maximum workers auditing the same host at once.
+    delay (float): Minimum seconds between two requests to the same host.
+    lease_timeout (float): Seconds a lease lasts without the worker renewing it.
+
+    '''
+
+    def __init__(self, path, run_id='default', per_host=4, delay=0.0, lease_timeout=600):
+        self.path = path
+        self.run_id = run_id
+        self.per_host = per_host
+        self.delay = delay
+        self.lease_timeout = lease_timeout
+        # Transactions are opened by hand, so claiming a batch is atomic across
+        # processes. The checks' threads all book their turns through here.
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS queue (
+                run_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                host TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, url)
+            );
+            CREATE INDEX IF NOT EXISTS queue_status ON queue (run_id, status, host);
+            CREATE TABLE IF NOT EXISTS leases (
+                run_id TEXT NOT NULL,
+                host TEXT NOT NULL,
+                worker TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (run_id, host, worker)
+            );
+            CREATE TABLE IF NOT EXISTS hosts (
+                run_id TEXT NOT NULL,
+                host TEXT NOT NULL,
+                next_at REAL NOT NULL,
+                PRIMARY KEY (run_id, host)
+            );""")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't
+        # both read the same free slot and then both take it
+        with self._lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+
+    def put(self, urls, reset=False, chunk_size=1000):
+        '''
+        Add URLs to the queue. URLs already queued are skipped.
+
+        Parameters
+        ----------
+        urls (iterable of str): The URLs to audit. https:// is added if they have no scheme.
+        reset (bool): Queue finished URLs again, e.g. to retry their failed checks.
+        chunk_size (int): URLs added per transaction.
+
+        Returns
+        -------
+        int: How many URLs were added (or reset).
+
+        '''
+        if reset:
+            query = ("INSERT INTO queue (run_id, url, host, status) VALUES (?, ?, ?, 'pending') "
+                     "ON CONFLICT (run_id, url) DO UPDATE SET status = 'pending', worker = NULL "
+                     "WHERE status = 'done'")
+        else:
+            query = "INSERT OR IGNORE INTO queue (run_id, url, host, status) VALUES (?, ?, ?, 'pending')"
+
+        added = 0
+        urls = (with_scheme(url) for url in urls)
+        while True:
+            rows = [(self.run_id, url, urlsplit(url).netloc) for url in itertools.islice(urls, chunk_size)]
+            if not rows:
+                return added
+            with self._transaction() as connection:
+                before = connection.total_changes
+                connection.executemany(query, rows)
+                added += connection.total_changes - before
+
+    def _expire_leases(self, connection, now):
+        # Hand the URLs of workers that stopped renewing their lease to someone else
+        expired = connection.execute('SELECT host, worker FROM leases WHERE run_id = ? AND expires_at < ?',
+                                     (self.run_id, now)).fetchall()
+        for host, worker in expired:
+            connection.execute(
+                "UPDATE queue SET status = 'pending', worker = NULL, attempts = attempts + 1 "
+                "WHERE run_id = ? AND host = ? AND worker = ? AND status = 'leased'",
+                (self.run_id, host, worker))
+            connection.execute('DELETE FROM leases WHERE run_id = ? AND host = ? AND worker = ?',
+                               (self.run_id, host, worker))
+
+    def claim(self, worker, size=20):
+        '''
+        Lease a batch of pending URLs, all of the same host.
+
+        Parameters
+        ----------
+        worker (str): The worker's id.
+        size (int): Maximum URLs in the batch.
+
+        Returns
+        -------
+        tuple or None: (host, urls), or None when no host can take another
+            worker right now.
+
+        '''
+        now = time.time()
+        with self._transaction() as connection:
+            self._expire_leases(connection, now)
+            row = connection.execute(
+                "SELECT host FROM queue WHERE run_id = ? AND status = 'pending' AND host NOT IN "
+                "(SELECT host FROM leases WHERE run_id = ? GROUP BY host HAVING COUNT(*) >= ?) LIMIT 1",
+                (self.run_id, self.run_id, self.per_host)).fetchone()
+            if row is None:
+                return None
+
+            host = row[0]
+            urls = [url for (url,) in connection.execute(
+                "SELECT url FROM queue WHERE run_id = ? AND status = 'pending' AND host = ? LIMIT ?",
+                (self.run_id, host, size))]
+            connection.executemany("UPDATE queue SET status = 'leased', worker = ? WHERE run_id = ? AND url = ?",
+                                   [(worker, self.run_id, url) for url in urls])
+            connection.execute('INSERT OR REPLACE INTO leases VALUES (?, ?, ?, ?)',
+                               (self.run_id, host, worker, now + self.lease_timeout))
+        return host, urls
+
+    def renew(self, host, worker):
+        '''
+        Renew the worker's lease on host.
+        '''
+        with self._transaction() as connection:
+            connection.execute('UPDATE leases SET expires_at = ? WHERE run_id = ? AND host = ? AND worker = ?',
+                               (time.time() + self.lease_timeout, self.run_id, host, worker))
+
+    def wait_turn(self, host):
+        '''
+        Wait until the next request to host may start, across every worker.
+
+        Parameters
+        ----------
+        host (str): The host, as in the URL (e.g. example.com:8080).
+
+        '''
+        if not self.delay:
+            return
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute('SELECT next_at FROM hosts WHERE run_id = ? AND host = ?',
+                                     (self.run_id, host)).fetchone()
+            # Book the next free slot, the request after us gets the one after it
+            slot = max(now, row[0] if row else now)
+            connection.execute('INSERT OR REPLACE INTO hosts VALUES (?, ?, ?)',
+                               (self.run_id, host, slot + self.delay))
+        if slot > now:
+            time.sleep(slot - now)
+
+    def done(self, url, host=None):
+        '''
+        Mark a URL as audited. With host, the next request to the host also
+        waits for the delay counted from now, since the last one may have started late.
+        '''
+        with self._transaction() as connection:
+            connection.execute("UPDATE queue SET status = 'done' WHERE run_id = ? AND url = ?", (self.run_id, url))
+            if host is not None and self.delay:
+                connection.execute('UPDATE hosts SET next_at = MAX(next_at, ?) WHERE run_id = ? AND host = ?',
+                                   (time.time() + self.delay, self.run_id, host))
+
+    def release(self, host, worker):
+        '''
+        End the worker's lease on host. URLs of the batch it didn't finish go
+        back to the queue.
+        '''
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE queue SET status = 'pending', worker = NULL "
+                "WHERE run_id = ? AND host = ? AND worker = ? AND status = 'leased'",
+                (self.run_id, host, worker))
+            connection.execute('DELETE FROM leases WHERE run_id = ? AND host = ? AND worker = ?',
+                               (self.run_id, host, worker))
+
+    def counts(self):
+        '''Return how many URLs are pending, leased and done.'''
+        counts = dict.fromkeys(['pending', 'leased', 'done'], 0)
+        counts.update(self.connection.execute('SELECT status, COUNT(*) FROM queue WHERE run_id = ? GROUP BY status',
+                                              (self.run_id,)))
+        return counts
+
+    def urls(self, status='done'):
+        '''Yield the URLs with status, in the order they were queued.'''
+        cursor = self.connection.execute('SELECT url FROM queue WHERE run_id = ? AND status = ? ORDER BY rowid',
+                                         (self.run_id, status))
+        for (url,) in cursor:
+            yield url
+
+    def close(self):
+        self.connection.close()
+
+
+def run_worker(queue, checkpoint, checks=None, batch_size=20, worker=None, poll=1.0, timings=None):
+    '''
+    Audit URLs from a WorkQueue until it is empty, saving every result to the
+    checkpoint store shared by all workers.
+
+    Parameters
+    ----------
+    queue (WorkQueue): The queue to pull batches from.
+    checkpoint (CheckpointStore): Where the results go. Checks already saved
+        there for a URL are not run again.
+    checks (list of str, optional): Names of the checks to run. All of them if None.
+    batch_size (int): URLs leased at a time.
+    worker (str, optional): The worker's id. Defaults to the host name and process id.
+    poll (float): Seconds to wait when every host with URLs left is busy.
+    timings (str or TimingSummary, optional): See audit().
+
+    Returns
+    -------
+    int: How many URLs this worker audited.
+
+    '''
+    worker = worker or f'{socket.gethostname()}-{os.getpid()}'
+    summary = timings if isinstance(timings, TimingSummary) else TimingSummary(timings)
+    audited = 0
+
+    while True:
+        batch = queue.claim(worker, batch_size)
+        if batch is None:
+            counts = queue.counts()
+            if not counts['pending'] and not counts['leased']:
+                break
+            # Other workers hold the hosts that are left, or a dead worker's lease has to expire
+            time.sleep(poll)
+            continue
+
+        host, urls = batch
+        # The batch is all one host, so it is looked up in as few queries as possible
+        get_indexation_checker().expect(urls if checks is None or 'indexation_status' in checks else ())
+        get_psi_client().expect(urls if checks is None or 'core_web_vitals' in checks else ())
+        try:
+            for url in urls:
+                record, pending = checkpoint.resume(url, checks)
+                if pending:
+                    queue.renew(host, worker)
+                    record = run_checks(url, record, checks=pending)
+                    checkpoint.save(record)
+                    summary.add(record)
+                    queue.done(url, host)
+                else:
+                    queue.done(url)
+                audited += 1
+        finally:
+            queue.release(host, worker)
+
+    summary.close()
+    print(f"🧵 Worker {worker} audited {audited} URLs")
+    print(f"⏱️ Timings:\n{summary}")
+    return audited
+
+
+def start_workers(count, argv):
+    '''
+    Start count worker processes on this machine, running this script with
+    the same arguments plus --worker.
+
+    Returns
+    -------
+    list of subprocess.Popen: The worker processes.
+
+    '''
+    command = [sys.executable, os.path.abspath(__file__), *argv, '--worker', '--quiet']
+    return [subprocess.Popen(command, stdin=subprocess.DEVNULL) for _ in range(count)]
+
+
+def queue_report(queue, checkpoint, output):
+    '''
+    Write the report of every finished URL in the queue, from the results
+    the workers saved.
+
+    Returns
+    -------
+    int: How many rows were written.
+
+    '''
+    rows = 0
+    with open_writer(output) as writer:
+        for url in queue.urls('done'):
+            record, _ = checkpoint.resume(url, checks=[])
+            writer.write(record)
+            rows += 1
+    return rows
+
+
+def distributed(args, argv, urls, checkpoint, checks):
+    '''
+    Run the --queue modes of the command line: a worker, or the coordinator
+    that queues the URLs, starts the local workers and writes the report.
+    '''
+    queue = WorkQueue(args.queue, args.run_id, per_host=args.per_host, delay=args.crawl_delay,
+                      lease_timeout=args.lease_timeout)
+
+    if args.worker:
+        # Every request waits for its turn in the queue, so --crawl-delay holds across workers
+        get_session().limiter.wait_turn = queue.wait_turn
+        timings = args.timings
+        if timings:
+            # One timings file per worker, they would overwrite each other's
+            root, ext = os.path.splitext(timings)
+            timings = f'{root}.{os.getpid()}{ext}'
+        run_worker(queue, checkpoint, checks, batch_size=args.batch_size, timings=timings)
+        return
+
+    if urls is None and args.url:
+        urls = [args.url]
+    if urls is not None:
+        added = queue.put(urls, reset=args.retry_failed is not None)
+        print(f"📥 {added} URLs queued in {args.queue}")
+
+    workers = start_workers(args.workers, argv)
+    failed = [worker.wait() for worker in workers].count(0) != len(workers)
+    counts = queue.counts()
+    print(f"🧵 {counts['done']} URLs done, {counts['pending'] + counts['leased']} left")
+    if failed:
+        sys.exit('A worker failed, start the same command again to finish the queue')
+
+    # Queueing for workers elsewhere, the report is written once they are done
+    if args.output and (args.workers or urls is None):
+        rows = queue_report(queue, checkpoint, args.output)
+        print(f"📝 {rows} rows written to {args.output}")
+        if args.excel:
+            convert_report(args.output, args.excel)
+
+
+def parse_args(argv=None):
+    '''
+    Parse the command line arguments.
+    '''
+    parser = argparse.ArgumentParser(description='Automated technical SEO checklist.')
+    parser.add_argument('url', nargs='?', help='A single URL to check.')
+    parser.add_argument('--urls', metavar='FILE', help="File with one URL per line, or '-' to read from stdin.")
+    parser.add_argument('--sitemap', metavar='URL', help='XML sitemap or sitemap index (URL or local file) to check.')
+    parser.add_argument('--output', default='data.xlsx',
+                        help='Report file: .xlsx, .jsonl, .csv or .parquet (default: data.xlsx). '
+                             'JSONL, CSV and Parquet are written as each URL finishes.')
+    parser.add_argument('--excel', metavar='FILE', help='Also convert the finished report to this Excel file.')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='URLs checked at the same time in batch audits (default: 1).')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='Maximum requests in flight to the same audited host (default: 4). With --queue, '
+                             'the workers auditing the same host, each sends one request at a time.')
+    parser.add_argument('--timeout', type=float, default=30,
+                        help='Timeout in seconds of every request to the audited sites (default: 30). '
+                             'PageSpeed Insights calls wait up to 120 s.')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Retries for failed or throttled requests, PageSpeed Insights calls included (default: 2).')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Processes to parse pages in, for CPU bound audits (default: 0, parse in threads).')
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help='Connections kept open per host by the shared session (default: 10).')
+    parser.add_argument('--no-keep-alive', action='store_true', help='Close connections after every request.')
+    parser.add_argument('--http-cache', metavar='FILE',
+                        help='SQLite file to cache pages in. Unchanged pages are revalidated with ETag/Last-Modified.')
+    parser.add_argument('--bot-probe', choices=['head', 'get'], default='head',
+                        help='How bots are checked: HEAD requests, comparing bodies only when responses '
+                             'differ (default), or a GET per bot.')
+    parser.add_argument('--user-agents', metavar='FILE',
+                        help='Bots to check, as a JSON object or "name: user agent" lines.')
+    parser.add_argument('--indexation', choices=['google', 'search-console', 'list'], default='google',
+                        help='Where indexation comes from: Google search (default), a Search Console '
+                             'export or a list of indexed URLs, given with --indexation-file.')
+    parser.add_argument('--indexation-file', metavar='FILE',
+                        help='Search Console export (CSV/Excel) or file with one indexed URL per line.')
+    parser.add_argument('--indexation-cache', metavar='FILE', help='SQLite file to cache indexed URLs in.')
+    parser.add_argument('--indexation-ttl', type=float, default=7,
+                        help='Days an indexed URL is trusted without checking again (default: 7).')
+    parser.add_argument('--robots-ttl', type=float, default=24,
+                        help='Hours the robots.txt of a host is cached (default: 24).')
+    parser.add_argument('--no-robots', action='store_true', help="Don't check URLs against robots.txt.")
+    parser.add_argument('--psi-strategy', nargs='+', choices=['mobile', 'desktop'], default=['mobile'],
+                        help='PageSpeed Insights strategies to check (default: mobile).')
+    parser.add_argument('--psi-key', help='PageSpeed Insights API key (default: the PSI_API_KEY environment variable).')
+    parser.add_argument('--psi-cache', metavar='FILE', help='SQLite file to cache PageSpeed Insights results in.')
+    parser.add_argument('--psi-ttl', type=float, default=24, help='Hours a cached PSI result stays valid (default: 24).')
+    parser.add_argument('--psi-rate', type=float, default=4,
+                        help='Maximum PageSpeed Insights calls per second (default: 4).')
+    parser.add_argument('--psi-endpoint', default=PSI_ENDPOINT, help=argparse.SUPPRESS)
+    parser.add_argument('--site-graph', metavar='FILE',
+                        help='SQLite file to build the site graph in: status, noindex, canonical and a content '
+                             'hash of every page, for --site-report.')
+    parser.add_argument('--site-report', metavar='FILE',
+                        help='Write the site level problems to this report (.jsonl, .csv, .parquet or .xlsx): '
+                             'canonical chains and loops, canonicals to non-200 or noindex pages, and '
+                             'near duplicate content.')
+    parser.add_argument('--cwv-history', metavar='FILE',
+                        help='SQLite file to save the raw Core Web Vitals of every audited URL to, one row '
+                             'per day, for --cwv-report and --cwv-regressions.')
+    parser.add_argument('--cwv-report', metavar='FILE',
+                        help='Write the p50/p75/p95 Core Web Vitals per template of the last --cwv-days days '
+                             '(.csv, .jsonl, .parquet or .xlsx).')
+    parser.add_argument('--cwv-regressions', metavar='FILE',
+                        help='Write the p75 Core Web Vitals per template of the last --cwv-days days against '
+                             'the days before them (.csv, .jsonl, .parquet or .xlsx).')
+    parser.add_argument('--cwv-days', type=int, default=7, help='Days in a Core Web Vitals report window (default: 7).')
+    parser.add_argument('--cwv-depth', type=int, default=1,
+                        help='Directories that make a URL template, e.g. 1 groups /blog/... (default: 1).')
+    parser.add_argument('--cwv-tolerance', type=float, default=0.1,
+                        help='How much worse a p75 may get before it is a regression (default: 0.1, i.e. 10%%).')
+    parser.add_argument('--cwv-min-samples', type=int, default=20,
+                        help='Leave templates with fewer results than this in a window out of --cwv-regressions '
+                             '(default: 20).')
+    parser.add_argument('--include', nargs='+', metavar='CHECK',
+                        help='Only run these checks. Takes check names (e.g. check_canonical) or what the '
+                             'checks read: headers, head, dom or api.')
+    parser.add_argument('--exclude', nargs='+', metavar='CHECK',
+                        help='Skip these checks, e.g. --exclude api skips Core Web Vitals and indexation.')
+    parser.add_argument('--quiet', action='store_true',
+                        help='No per-check output, colors or spinner. Audit summaries still print.')
+    parser.add_argument('--timings', metavar='FILE', help='JSONL file to write every URL\'s timing record to.')
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'], help='Profile the run.')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='Save the profile here (pstats for cprofile, HTML for pyinstrument) '
+                             'instead of printing it.')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='SQLite file to save finished checks to. Re-running with the same file and '
+                             '--run-id skips what already succeeded.')
+    parser.add_argument('--run-id', default='default', help='Name of the audit run in the checkpoint (default: default).')
+    parser.add_argument('--queue', metavar='FILE',
+                        help='SQLite work queue to split the audit over worker processes. The URLs are queued, '
+                             '--workers local workers audit them and the report is written when they are done.')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Local worker processes started for --queue (default: 2). 0 only queues the URLs '
+                             '(or writes the report of a finished queue), for workers started elsewhere.')
+    parser.add_argument('--worker', action='store_true',
+                        help='Run as a worker: audit URLs from --queue until it is empty.')
+    parser.add_argument('--batch-size', type=int, default=20, help='URLs a worker leases at a time (default: 20).')
+    parser.add_argument('--crawl-delay', type=float, default=0,
+                        help='Minimum seconds between two requests to the same audited host, across all workers '
+                             '(default: 0). API calls are limited by --psi-rate instead.')
+    parser.add_argument('--lease-timeout', type=float, default=600,
+                        help="Seconds before a silent worker's URLs are handed to another worker (default: 600).")
+    parser.add_argument('--retry-failed', nargs='*', metavar='CHECK',
+                        help='Only re-run the failed checks of the checkpointed run, '
+                             'optionally only the named ones (e.g. core_web_vitals).')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    '''
+    Command line entry point.
+    '''
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+
+    # Keep enough pooled connections for every request allowed to a host. A
+    # worker shares its host with up to --per-host workers, so it sends one
+    # request at a time.
+    configure_session(pool_size=max(args.pool_size, args.per_host), keep_alive=not args.no_keep_alive,
+                      per_host=1 if args.worker else args.per_host, delay=args.crawl_delay,
+                      timeout=args.timeout, retries=args.retries)
+    configure_http_cache(args.http_cache)
+    global BOT_PROBE
+    BOT_PROBE = args.bot_probe
+    if args.user_agents:
+        load_user_agents(args.user_agents)
+    configure_robots(ttl=args.robots_ttl * 3600, enabled=not args.no_robots)
+    if args.indexation != 'google' and not args.indexation_file:
+        sys.exit(f'--indexation {args.indexation} needs --indexation-file')
+    backend = {'google': lambda path: GoogleSearchBackend(),
+               'search-console': SearchConsoleBackend,
+               'list': StaticBackend}[args.indexation](args.indexation_file)
+    configure_indexation(backend, cache_path=args.indexation_cache, ttl=args.indexation_ttl * 24 * 3600)
+    configure_psi(cache_path=args.psi_cache, ttl=args.psi_ttl * 3600, strategies=args.psi_strategy,
+                  endpoint=args.psi_endpoint, api_key=args.psi_key, rate=args.psi_rate, retries=args.retries)
+
+    if args.site_report and not args.site_graph:
+        sys.exit('--site-report needs --site-graph')
+    configure_site_graph(args.site_graph)
+    if (args.cwv_report or args.cwv_regressions) and not args.cwv_history:
+        sys.exit('--cwv-report and --cwv-regressions need --cwv-history')
+    configure_cwv_history(args.cwv_history)
+    reports_only = bool(args.site_report or args.cwv_report or args.cwv_regressions)
+
+    # A queue keeps its results next to the URLs unless told otherwise
+    checkpoint_path = args.checkpoint or args.queue
+    checkpoint = CheckpointStore(checkpoint_path, args.run_id) if checkpoint_path else None
+    try:
+        checks = select_checks(args.include, args.exclude)
+    except ValueError as e:
+        sys.exit(str(e))
+    # --site-graph asks for the site_graph check, --include only picks among the others
+    if args.site_graph and checks is not None and 'site_graph' not in checks:
+        if 'site_graph' not in (select_checks(exclude=args.exclude) or CHECK_NAMES):
+            sys.exit('--site-graph needs the site_graph check, don\'t --exclude it')
+        checks = [name for name in CHECK_NAMES if name in checks or name == 'site_graph']
+
+    if args.retry_failed is not None:
+        if checkpoint is None:
+            sys.exit('--retry-failed needs --checkpoint')
+        if args.retry_failed:
+            checks = [name for name in args.retry_failed if checks is None or name in checks]
+        urls = checkpoint.failed_urls(checks)
+    elif args.urls or args.sitemap:
+        urls = itertools.chain(read_url_list(args.urls) if args.urls else (),
+                               iter_sitemap_urls(args.sitemap) if args.sitemap else ())
+        if args.url:
+            urls = itertools.chain([args.url], urls)
+    else:
+        urls = None
+
+    if args.quiet:
+        set_quiet()
+
+    if args.queue:
+        distributed(args, argv, urls, checkpoint, checks)
+    elif urls is not None or args.url or not reports_only:
+        audit_from_args(args, urls, checkpoint, checks)
+
+    if get_site_graph() is not None:
+        get_site_graph().flush()
+    if get_cwv_history() is not None:
+        get_cwv_history().flush()
+    # Workers leave the reports to the coordinator
+    if args.worker:
+        return
+    if args.site_report:
+        rows = write_site_report(get_site_graph(), args.site_report)
+        print(f"🕸️ {rows} site problems written to {args.site_report}")
+    if args.cwv_report:
+        write_cwv_report(get_cwv_history(), args.cwv_report, days=args.cwv_days, depth=args.cwv_depth,
+                         strategies=args.psi_strategy)
+    if args.cwv_regressions:
+        write_cwv_regressions(get_cwv_history(), args.cwv_regressions, days=args.cwv_days, depth=args.cwv_depth,
+                              tolerance=args.cwv_tolerance, min_samples=args.cwv_min_samples,
+                              strategies=args.psi_strategy)
+
+
+def audit_from_args(args, urls, checkpoint, checks):
+    '''
+    Run the audit the command line asked for on this machine.
+    '''
+    with profiled(args.profile, args.profile_output) if args.profile else contextlib.nullcontext():
+        if urls is not None:
+            if args.concurrency > 1 or args.parse_workers:
+                audit_async(urls, output=args.output, collect=False, checkpoint=checkpoint, checks=checks,
+                            timings=args.timings, concurrency=args.concurrency, per_host=args.per_host,
+                            parse_workers=args.parse_workers)
+            else:
+                audit(urls, output=args.output, collect=False, checkpoint=checkpoint, checks=checks,
+                      timings=args.timings)
+            if args.excel:
+                convert_report(args.output, args.excel)
+        else:
+            # URL of the page you want to check, only ask for it when someone is there to answer
+            if not args.url and not sys.stdin.isatty():
+                sys.exit('No URL to check, pass a URL, --urls or --sitemap')
+            url = args.url or input("Enter the URL of the page you want to check:")
+            checklist(url, output=args.output, checks=checks)
+
+
+    
+# =============================================================================
+# Mobile Friendly
+# =============================================================================
+
+    
+def mobile_friendly(url, record, page=None):
+    '''
+    Function that checks if URL is mobile friendly. It uses viewport
+
+    Parameters
+    ----------
+    url (str): The URL to check.
+    record (AuditRecord): The URL's record to add the result to.
+    page (Page, optional): The already fetched page. It is fetched if not given.
+
+    Returns
+    -------
+    AuditRecord: The updated record.
+
+    '''
+    say_colored("- Is the Page Mobile Friendly?", 'black', attrs=['bold'])
+    try:
+        # Reuse the fetched page or send a GET request to the URL
+        if page is None:
+            page = fetch_page(url)
+        page.raise_for_error()
+        
+        # Check if the meta viewport tag exists
+        if page.document.viewport is None:
+            say(f"{url} is not mobile-friendly ❌")
+            a = f"{url} is not mobile-friendly ❌ "
+        else:
+            a = f"{url} is mobile-friendly ✅"
+            say(f"{url} is mobile-friendly ✅ ")
+        
+        # Add the result to the URL's record
+        record.set('Mobile Friendly', a)
+        
+    except Exception as e:
+        # Handle the exception
+        say(f"Mobile Friendly Check failed with error: {e}🚫🚫🚫🚫")
+        
+        # Record the failure in the URL's record
+        record.error('Mobile Friendly', f'Mobile Friendly Check failed with error: {e} ')
+
+    return record
+    
+ 
+# =============================================================================
+# Core Web Vitals
+# =============================================================================
+
+def cwv_threshold(value, threshold1, threshold2):
+    '''
+    Given a value and two thresholds, return a string indicating the quality of the value.
+ 
+    Parameters
+    ----------
+    value : int or float
+        The value to be evaluated.
+    threshold1 : int or float
+        The lower threshold value.
+    threshold2 : int or float
+        The upper threshold value.
+ 
+    Returns
+    -------
+    str
+        A string indicating the quality of the value, which can be one of:
+        - "good ✅" if the value is less than threshold1.
+        - "needs improvement ⚠️" if the value is between threshold1 and threshold2 (inclusive).
+        - "poor ❌" if the value is greater than threshold2.
+        - "invalid input" if the value is not a number.
+
+   '''
+    if value < threshold1:
+        return "good ✅"
+    elif value >= threshold1 and value <= threshold2:
+        return "needs improvement ⚠️"
+    elif value > threshold2:
+        return "poor ❌"
+    else:
+        return "invalid input"
+    
+    
+# =============================================================================
+# PageSpeed Insights
+# =============================================================================
+
+PSI_ENDPOINT = 'https://www.googleapis.com/pagespeedonline/v5/runPagespeed'
+
+# The Lighthouse audits we report on. Only these are kept from the PSI response.
+PSI_AUDITS = ['largest-contentful-paint', 'cumulative-layout-shift', 'speed-index',
+              'first-contentful-paint', 'total-blocking-time']
+
+# Strategies core_web_vitals() checks, 'mobile' and/or 'desktop'
+PSI_STRATEGIES = ['mobile']
+
+
+class PSIError(Exception):
+    '''Raised when PageSpeed Insights can't return metrics for a URL.'''
+
+
+def extract_psi_metrics(data):
+    '''
+    Keep only the audits we report on from a full PSI/Lighthouse response.
+
+    Parameters
+    ----------
+    data (dict): The decoded PSI response.
+
+    Returns
+    -------
+    dict: Maps each audit id in PSI_AUDITS to its displayValue and numericValue.
+
+    '''
+    audits = data['lighthouseResult']['audits']
+    return {audit: {'displayValue': audits[audit].get('displayValue'),
+                    'numericValue': audits[audit].get('numericValue')}
+            for audit in PSI_AUDITS}
+
+
+class PSICache:
+    '''
+    Persistent SQLite cache of PSI metrics keyed by URL and strategy.
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+    ttl (float): Seconds a cached result stays valid.
+
+    '''
+
+    def __init__(self, path, ttl=24 * 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS psi_cache (
+                url TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                metrics TEXT NOT NULL,
+                PRIMARY KEY (url, strategy)
+            )""")
+        self.connection.commit()
+
+    def get(self, url, strategy):
+        '''Return the cached metrics, or None if missing or older than the TTL.'''
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT fetched_at, metrics FROM psi_cache WHERE url = ? AND strategy = ?',
+                (url, strategy)).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(row[1])
+
+    def set(self, url, strategy, metrics):
+        with self._lock:
+            self.connection.execute('INSERT OR REPLACE INTO psi_cache VALUES (?, ?, ?, ?)',
+                                    (url, strategy, time.time(), json.dumps(metrics)))
+            self.connection.commit()
+
+
+class TokenBucket:
+    '''
+    Thread safe token bucket. acquire() blocks until a token is available.
+
+    Parameters
+    ----------
+    rate (float): Tokens added per second.
+    capacity (float): Maximum tokens stored, i.e. the allowed burst.
+
+    '''
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class PSIClient:
+    '''
+    PageSpeed Insights client with a persistent cache, a token bucket to stay
+    under the API quota and backoff on 429 and 5xx responses.
+
+    Batch audits announce the URLs coming next with expect(). When lookup()
+    is asked for a URL, the next expected URLs are analyzed with it in one
+    fetch_many() call, and their results wait for their own check.
+
+    Parameters
+    ----------
+    endpoint (str): The PSI endpoint. Point it at a local stub server for tests.
+    api_key (str, optional): PSI API key. Read from the PSI_API_KEY environment variable if not given.
+    cache (PSICache, optional): Cache for the metrics.
+    rate (float): Maximum PSI calls started per second.
+    max_workers (int): Maximum PSI calls in flight for fetch_many().
+    retries (int): Retries after a 429, a 5xx or a network error.
+    backoff (float): Seconds to wait before the first retry, doubled every retry.
+    timeout (float): Seconds to wait for a PSI response.
+
+    '''
+
+    def __init__(self, endpoint=PSI_ENDPOINT, api_key=None, cache=None, rate=4.0, max_workers=8,
+                 retries=4, backoff=2.0, timeout=120):
+        self.endpoint = endpoint
+        self.api_key = api_key or os.environ.get('PSI_API_KEY')
+        self.cache = cache
+        self.bucket = TokenBucket(rate)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # Bounded in case expected URLs never get checked
+        self.pending = collections.deque(maxlen=1000)
+        self.prefetched = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url, strategy='mobile'):
+        '''
+        Return the metrics of url for strategy, from the cache when fresh.
+
+        Parameters
+        ----------
+        url (str): The URL to analyze.
+        strategy (str): 'mobile' or 'desktop'.
+
+        Returns
+        -------
+        dict: The metrics, see extract_psi_metrics().
+
+        Raises
+        ------
+        PSIError: When PSI keeps failing or answers with a client error.
+
+        '''
+        if self.cache is not None:
+            metrics = self.cache.get(url, strategy)
+            if metrics is not None:
+                return metrics
+
+        params = {'url': url, 'strategy': strategy}
+        if self.api_key:
+            params['key'] = self.api_key
+
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                response = get_api_session().get(self.endpoint, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                error = PSIError(f'PSI request failed: {e}')
+                retry_after = None
+            else:
+                if response.status_code == 200:
+                    try:
+                        metrics = extract_psi_metrics(response.json())
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
+                        # Not retried, the same URL gets the same broken answer
+                        raise PSIError(f'PSI answered without metrics: {e!r}') from e
+                    if self.cache is not None:
+                        self.cache.set(url, strategy, metrics)
+                    return metrics
+                if response.status_code != 429 and response.status_code < 500:
+                    raise PSIError(f'Error {response.status_code}: {response.text[:200]}')
+                error = PSIError(f'Error {response.status_code}: {response.text[:200]}')
+                retry_after = response.headers.get('Retry-After')
+
+            if attempt < self.retries:
+                delay = self.backoff * 2 ** attempt
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                time.sleep(delay)
+
+        raise error
+
+    def fetch_many(self, urls, strategies=('mobile',)):
+        '''
+        Fetch the metrics of many URLs concurrently, up to max_workers at a time
+        and never faster than the token bucket allows.
+
+        Parameters
+        ----------
+        urls (iterable of str): The URLs to analyze.
+        strategies (iterable of str): The strategies to fetch for every URL.
+
+        Returns
+        -------
+        dict: Maps (url, strategy) to the metrics, or to the PSIError raised for it.
+
+        '''
+        jobs = [(url, strategy) for url in urls for strategy in strategies]
+        results = {}
+
+        def run(job):
+            # Whatever goes wrong, only this job fails, not the whole batch
+            try:
+                return self.fetch(*job)
+            except PSIError as e:
+                return e
+            except Exception as e:
+                return PSIError(f'PSI request failed: {e!r}')
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for job, result in zip(jobs, executor.map(run, jobs)):
+                results[job] = result
+        return results
+
+    def expect(self, urls):
+        '''
+        Queue URLs that will be checked soon, so lookup() analyzes them ahead.
+        '''
+        with self._lock:
+            for url in urls:
+                if url not in self.pending and url not in self.prefetched:
+                    self.pending.append(url)
+
+    def lookup(self, url, strategies=('mobile',)):
+        '''
+        Return the metrics of url for every strategy, analyzing the next
+        expected URLs at the same time, up to max_workers calls in one go.
+
+        Parameters
+        ----------
+        url (str): The URL to analyze.
+        strategies (iterable of str): The strategies to fetch.
+
+        Returns
+        -------
+        dict: Maps every strategy to the metrics, or to the PSIError raised for it.
+
+        '''
+        strategies = tuple(strategies)
+        with self._lock:
+            future = self.prefetched.pop(url, None)
+            if future is None:
+                if url in self.pending:
+                    self.pending.remove(url)
+                size = max(1, self.max_workers // len(strategies))
+                batch = [url]
+                while self.pending and len(batch) < size:
+                    other = self.pending.popleft()
+                    if other not in batch and other not in self.prefetched:
+                        batch.append(other)
+                # Checks of the other URLs wait for this batch instead of fetching them again
+                futures = {other: Future() for other in batch[1:]}
+                self.prefetched.update(futures)
+
+        if future is not None:
+            results, fetched = future.result()
+            if fetched == strategies:
+                return results
+            # Prefetched for other strategies, e.g. after PSI_STRATEGIES changed
+            batch, futures = [url], {}
+
+        try:
+            results = self.fetch_many(batch, strategies)
+        except BaseException as e:
+            for other in futures.values():
+                other.set_exception(e)
+            raise
+        for other, other_future in futures.items():
+            other_future.set_result(({strategy: results[other, strategy] for strategy in strategies}, strategies))
+        return {strategy: results[url, strategy] for strategy in strategies}
+
+
+_psi_client = None
+
+
+def get_psi_client():
+    '''
+    Return the shared PSIClient, creating it with the defaults on first use.
+    '''
+    global _psi_client
+    if _psi_client is None:
+        _psi_client = PSIClient()
+    return _psi_client
+
+
+def configure_psi(cache_path=None, ttl=24 * 3600, strategies=None, **options):
+    '''
+    Replace the shared PSIClient.
+
+    Parameters
+    ----------
+    cache_path (str, optional): SQLite file for the PSI cache. No cache if None.
+    ttl (float): Seconds a cached result stays valid.
+    strategies (list of str, optional): Strategies core_web_vitals() checks.
+    **options: Passed to PSIClient (endpoint, api_key, rate, max_workers, ...).
+
+    Returns
+    -------
+    PSIClient: The new client.
+
+    '''
+    global _psi_client
+    cache = PSICache(cache_path, ttl) if cache_path else None
+    _psi_client = PSIClient(cache=cache, **options)
+    if strategies:
+        PSI_STRATEGIES[:] = strategies
+    return _psi_client
+
+
+def cwv_columns(strategy='mobile'):
+    '''
+    Return the report columns core_web_vitals() writes for a strategy. Mobile
+    keeps the original column names, desktop columns start with 'Desktop'.
+    '''
+    columns = ['Largest Contentful Paint', 'LCP Result', 'Cumulative Layout Shift', 'CLS Results',
+               'Speed Index', 'SI Result', 'First Contentful Paint', 'FCP Result',
+               'Total Blocking Time', 'TBT Result', 'Core Web Vitals']
+    if strategy == 'mobile':
+        return columns
+    return [f'{strategy.capitalize()} {column}' for column in columns]
+
+
+def core_web_vitals(url, record):
+    
+    '''
+    Function that checks the core web vitals of a URL using the PageSpeed Insights API.
+
+    Every strategy in PSI_STRATEGIES is checked. Results come from the shared
+    PSIClient, so they are cached and rate limited. With configure_cwv_history()
+    the raw values are also saved for the trend reports.
+
+    Parameters
+    ----------
+    url (str): The URL to check.
+    record (AuditRecord): The URL's record to add the result to.
+
+    Returns
+    -------
+    AuditRecord: The updated record.
+
+    '''
+    client = get_psi_client()
+
+    # Both strategies (and the next expected URLs) are analyzed concurrently
+    results = client.lookup(url, PSI_STRATEGIES)
+    for strategy in PSI_STRATEGIES:
+        columns = cwv_columns(strategy)
+        metrics = results[strategy]
+        if isinstance(metrics, PSIError):
+            say(f"{metrics}")
+            record.error(columns[-1], f"Core Web Vitals check failed with error {metrics} ")
+            continue
+
+        # Extract the performance score for DF
+        lcp = metrics['largest-contentful-paint']['displayValue']
+        cls = metrics['cumulative-layout-shift']['displayValue']
+        si = metrics['speed-index']['displayValue']
+        fcp = metrics['first-contentful-paint']['displayValue']
+        tbt = metrics['total-blocking-time']['displayValue']
+        
+        #Extract the scores for thresholds. 
+        lcp_int = metrics['largest-contentful-paint']['numericValue']
+        cls_int = metrics['cumulative-layout-shift']['numericValue']
+        si_int = metrics['speed-index']['numericValue']
+        fcp_int = metrics['first-contentful-paint']['numericValue']
+        tbt_int = metrics['total-blocking-time']['numericValue']
+        
+        #checking if we are passing Each Value.
+        lcp_row = [cwv_threshold(lcp_int, *CWV_THRESHOLDS['largest-contentful-paint'][1:]), lcp]
+        cls_row = [cwv_threshold(cls_int, *CWV_THRESHOLDS['cumulative-layout-shift'][1:]), cls]
+        si_row = [cwv_threshold(si_int, *CWV_THRESHOLDS['speed-index'][1:]), si]
+        fcp_row = [cwv_threshold(fcp_int, *CWV_THRESHOLDS['first-contentful-paint'][1:]), fcp]
+        tbt_row = [cwv_threshold(tbt_int, *CWV_THRESHOLDS['total-blocking-time'][1:]), tbt]
+    
+        # Add the results to the URL's record
+        record.update(dict(zip(columns, [lcp_row[1], lcp_row[0], cls_row[1], cls_row[0], si_row[1], si_row[0],
+                                         fcp_row[1], fcp_row[0], tbt_row[1], tbt_row[0]])))
+        say_colored(f"- Core Web Vitals Performance score ({strategy}) for {url}:", 'black', attrs=['bold'])
+        say(f"- Largest Contentful Paint: {lcp} - {lcp_row[0]}")
+        say(f'- Cumulative Layout Shift:  {cls} - {cls_row[0]}')
+        say(f'- Speed Index:  {si} - {si_row[0]}')
+        say(f'- First Contentful Paint:  {fcp} - {fcp_row[0]}')
+        say(f'- Total Blocking Time:  {tbt} - {tbt_row[0]}')
+
+        # Keep the raw values for the trend reports
+        history = get_cwv_history()
+        if history is not None:
+            history.add(url, strategy, metrics)
+        
+    return record
+            
+    
+    
+# =============================================================================
+# Core Web Vitals History
+# =============================================================================
+
+# The Lighthouse audits tracked over time: their history column, and the
+# thresholds below which they are good and above which they are poor
+CWV_THRESHOLDS = {
+    'largest-contentful-paint': ('lcp', 2500, 4000),
+    'cumulative-layout-shift': ('cls', 0.1, 0.25),
+    'speed-index': ('si', 3400, 5800),
+    'first-contentful-paint': ('fcp', 1800, 3000),
+    'total-blocking-time': ('tbt', 200, 600),
+}
+
+CWV_METRICS = [metric for metric, _, _ in CWV_THRESHOLDS.values()]
+
+
+def classify_cwv(values, threshold1, threshold2):
+    '''
+    cwv_threshold() for a whole column of values in one vectorized pass.
+
+    Parameters
+    ----------
+    values (array-like): The values to evaluate. NaN is "invalid input".
+    threshold1 (int or float): The lower threshold value.
+    threshold2 (int or float): The upper threshold value.
+
+    Returns
+    -------
+    numpy.ndarray: The quality of every value, as cwv_threshold() writes it.
+
+    '''
+    values = np.asarray(values, dtype=float)
+    return np.select([values < threshold1, values <= threshold2, values > threshold2],
+                     ['good ✅', 'needs improvement ⚠️', 'poor ❌'], default='invalid input')
+
+
+def url_template(url, depth=1):
+    '''
+    Group a URL with the others of its template: its host and the first depth
+    directories of its path, with numeric directories as '*'. For example
+    https://example.com/blog/2023/post is example.com/blog/ with depth 1 and
+    example.com/blog/*/ with depth 2.
+    '''
+    parts = urlsplit(url)
+    directories = [part for part in parts.path.split('/')[:-1] if part][:depth]
+    directories = ['*' if part.isdigit() else part for part in directories]
+    return parts.netloc.lower() + '/' + ''.join(f'{part}/' for part in directories)
+
+
+class CWVHistory:
+    '''
+    SQLite store of the raw Core Web Vitals (numericValue) of every audited
+    URL, one row per day, strategy and URL, for percentile and regression
+    reports across many runs.
+
+    Rows are kept in (day, strategy, url) order in a WITHOUT ROWID table, so a
+    date range is one contiguous read, and hold just a URL id and five floats.
+    Running the audit again the same day replaces that day's values.
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+    day (int, optional): The day the results belong to, in days since 1970-01-01 (UTC). Today by default.
+    batch_size (int): Rows written per transaction.
+
+    '''
+
+    def __init__(self, path, day=None, batch_size=500):
+        self.path = path
+        self.day = int(time.time() // 86400) if day is None else day
+        self.batch_size = batch_size
+        self._ids = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS cwv_history (
+                day INTEGER NOT NULL,
+                strategy TEXT NOT NULL,
+                url INTEGER NOT NULL,
+                {', '.join(f'{metric} REAL' for metric in CWV_METRICS)},
+                PRIMARY KEY (day, strategy, url)
+            ) WITHOUT ROWID;""")
+        self.connection.commit()
+
+    def add(self, url, strategy, metrics):
+        '''
+        Add a URL's PSI results, as PSIClient.fetch() returns them.
+        '''
+        values = [metrics.get(audit, {}).get('numericValue') for audit in CWV_THRESHOLDS]
+        with self._lock:
+            self._pending.append((url, strategy, values))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        '''Write the rows added since the last batch.'''
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        rows = []
+        with self.connection:
+            for url, strategy, values in self._pending:
+                if url not in self._ids:
+                    self.connection.execute('INSERT OR IGNORE INTO urls (url) VALUES (?)', (url,))
+                    (self._ids[url],) = self.connection.execute('SELECT id FROM urls WHERE url = ?', (url,)).fetchone()
+                rows.append((self.day, strategy, self._ids[url], *values))
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO cwv_history VALUES ({', '.join('?' * (3 + len(CWV_METRICS)))})", rows)
+        self._pending = []
+
+    def last_day(self):
+        '''The most recent day with results, None if there are none.'''
+        return self.connection.execute('SELECT MAX(day) FROM cwv_history').fetchone()[0]
+
+    def load(self, start=None, end=None, strategy='mobile', depth=1):
+        '''
+        Load the results of a range of days.
+
+        Parameters
+        ----------
+        start (int, optional): First day, see CWVHistory.day. The first one stored if None.
+        end (int, optional): Last day. The last one stored if None.
+        strategy (str): 'mobile' or 'desktop'.
+        depth (int): Directories in each URL's template, see url_template().
+
+        Returns
+        -------
+        pandas.DataFrame: One row per day and URL with the day, url, template
+            and the raw value of every metric in CWV_METRICS.
+
+        '''
+        self.flush()
+        query = f"SELECT day, url, {', '.join(CWV_METRICS)} FROM cwv_history WHERE day BETWEEN ? AND ? AND strategy = ?"
+        frame = pd.read_sql_query(query, self.connection,
+                                  params=(start if start is not None else 0, end if end is not None else 2 ** 31,
+                                          strategy))
+        # Missing values (and an empty range) load as objects, not NaN
+        frame[CWV_METRICS] = frame[CWV_METRICS].astype(float)
+        # Templates are worked out once per URL, not once per row
+        urls = pd.read_sql_query('SELECT id, url FROM urls', self.connection, index_col='id')['url']
+        templates = urls.map(lambda url: url_template(url, depth))
+        ids = frame['url']
+        frame['url'] = ids.map(urls)
+        frame.insert(2, 'template', ids.map(templates))
+        return frame
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+def cwv_percentiles(frame, percentiles=(0.5, 0.75, 0.95)):
+    '''
+    Percentiles of every metric per template, with the 75th percentile
+    classified against the thresholds as Core Web Vitals are.
+
+    Parameters
+    ----------
+    frame (pandas.DataFrame): Results as CWVHistory.load() returns them.
+    percentiles (tuple of float): The percentiles to report.
+
+    Returns
+    -------
+    pandas.DataFrame: One row per template: its URL and sample counts, then
+        '<metric> p50', '<metric> p75', ... and '<metric> result' per metric.
+
+    '''
+    grouped = frame.groupby('template')
+    table = grouped[CWV_METRICS].quantile(list(percentiles)).unstack()
+    table.columns = [f'{metric} p{round(p * 100)}' for metric, p in table.columns]
+    table.insert(0, 'urls', grouped['url'].nunique())
+    table.insert(1, 'samples', grouped.size())
+    if 0.75 in percentiles:
+        for metric, threshold1, threshold2 in CWV_THRESHOLDS.values():
+            table[f'{metric} result'] = classify_cwv(table[f'{metric} p75'], threshold1, threshold2)
+    return table.reset_index()
+
+
+def _window_p75(history, start, end, strategy, depth, min_samples):
+    # p75 per template, for the templates with enough samples to trust it
+    groups = history.load(start, end, strategy, depth).groupby('template')[CWV_METRICS]
+    p75 = groups.quantile(0.75)
+    return p75[groups.size() >= min_samples]
+
+
+def cwv_regressions(history, days=7, strategy='mobile', depth=1, tolerance=0.1, min_change=0.25, min_samples=20):
+    '''
+    Compare the 75th percentile of every metric per template over the last
+    days with the days before them.
+
+    A metric regresses when its p75 gets worse by more than tolerance and by
+    more than min_change of its "needs improvement" band, so neither a few ms
+    of TBT over a p75 of 0 nor the noise of a busy template is reported.
+
+    Parameters
+    ----------
+    history (CWVHistory): The history.
+    days (int): Length of both windows.
+    strategy (str): 'mobile' or 'desktop'.
+    depth (int): Directories in each URL's template, see url_template().
+    tolerance (float): How much worse (0.1 is 10%) a metric may get before it is a regression.
+    min_change (float): The smallest regression, as a fraction of the gap between
+        a metric's good and poor thresholds (0.25 is 100 ms of TBT).
+    min_samples (int): Templates with fewer samples than this in either window are left out.
+
+    Returns
+    -------
+    pandas.DataFrame: One row per template and metric, with both p75 values,
+        their results, the change and whether it is a regression. The change
+        is NaN when a metric went up from 0.
+
+    '''
+    end = history.last_day()
+    if end is None:
+        return pd.DataFrame()
+    current = _window_p75(history, end - days + 1, end, strategy, depth, min_samples)
+    before = _window_p75(history, end - 2 * days + 1, end - days, strategy, depth, min_samples)
+    current, before = current.align(before, join='inner')
+
+    tables = []
+    for metric, threshold1, threshold2 in CWV_THRESHOLDS.values():
+        table = pd.DataFrame({'template': current.index, 'metric': metric,
+                              'before p75': before[metric].values, 'current p75': current[metric].values})
+        diff = table['current p75'] - table['before p75']
+        table['change'] = (diff / table['before p75'].where(table['before p75'] != 0)).where(diff != 0, 0.0)
+        table['before result'] = classify_cwv(table['before p75'], threshold1, threshold2)
+        table['current result'] = classify_cwv(table['current p75'], threshold1, threshold2)
+        # Every metric is better lower
+        worse = diff > np.maximum(table['before p75'].abs() * tolerance, (threshold2 - threshold1) * min_change)
+        table['regression'] = np.where(worse, 'regression ❌', 'ok ✅')
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True).sort_values(['template', 'metric'], ignore_index=True)
+
+
+def save_dataframe(frame, path):
+    '''
+    Save a DataFrame as .csv, .jsonl, .parquet or .xlsx, by the extension of path.
+    '''
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        frame.to_csv(path, index=False)
+    elif extension == '.jsonl':
+        frame.to_json(path, orient='records', lines=True, force_ascii=False)
+    elif extension == '.parquet':
+        frame.to_parquet(path, index=False)
+    elif extension == '.xlsx':
+        frame.to_excel(path, index=False)
+    else:
+        raise ValueError(f"Unknown report format '{extension}'. Use one of: .csv, .jsonl, .parquet, .xlsx")
+
+
+def write_cwv_report(history, path, days=7, depth=1, strategies=('mobile',)):
+    '''
+    Write the Core Web Vitals percentiles per template of the last days in
+    the history (see cwv_percentiles()) to a report file, with a strategy column.
+    '''
+    end = history.last_day()
+    frames = []
+    for strategy in strategies:
+        frame = history.load(end - days + 1 if end is not None else None, end, strategy, depth)
+        if len(frame):
+            frames.append(cwv_percentiles(frame).assign(strategy=strategy))
+    report = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    save_dataframe(report, path)
+    print(f"📈 Core Web Vitals of {len(report)} templates written to {path}")
+
+
+def write_cwv_regressions(history, path, days=7, depth=1, tolerance=0.1, min_samples=20, strategies=('mobile',)):
+    '''
+    Write the Core Web Vitals regressions per template (see cwv_regressions())
+    to a report file, with a strategy column.
+    '''
+    frames = [cwv_regressions(history, days, strategy, depth, tolerance, min_samples=min_samples).assign(strategy=strategy)
+              for strategy in strategies]
+    report = pd.concat(frames, ignore_index=True)
+    save_dataframe(report, path)
+    regressions = int((report['regression'] != 'ok ✅').sum()) if len(report) else 0
+    print(f"📉 {regressions} Core Web Vitals regressions written to {path}")
+
+
+_cwv_history = None
+
+
+def get_cwv_history():
+    '''
+    Return the Core Web Vitals history results are saved to, None unless configure_cwv_history() was called.
+    '''
+    return _cwv_history
+
+
+def configure_cwv_history(path=None, **options):
+    '''
+    Save the raw Core Web Vitals of every audited URL to a CWVHistory.
+
+    Parameters
+    ----------
+    path (str, optional): The SQLite file. Nothing is saved if None.
+    **options: Passed to CWVHistory (day, batch_size).
+
+    '''
+    global _cwv_history
+    if _cwv_history is not None:
+        _cwv_history.close()
+    _cwv_history = CWVHistory(path, **options) if path else None
+
+
+# =============================================================================
+# Check indexation Status of URL
+# =============================================================================
+
+class IndexationBackend:
+    '''
+    Where indexation_status() gets its answers from. Subclasses implement
+    lookup() for a batch of URLs from the same host.
+    '''
+
+    def lookup(self, urls):
+        '''
+        Check a batch of URLs from the same host.
+
+        Parameters
+        ----------
+        urls (list of str): The URLs to check.
+
+        Returns
+        -------
+        dict: Maps each URL to True (indexed), False (not indexed) or None (unknown).
+
+        '''
+        raise NotImplementedError
+
+
+class GoogleSearchBackend(IndexationBackend):
+    '''
+    Scrape Google search results. One site:host search finds the indexed URLs
+    of a batch, and only the URLs it doesn't list get their own site:url search.
+    Once a site:host search lists none of its batch, the host's next batches
+    go straight to site:url searches. Searches are rate limited.
+
+    Parameters
+    ----------
+    user_agent (str): The User-Agent to search with.
+    rate (float): Maximum searches per second.
+    endpoint (str): The search URL. Point it at a local stub server for tests.
+
+    '''
+
+    def __init__(self, user_agent=None, rate=0.5, endpoint='https://www.google.com/search'):
+        self.endpoint = endpoint
+        self.user_agent = user_agent or ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                                         "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+        self.bucket = TokenBucket(rate)
+        self.missed_hosts = set()
+
+    def search(self, query, num=10):
+        '''
+        Return the normalized URLs the Google results page of a query links to.
+        '''
+        self.bucket.acquire()
+        response = get_api_session().get(self.endpoint, params={'q': query, 'num': num},
+                                     headers={"User-Agent": self.user_agent})
+        if response.status_code != 200:
+            raise IOError(f"Google search failed with status {response.status_code}")
+        soup = BeautifulSoup(response.text, "html.parser")
+        urls = (self.result_url(link['href']) for link in soup.find_all('a', href=True))
+        return {normalize_url(url) for url in urls if url is not None}
+
+    @staticmethod
+    def result_url(href):
+        '''
+        Return the URL a link on a results page points to, unwrapping Google's
+        /url?q= redirects, or None for links that stay on Google.
+        '''
+        parts = urlsplit(href)
+        if parts.path == '/url':
+            query = parse_qs(parts.query)
+            href = (query.get('q') or query.get('url') or [''])[0]
+            parts = urlsplit(href)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            return None
+        return href
+
+    def lookup(self, urls):
+        # Only an exact match counts, a result for /page-2 doesn't mean /page is indexed
+        results = {}
+        host = urlsplit(urls[0]).netloc.lower()
+        # Only the first 100 results come back, when they miss a whole batch the
+        # site is too big for them and the search is one wasted call per batch
+        if len(urls) > 1 and host not in self.missed_hosts:
+            found = self.search(f"site:{host}", num=100)
+            results = {url: True for url in urls if normalize_url(url) in found}
+            if not results:
+                self.missed_hosts.add(host)
+        for url in urls:
+            if url not in results:
+                results[url] = normalize_url(url) in self.search(f"site:{url}")
+        return results
+
+
+class SearchConsoleBackend(IndexationBackend):
+    '''
+    Read indexation from a Search Console export (CSV or Excel).
+
+    The file needs a URL column. If it also has a status column ('Status',
+    'Coverage', 'Indexing state' or 'Verdict'), statuses like "Submitted and
+    indexed" or "URL is on Google" count as indexed and the others don't.
+    Without one, the file is taken as the list of indexed pages. URLs that
+    aren't in the file are reported as not indexed. URLs are compared
+    normalized, see normalize_url().
+
+    Parameters
+    ----------
+    path (str): The exported file.
+
+    '''
+
+    STATUS_COLUMNS = ('status', 'coverage', 'indexing state', 'verdict')
+
+    def __init__(self, path):
+        df = pd.read_excel(path) if path.endswith(('.xlsx', '.xls')) else pd.read_csv(path)
+        columns = {column.strip().lower(): column for column in df.columns}
+        url_column = columns.get('url') or columns.get('page') or columns.get('top pages')
+        if url_column is None:
+            raise ValueError(f"{path} has no URL column")
+        status_column = next((columns[c] for c in self.STATUS_COLUMNS if c in columns), None)
+
+        self.indexed = {}
+        for url, status in zip(df[url_column], df[status_column] if status_column else [None] * len(df)):
+            if isinstance(url, str) and url.strip():
+                self.indexed[normalize_url(url)] = status is None or self.is_indexed_status(str(status))
+
+    @staticmethod
+    def is_indexed_status(status):
+        status = status.lower()
+        if 'not indexed' in status or 'not on google' in status or 'excluded' in status:
+            return False
+        return 'indexed' in status or 'on google' in status or status == 'valid'
 
-# Import the halo module
-from halo import Halo
+    def lookup(self, urls):
+        return {url: self.indexed.get(normalize_url(url), False) for url in urls}
 
-import json
 
+class StaticBackend(IndexationBackend):
+    '''
+    A fixed set of indexed URLs, e.g. for offline runs and tests. URLs are
+    compared normalized, see normalize_url().
+
+    Parameters
+    ----------
+    indexed (iterable of str or str): The indexed URLs, or a file with one URL per line.
+    unknown (bool): Report URLs that aren't listed as unknown (None) instead of not indexed.
+
+    '''
 
+    def __init__(self, indexed=(), unknown=False):
+        if isinstance(indexed, str):
+            indexed = read_url_list(indexed)
+        self.indexed = {normalize_url(url) for url in indexed}
+        self.unknown = unknown
+        self.lookups = 0
 
-#https://www.semrush.com/blog/on-page-seo-checklist
+    def lookup(self, urls):
+        self.lookups += 1
+        return {url: True if normalize_url(url) in self.indexed else (None if self.unknown else False)
+                for url in urls}
+
+
+class IndexationCache:
+    '''
+    Persistent SQLite cache of URLs known to be indexed. Only indexed URLs are
+    kept: stable pages are then skipped for ttl seconds, while pages that aren't
+    indexed yet are checked again on every run.
+
+    Parameters
+    ----------
+    path (str): The SQLite database file. Created if it doesn't exist.
+    ttl (float): Seconds an indexed URL is trusted without checking again.
+
+    '''
+
+    def __init__(self, path, ttl=7 * 24 * 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS indexed_urls (
+                url TEXT PRIMARY KEY,
+                checked_at REAL NOT NULL
+            )""")
+        self.connection.commit()
+
+    def known_indexed(self, urls):
+        '''Return the URLs in urls that are cached as indexed and not expired.'''
+        urls = list(urls)
+        found = set()
+        with self._lock:
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                rows = self.connection.execute(
+                    f'SELECT url FROM indexed_urls WHERE checked_at > ? AND url IN ({",".join("?" * len(chunk))})',
+                    [time.time() - self.ttl] + chunk)
+                found.update(url for url, in rows)
+        return found
+
+    def add(self, urls):
+        now = time.time()
+        with self._lock:
+            self.connection.executemany('INSERT OR REPLACE INTO indexed_urls VALUES (?, ?)',
+                                        [(url, now) for url in urls])
+            self.connection.commit()
+
+
+class IndexationChecker:
+    '''
+    Answers indexation_status() for one URL at a time, while looking URLs up
+    in batches per host.
+
+    Batch audits announce the URLs coming next with expect(). The first time a
+    URL of a host is checked, every expected URL of that host (up to batch_size)
+    is looked up at once, and the answers wait for their own check. A URL that
+    is being looked up is never looked up again at the same time: its check
+    waits for the lookup in flight, like PSIClient.lookup().
+
+    Parameters
+    ----------
+    backend (IndexationBackend): Where the answers come from.
+    cache (IndexationCache, optional): Cache of URLs known to be indexed.
+    batch_size (int): Maximum URLs per backend lookup.
+
+    '''
+
+    def __init__(self, backend, cache=None, batch_size=100):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        # Futures of the URLs being (or already) looked up, by normalized URL
+        self.futures = {}
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    def expect(self, urls):
+        '''
+        Queue URLs that will be checked soon, so they join their host's batch.
+        '''
+        with self._lock:
+            for url in urls:
+                host = urlsplit(url).netloc
+                # Only the next batch of each host is kept, so this never grows unbounded
+                queue = self.pending.setdefault(host, collections.deque(maxlen=self.batch_size))
+                if url not in queue:
+                    queue.append(url)
+
+    def is_indexed(self, url):
+        '''
+        Whether url is indexed: True, False or None if the backend doesn't know.
+        '''
+        key = normalize_url(url)
+        with self._lock:
+            future = self.futures.pop(key, None)
+            if future is None:
+                queue = self.pending.pop(urlsplit(url).netloc, ())
+                batch, keys = [url], {key}
+                for other in queue:
+                    other_key = normalize_url(other)
+                    if len(batch) < self.batch_size and other_key not in keys and other_key not in self.futures:
+                        batch.append(other)
+                        keys.add(other_key)
+                # Checks of these URLs wait for this lookup instead of looking them up again
+                futures = {other_key: Future() for other_key in keys}
+                self.futures.update(futures)
+
+        if future is not None:
+            return future.result()
 
-# URL of the page you want to check
-url = input("Enter the URL of the page you want to check:")
+        try:
+            results = self._lookup(batch)
+        except BaseException as e:
+            for other in futures.values():
+                other.set_exception(e)
+            raise
+        finally:
+            # Checks of url that came in meanwhile already hold its future
+            with self._lock:
+                if self.futures.get(key) is futures[key]:
+                    del self.futures[key]
+        for other in batch:
+            futures[normalize_url(other)].set_result(results.get(other))
+        return results.get(url)
+
+    def _lookup(self, batch):
+        results = {}
+        if self.cache is not None:
+            results = dict.fromkeys(self.cache.known_indexed(batch), True)
+        missing = [other for other in batch if other not in results]
+        if missing:
+            found = self.backend.lookup(missing)
+            results.update(found)
+            if self.cache is not None:
+                self.cache.add([other for other in missing if found.get(other)])
+        return results
+
+
+_indexation_checker = None
+
+
+def get_indexation_checker():
+    '''
+    Return the shared IndexationChecker, searching Google by default.
+    '''
+    global _indexation_checker
+    if _indexation_checker is None:
+        _indexation_checker = IndexationChecker(GoogleSearchBackend())
+    return _indexation_checker
 
 
-  
-#Function that runs all other checklist functions   
-def checklist(url):
+def configure_indexation(backend=None, cache_path=None, ttl=7 * 24 * 3600, batch_size=100):
     '''
+    Replace the shared IndexationChecker.
 
     Parameters
     ----------
-    url : TYPE
-        DESCRIPTION.
+    backend (IndexationBackend, optional): Where the answers come from. Google search if None.
+    cache_path (str, optional): SQLite file to cache indexed URLs in. No cache if None.
+    ttl (float): Seconds an indexed URL is trusted without checking again.
+    batch_size (int): Maximum URLs per backend lookup.
 
     Returns
     -------
-    None.
-W
-    '''
-    
-    #making sure URL has https
-    if not url.startswith("https://"):
-        url = "https://" + url
-    
-    #creating Dataframe where we will store all checks
-    df = pd.DataFrame(columns=[])
-    
-    # Set up the spinner animation
-    spinner = Halo(text='', spinner='dots')
-    # Start the spinner
-    spinner.start()
+    IndexationChecker: The new checker.
 
-    #Checklist functions starts here
-    df = mobile_friendly(url,df)
-    df = bot_accessibility(url,df)
-    df = indexation_status(url,df)
-    df = robots_meta_tag(url,df)
-    df = check_x_robots_tag_noindex(url,df)
-    df = check_canonical(url,df)
-    df = check_schema_org(url, df)
-    df = core_web_vitals(url, df)
-    
-    
-    
-    # Stop the spinner
-    spinner.stop_and_persist(symbol='🤖'.encode('utf-8'), text='All Checks have been finalized!')
-    
-    df.to_excel('data.xlsx', index=False)
-    
-    print(df)
-    
+    '''
+    global _indexation_checker
+    cache = IndexationCache(cache_path, ttl) if cache_path else None
+    _indexation_checker = IndexationChecker(backend or GoogleSearchBackend(), cache, batch_size)
+    return _indexation_checker
 
-    
-# =============================================================================
-# Mobile Friendly
-# =============================================================================
 
+def indexation_status(url, record):
     
-def mobile_friendly(url,df):
     '''
-    Function that checks if URL is mobile friendly. It uses viewport
+    Function that checks if URL is currently indexed on Google.
+
+    The answer comes from the shared IndexationChecker, so the source can be
+    Google search, a Search Console export or a fixed list.
 
     Parameters
     ----------
     url (str): The URL to check.
-    df (pandas.DataFrame): The pandas DataFrame to append the result to.
+    record (AuditRecord): The URL's record to add the result to.
 
     Returns
     -------
-    pandas.DataFrame: The updated pandas DataFrame.
+    AuditRecord: The updated record.
 
     '''
-    print(colored("- Is the Page Mobile Friendly?" ,'black',attrs=['bold']))
+    say_colored("- Is the Page indexed in Google?", 'black', attrs=['bold'])
     try:
-        # Send a GET request to the URL
-        response = requests.get(url)
-        
-        # Parse the HTML content of the response
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Check if the meta viewport tag exists
-        viewport_tag = soup.find('meta', attrs={'name': 'viewport'})
-        if viewport_tag is None:
-            print(f"{url} is not mobile-friendly ❌")
-            a = f"{url} is not mobile-friendly ❌ "
+        url_indexed = get_indexation_checker().is_indexed(url)
+
+        # Print the resultss
+        if url_indexed:
+            say(f"{url} is indexed in Google. ✅")
+            a = f"{url} is indexed in Google. ✅"
+        elif url_indexed is None:
+            say(f"Indexation of {url} is unknown. ⚠️")
+            a = f"Indexation of {url} is unknown. ⚠️"
         else:
-            a = f"{url} is mobile-friendly ✅"
-            print(f"{url} is mobile-friendly ✅ ")
-        
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({'URL': [url], 'Mobile Friendly': [a]})
-        
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], ignore_index=True) 
-        
+            say(f"{url} is not indexed in Google.❌")
+            a = f"{url} is not indexed in Google.❌"
+            
+            
+        # Add the result to the URL's record
+        record.set('Indexation', a)
+    
     except Exception as e:
         # Handle the exception
-        print(f"Mobile Friendly Check failed with error: {e}🚫🚫🚫🚫")
+        say(f"Indexation Check failed with error: {e}🚫🚫🚫🚫")
+        
+        # Record the failure in the URL's record
+        record.error('Indexation', f'Indexation Check failed with error: {e} ')
         
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({'URL': [url], 'Mobile Friendly': f'Mobile Friendly Check failed with error: {e} '})
-          
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], ignore_index=True)  
+    return record
 
-    return df
-    
- 
 # =============================================================================
-# Core Web Vitals
+# Robots.txt
 # =============================================================================
 
-def cwv_threshold(value, threshold1, threshold2):
+class RobotsRules:
     '''
-    Given a value and two thresholds, return a string indicating the quality of the value.
- 
+    A parsed robots.txt, compiled for fast lookups.
+
+    Follows Google's rules: a crawler obeys the group of the most specific
+    user-agent line that matches it (or '*'), and within that group the longest
+    matching Allow/Disallow pattern wins, Allow on a tie. Patterns can use '*'
+    and a trailing '$'.
+
+    Every rule is indexed by its literal prefix, the part before the first '*'
+    or '$'. A lookup only checks the rules whose prefix is a prefix of the path,
+    one dict lookup per distinct prefix length, so it stays fast with thousands
+    of rules.
+
     Parameters
     ----------
-    value : int or float
-        The value to be evaluated.
-    threshold1 : int or float
-        The lower threshold value.
-    threshold2 : int or float
-        The upper threshold value.
- 
-    Returns
-    -------
-    str
-        A string indicating the quality of the value, which can be one of:
-        - "good ✅" if the value is less than threshold1.
-        - "needs improvement ⚠️" if the value is between threshold1 and threshold2 (inclusive).
-        - "poor ❌" if the value is greater than threshold2.
-        - "invalid input" if the value is not a number.
+    text (str): The robots.txt content.
 
-   '''
-    if value < threshold1:
-        return "good ✅"
-    elif value >= threshold1 and value <= threshold2:
-        return "needs improvement ⚠️"
-    elif value > threshold2:
-        return "poor ❌"
-    else:
-        return "invalid input"
-    
-    
-def core_web_vitals(url,df):
-    
     '''
-    Function that checks the core web vitals of a URL using the PageSpeed Insights API.
+
+    def __init__(self, text=''):
+        self.groups = {}
+        self._compiled = {}
+        self._agents = {}
+
+        groups, in_rules = [], False
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            field, _, value = line.partition(':')
+            field, value = field.strip().lower(), value.strip()
+            if field == 'user-agent':
+                # A user-agent line after rules starts a new group
+                if in_rules or not groups:
+                    groups.append(([], []))
+                    in_rules = False
+                if value:
+                    groups[-1][0].append(value.lower())
+            elif field in ('allow', 'disallow') and groups:
+                in_rules = True
+                # An empty Disallow allows everything, so it isn't a rule
+                if value:
+                    groups[-1][1].append((field == 'allow', value))
+
+        # Groups for the same user-agent are merged
+        for agents, rules in groups:
+            for agent in agents:
+                self.groups.setdefault(agent, []).extend(rules)
+
+    @classmethod
+    def allow_all(cls):
+        return cls()
+
+    @classmethod
+    def disallow_all(cls):
+        return cls('User-agent: *\nDisallow: /')
+
+    def _group(self, user_agent):
+        '''Return the compiled group a crawler obeys, caching the choice.'''
+        if user_agent not in self._agents:
+            name = user_agent.lower()
+            matches = [agent for agent in self.groups if agent != '*' and agent in name]
+            agent = max(matches, key=len) if matches else ('*' if '*' in self.groups else None)
+            self._agents[user_agent] = agent
+        agent = self._agents[user_agent]
+        if agent is None:
+            return None
+        if agent not in self._compiled:
+            self._compiled[agent] = self._compile(self.groups[agent])
+        return self._compiled[agent]
+
+    @staticmethod
+    def _compile(rules):
+        index = {}
+        for allow, pattern in rules:
+            prefix = re.split(r'[*$]', pattern, 1)[0]
+            if prefix == pattern:
+                regex = None
+            else:
+                regex = re.compile(''.join('.*' if c == '*' else '$' if c == '$' and i == len(pattern) - 1
+                                           else re.escape(c) for i, c in enumerate(pattern)))
+            index.setdefault(prefix, []).append((len(pattern), allow, regex))
+        lengths = sorted({len(prefix) for prefix in index}, reverse=True)
+        return index, lengths
+
+    def can_fetch(self, user_agent, url):
+        '''
+        Whether a crawler may fetch a URL.
+
+        Parameters
+        ----------
+        user_agent (str): The crawler's name or User-Agent string.
+        url (str): The URL, or just its path and query.
+
+        Returns
+        -------
+        bool: False if the longest matching rule is a Disallow.
+
+        '''
+        group = self._group(user_agent)
+        if group is None:
+            return True
+        index, lengths = group
+
+        parts = urlsplit(url)
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+
+        best = (-1, True)
+        for length in lengths:
+            if length > len(path):
+                continue
+            for rule_length, allow, regex in index.get(path[:length], ()):
+                if (rule_length, allow) > best and (regex is None or regex.match(path)):
+                    best = (rule_length, allow)
+        return best[1]
+
+
+class RobotsCache:
+    '''
+    Fetches robots.txt once per host and keeps the compiled rules for ttl
+    seconds. Safe to share between threads; a host is only fetched once even
+    when many threads ask for it at the same time.
+
+    As Google does, a 4xx robots.txt allows everything, and a 5xx or an
+    unreachable server disallows everything until the rules expire.
 
     Parameters
     ----------
-    url (str): The URL to check.
-    df (pandas.DataFrame): The pandas DataFrame to append the result to.
+    ttl (float): Seconds the rules of a host are kept.
+    timeout (float, optional): Seconds to wait for a robots.txt. The session's timeout if None.
+
+    '''
+
+    def __init__(self, ttl=24 * 3600, timeout=None):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.hosts = {}
+        self._lock = threading.Lock()
+        self._host_locks = {}
+
+    def rules(self, url):
+        '''
+        Return the RobotsRules for the host of url, fetching them if needed.
+        '''
+        parts = urlsplit(url)
+        host = f'{parts.scheme}://{parts.netloc}'
+
+        entry = self.hosts.get(host)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            # Another thread may have fetched it while we waited
+            entry = self.hosts.get(host)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                entry = (self._fetch(host), time.monotonic())
+                self.hosts[host] = entry
+        return entry[0]
+
+    def _fetch(self, host):
+        # Retried like every page, a 5xx that sticks blocks the host until the rules expire
+        page = fetch_page(f'{host}/robots.txt', timeout=self.timeout)
+        if page.error is not None or page.status_code >= 500:
+            return RobotsRules.disallow_all()
+        if page.status_code >= 400:
+            return RobotsRules.allow_all()
+        return RobotsRules(page.text)
+
+    def can_fetch(self, user_agent, url):
+        return self.rules(url).can_fetch(user_agent, url)
+
+
+_robots_cache = RobotsCache()
+
+
+def get_robots_cache():
+    '''
+    Return the shared RobotsCache, or None if robots.txt isn't checked.
+    '''
+    return _robots_cache
+
+
+def configure_robots(ttl=24 * 3600, enabled=True):
+    '''
+    Replace the shared RobotsCache, or turn robots.txt checks off.
+    '''
+    global _robots_cache
+    _robots_cache = RobotsCache(ttl) if enabled else None
+    return _robots_cache
+
+
+# Set the user agents for Googlebot and Bingbot
+# How bot_accessibility() asks for the page: 'head' sends HEAD requests (or a
+# one byte Range GET) and only downloads full bodies to compare them when the
+# bots got different responses, 'get' streams a GET up to the </head>.
+BOT_PROBE = 'head'
+
+BOT_USER_AGENTS = {
+   "GoogleBot": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "Bingbot":"Mozilla/5.0 (compatible; Bingbot/2.0; +http://www.bing.com/bingbot.htm)",
+    "Yahoo Slurp":"Mozilla/5.0 (compatible; Yahoo! Slurp; http://help.yahoo.com/help/us/ysearch/slurp)",
+    "DuckDuckGo":"DuckDuckBot/1.0; (+http://duckduckgo.com/duckduckbot.html)",
+    "Baidu":"Mozilla/5.0 (compatible; Baiduspider/2.0; +http://www.baidu.com/search/spider.html)",
+    "Yandex":"Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)",
+    "Applebot":"Mozilla/5.0 (Device; OS_version) AppleWebKit/WebKit_version (KHTML, like Gecko)"
+}
+
+
+def load_user_agents(path):
+    '''
+    Replace the bots bot_accessibility() checks with the ones in a file.
+
+    Parameters
+    ----------
+    path (str): A .json file with a {"name": "user agent"} object, or a text
+        file with one "name: user agent" per line. Blank lines and lines
+        starting with # are skipped.
 
     Returns
     -------
-    pandas.DataFrame: The updated pandas DataFrame.
+    dict: The new BOT_USER_AGENTS.
 
     '''
-    
-    # Define the endpoint URL for the PageSpeed Insights API
-    endpoint = 'https://www.googleapis.com/pagespeedonline/v5/runPagespeed'
-    
-    # Define the parameters for the API request
-    params = {
-        'url': url,
-        'strategy': 'mobile'  # or 'desktop'
-    }
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            user_agents = json.load(f)
+        else:
+            user_agents = {}
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                name, _, user_agent = line.partition(':')
+                if not user_agent.strip():
+                    raise ValueError(f'Expected "name: user agent" in {path}, got {line!r}')
+                user_agents[name.strip()] = user_agent.strip()
 
-    # Make the API request
-    response = requests.get(endpoint, params=params)
-    
-    # Check the response status code
-    if response.status_code == 200:
-        # Parse the response JSON
-        data = response.json()
-        # Extract the performance score for DF
-        lcp = data['lighthouseResult']['audits']['largest-contentful-paint']['displayValue']
-        cls = data['lighthouseResult']['audits']['cumulative-layout-shift']['displayValue']
-        si = data['lighthouseResult']['audits']['speed-index']['displayValue']
-        fcp = data['lighthouseResult']['audits']['first-contentful-paint']['displayValue']
-        tbt = data['lighthouseResult']['audits']['total-blocking-time']['displayValue']
-        #tti = data['lighthouseResult']['audits']['interactive']['displayValue']
-        #score = data['lighthouseResult']['categories']['performance']['score']
-        
-        #Extract the scores for thresholds. 
-        lcp_int = data['lighthouseResult']['audits']['largest-contentful-paint']['numericValue']
-        cls_int = data['lighthouseResult']['audits']['cumulative-layout-shift']['numericValue']
-        si_int = data['lighthouseResult']['audits']['speed-index']['numericValue']
-        fcp_int = data['lighthouseResult']['audits']['first-contentful-paint']['numericValue']
-        tbt_int = data['lighthouseResult']['audits']['total-blocking-time']['numericValue']
-        #tti_int= data['lighthouseResult']['audits']['interactive']['numericValue']
-        
-    
-        
-        #checking if we are passing Each Value.
-        lcp_row = [cwv_threshold(lcp_int,2500,4000), lcp ]
-        cls_row = [cwv_threshold(cls_int,0.1,0.25), cls]
-        si_row = [cwv_threshold(si_int,3400,5800), si]
-        fcp_row = [cwv_threshold(fcp_int,1800,3000), fcp]
-        tbt_row = [cwv_threshold(tbt_int,200,600), tbt]
-        
-    
-        # Create a new DataFrame with the row(s) to append
-        cwv_new_row = pd.DataFrame({'Largest Contentful Paint': [lcp_row[1]], 'LCP Result': [lcp_row[0]],
-                                'Cumulative Layout Shift': [cls_row[1]], 'CLS Results': [cls_row[0]],
-                                'Speed Index': [si_row[1]], 'SI Result': [si_row[0]],
-                                'First Contentful Paint': [fcp_row[1]], 'FCP Result': [fcp_row[0]],
-                                'Total Blocking Time': [tbt_row[1]], 'TBT Result': [tbt_row[0]]})
-            
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, cwv_new_row],  axis=1)
-        print(colored(f"- Core Web Vitals Performance score for {url}:" ,'black',attrs=['bold']))
-        print(f"- Largest Contentful Paint: {lcp} - {lcp_row[0]}")
-        print(f'- Cumulative Layout Shift:  {cls} - {cls_row[0]}')
-        print(f'- Speed Index:  {si} - {si_row[0]}')
-        print(f'- First Contentful Paint:  {fcp} - {fcp_row[0]}')
-        print(f'- Total Blocking Time:  {tbt} - {tbt_row[0]}')
-    else:
-        print(f"Error {response.status_code}: {response.text}")
-        
-    return df
-            
-    
-    
-# =============================================================================
-# Check indexation Status of URL
-# =============================================================================
+    # Update in place, the report columns are built from this same dict
+    BOT_USER_AGENTS.clear()
+    BOT_USER_AGENTS.update(user_agents)
+    return BOT_USER_AGENTS
 
-def indexation_status(url,df):
-    
+
+def compare_bot_responses(url, record, fetcher, probes):
     '''
-    Function that checks if URL is currently indexed on Google.
+    Collapse identical bot responses, and download and compare the pages' heads
+    (see head_fields()) only when the bots got different responses, which is
+    when cloaking matters. Bots that got a different status or final URL, or
+    a different title, robots directive or canonical, got different pages.
 
     Parameters
     ----------
-    url (str): The URL to check.
-    df (pandas.DataFrame): The pandas DataFrame to append the result to.
+    url (str): The URL that was probed.
+    record (AuditRecord): The URL's record to add the 'Bot Responses' column to.
+    fetcher (PageFetcher): Fetcher shared with the rest of the audit.
+    probes (dict): Maps each bot name to its probe.
 
     Returns
     -------
-    pandas.DataFrame: The updated pandas DataFrame.
+    AuditRecord: The updated record.
 
     '''
-    print(colored("- Is the Page indexed in Google?" ,'black',attrs=['bold']))
-    try:
-        # Define the search query
-        query = f"site:{url}"
+    groups = {}
+    for key, probe in probes.items():
+        if probe.error is None:
+            groups.setdefault(response_signature(probe), []).append(key)
 
-        # Define the URL for the Google search results page
-        google_url = f"https://www.google.com/search?q={query}"
+    if len(groups) <= 1:
+        say(f"All bots got the same response ✅")
+        record.set('Bot Responses', f"All bots got the same response ✅")
+        return record
 
-        # Set the user agent header
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"}
+    # One head download per distinct response. The bodies of dynamic pages never
+    # match byte for byte, so only where the bots end up and what they would
+    # index is compared: a different redirect chain to the same page is fine.
+    pages = set()
+    for (status, _, final_url), keys in groups.items():
+        page = fetcher.fetch(url, BOT_USER_AGENTS[keys[0]], head_only=True)
+        page.raise_for_error()
+        pages.add((status, final_url, head_fields(page)))
 
-        # Make the HTTP GET request to Google with the user agent header
-        response = requests.get(google_url, headers=headers)
+    responses = []
+    for (status, redirects, _), keys in groups.items():
+        response = f"{', '.join(keys)}: {status}"
+        if redirects:
+            response += f" after {len(redirects)} redirect(s)"
+        responses.append(response)
+    summary = '; '.join(responses)
+    if len(pages) > 1:
+        a = f"Bots got {len(groups)} different responses and the pages differ ({summary}) ⚠️"
+    else:
+        a = f"Bots got {len(groups)} different responses but the same page ({summary}) ✅"
+    say(a)
+    record.set('Bot Responses', a)
+    return record
 
 
-        # Parse the HTML using BS4
-        soup = BeautifulSoup(response.text, "html.parser")
+def bot_accessibility(url, record, fetcher=None):
+    '''
+    Function that checks if URL is accessible for the main search engine bots.
 
-        # Check for search results containing the URL
-        search_results = soup.find_all('a', href=True)
+    Parameters
+    ----------
+    url (str): The URL to check.
+    record (AuditRecord): The URL's record to add the result to.
+    fetcher (PageFetcher, optional): Fetcher shared with the rest of the audit.
 
-        url_indexed = any(url in link['href'] for link in search_results)
+    Returns
+    -------
+    AuditRecord: The updated record.
 
-        # Print the resultss
-        if url_indexed:
-            print(f"{url} is indexed in Google. ✅")
-            a = f"{url} is indexed in Google. ✅"
-        else:
-            print(f"{url} is not indexed in Google.❌")
-            a = f"{url} is not indexed in Google.❌"
-            
-            
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({'Indexation': [a]})
-        
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1) 
-    
-    except Exception as e:
-        # Handle the exception
-        print(f"Indexation Check failed with error: {e}🚫🚫🚫🚫")
-        
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({'Indexation': f'Indexation Check failed with error: {e} '})
-          
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1)  
-        
-    return df
+    '''
+    if fetcher is None:
+        fetcher = PageFetcher()
 
-def bot_accessibility(url,df):
-    # Set the user agents for Googlebot and Bingbot
-    user_agents = {
-       "GoogleBot": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
-        "Bingbot":"Mozilla/5.0 (compatible; Bingbot/2.0; +http://www.bing.com/bingbot.htm)",
-        "Yahoo Slurp":"Mozilla/5.0 (compatible; Yahoo! Slurp; http://help.yahoo.com/help/us/ysearch/slurp)",
-        "DuckDuckGo":"DuckDuckBot/1.0; (+http://duckduckgo.com/duckduckbot.html)",
-        "Baidu":"Mozilla/5.0 (compatible; Baiduspider/2.0; +http://www.baidu.com/search/spider.html)",
-        "Yandex":"Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)",
-        "Applebot":"Mozilla/5.0 (Device; OS_version) AppleWebKit/WebKit_version (KHTML, like Gecko)"
-    }
+    user_agents = BOT_USER_AGENTS
     
-    print(colored(f"- Is the page accessible for Bots?:" ,'black',attrs=['bold']))
+    say_colored(f"- Is the page accessible for Bots?:", 'black', attrs=['bold'])
     
+    # Probe every bot at once, no bodies are downloaded
+    probes = {}
+    if BOT_PROBE == 'head':
+        probes = dict(zip(user_agents, fetcher.probe(url, user_agents.values())))
+
+    robots = get_robots_cache()
 
     for key, user_agent in user_agents.items():
         try:
-            response = requests.get(url, headers={"User-Agent": user_agent})
-            print(key, response)
+            # Only the status code matters here
+            response = probes[key] if probes else fetcher.fetch(url, user_agent, head_only=True)
+            response.raise_for_error()
+            say(key, response)
             
-            if response.status_code == 200:
-                print(f"{url} is accessible for",  key, " ✅")
+            # The bot's name is part of what its robots.txt group is matched against
+            if robots is not None and not robots.can_fetch(f'{key} {user_agent}', url):
+                say(f"{url} is blocked by robots.txt for", key, " ❌")
+                a = f"Response {response.status_code}.  {url} is blocked by robots.txt for {key}❌"
+            elif response.status_code == 200:
+                say(f"{url} is accessible for",  key, " ✅")
                 a = f"Response {response.status_code}.  {url} is accessible for  {key} ✅"
             else:
-                print(f"The page {url} is not accessible for", key," ❌")
+                say(f"The page {url} is not accessible for", key," ❌")
                 a = f"Response {response.status_code}.  {url} is not accessible for {key}❌"
                 
-            # Create a new DataFrame with the row(s) to append
-            new_row = pd.DataFrame({key: [a]})
-            
-            # Concatenate the new DataFrame with the existing DataFrame
-            df = pd.concat([df, new_row], axis=1)  
+            # Add the result to the URL's record
+            record.set(key, a)
             
                 
         except Exception as e:
             # Handle the exception
-            print(f"Bot Accessibility Check failed with error: {e}🚫🚫🚫🚫")
+            say(f"Bot Accessibility Check failed with error: {e}🚫🚫🚫🚫")
             
-            # Create a new DataFrame with the row(s) to append
-            new_row = pd.DataFrame({ 'Bot Accessibility': f'Bot Accessibility failed with error: {e} '})
-              
-            # Concatenate the new DataFrame with the existing DataFrame
-            df = pd.concat([df, new_row], axis=1)  
+            # Record the failure in the URL's record
+            record.error(key, f'Bot Accessibility failed with error: {e} ')
             
+    if probes:
+        try:
+            compare_bot_responses(url, record, fetcher, probes)
+        except Exception as e:
+            say(f"Bot Responses comparison failed with error: {e}🚫🚫🚫🚫")
+            record.error('Bot Responses', f'Bot Responses comparison failed with error: {e} ')
         
-    return df
+    return record
     
     
-def robots_meta_tag(url, df):
+def robots_meta_tag(url, record, page=None):
     #check 1 Meta robots tag
     
-    print(colored("- Indexability #1 -  Does the page contains a no index tag on the header?:" ,'black',attrs=['bold']))
+    say_colored("- Indexability #1 -  Does the page contains a no index tag on the header?:", 'black', attrs=['bold'])
     try:
-        response = requests.get(url)
+        if page is None:
+            page = fetch_page(url)
+        page.raise_for_error()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        meta_robots = soup.find('meta', attrs={'name': 'robots'})
+        meta_robots = page.document.meta_robots
 
-        if meta_robots and 'noindex' in meta_robots.get('content', ''):
-            print(f'The URL {url} is not indexable as it contains the <meta name="robots" content="noindex"> tag in the header. ❌')
+        if meta_robots and 'noindex' in meta_robots:
+            say(f'The URL {url} is not indexable as it contains the <meta name="robots" content="noindex"> tag in the header. ❌')
             a= f"The URL {url} is not indexable as it contains the <meta name='robots' content='noindex'> tag in the header. ❌"
             
         else:
-            print(f'The URL {url} does not contain the <meta name="robots" content="noindex"> tag in the header.✅')
+            say(f'The URL {url} does not contain the <meta name="robots" content="noindex"> tag in the header.✅')
             a = f'The URL {url} does not contain the <meta name="robots" content="noindex"> tag in the header.✅'
             
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({"No index Meta Tag": [a]})
-        
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1)  
+        # Add the result to the URL's record
+        record.set("No index Meta Tag", a)
         
     except requests.exceptions.RequestException as e:
         # Handle the exception
-        print(f"No index test failed with errors: {e}🚫🚫🚫🚫")
+        say(f"No index test failed with errors: {e}🚫🚫🚫🚫")
         
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({ 'No Index Meta Tag': f'No index test failed with errors:: {e} '})
-          
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1)  
-    return df
+        # Record the failure in the URL's record
+        record.error('No index Meta Tag', f'No index test failed with errors:: {e} ')
+    return record
 
     
     
     
-def check_x_robots_tag_noindex(url,df):
+def check_x_robots_tag_noindex(url, record, page=None):
     
-    print(colored("- Indexability #2 -  Does the page contains a HTTP response header: X-Robots-Tag: noindex ?:" ,'black',attrs=['bold']))
+    say_colored("- Indexability #2 -  Does the page contains a HTTP response header: X-Robots-Tag: noindex ?:", 'black', attrs=['bold'])
     
     try:
-        response = requests.get(url)
+        if page is None:
+            page = fetch_page(url)
+        page.raise_for_error()
         
-        x_robots_tag = response.headers.get('X-Robots-Tag')
+        x_robots_tag = page.headers.get('X-Robots-Tag')
 
         if x_robots_tag and ('noindex' in x_robots_tag or 'none' in x_robots_tag):
-            print(f'The URL {url} is not indexable. It contains the HTTP response header: X-Robots-Tag: noindex ❌')
+            say(f'The URL {url} is not indexable. It contains the HTTP response header: X-Robots-Tag: noindex ❌')
             a = f"The URL {url} is not indexable. It contains the HTTP response header: X-Robots-Tag: noindex ❌"
         else:
-            print(f'The URL {url} is indexable. It does not contain the HTTPS response header  X-Robots-Tag: noindex ✅')
+            say(f'The URL {url} is indexable. It does not contain the HTTPS response header  X-Robots-Tag: noindex ✅')
             a = f'The URL {url} is indexable. It does not contain the HTTPS response header  X-Robots-Tag: noindex ✅'
             
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({"No index Response Header": [a]})
-        
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1)
+        # Add the result to the URL's record
+        record.set("No index Response Header", a)
             
     except requests.exceptions.RequestException as e:
         # Handle the exception
-        print(f"No index Response header test failed with errors: {e}🚫🚫🚫🚫")
+        say(f"No index Response header test failed with errors: {e}🚫🚫🚫🚫")
         
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({ 'No index response header': f'No index response header failed with errors: {e} '})
-          
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1) 
+        # Record the failure in the URL's record
+        record.error('No index Response Header', f'No index response header failed with errors: {e} ')
         
-    return df
+    return record
 
       
-def check_canonical(url,df):
+def check_canonical(url, record, page=None):
     
-    print(colored("- Indexability #3 -  Is the page self canonical?" ,'black',attrs=['bold']))
+    say_colored("- Indexability #3 -  Is the page self canonical?", 'black', attrs=['bold'])
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            canonical_tag = soup.find('link', {'rel': 'canonical'})
-            canonical_url = canonical_tag.get('href')
+        if page is None:
+            page = fetch_page(url)
+        page.raise_for_error()
+        if page.status_code == 200:
+            canonical_url = page.document.canonical
             
-            if canonical_url == url:    
-                print(f'The URL {url} is indexable. The url is self canonicalized. {url} = {canonical_url} ✅')
+            # Compare normalized URLs, a trailing slash or http vs. https is still the same page
+            if canonical_url and url_key(canonical_url, base=url) == url_key(url):    
+                say(f'The URL {url} is indexable. The url is self canonicalized. {url} = {canonical_url} ✅')
                 a = f'The URL {url} is indexable. The url is self canonicalized. {url} = {canonical_url} ✅'
                 
             else:
-                print(f'The URL {url} is not indexable. The canonical url ( {canonical_url} ) is different than the page url. {url} ≠ {canonical_url} ❌')
+                say(f'The URL {url} is not indexable. The canonical url ( {canonical_url} ) is different than the page url. {url} ≠ {canonical_url} ❌')
                 a = f'The URL {url} is not indexable. The canonical url ( {canonical_url} ) is different than the page url. {url} ≠ {canonical_url} ❌'
-                
-            #Create a new DataFrame with the row(s) to append
-            new_row = pd.DataFrame({"Canonical": [a]})
-            
-            # Concatenate the new DataFrame with the existing DataFrame
-            df = pd.concat([df, new_row], axis=1)  
         
         else:
-            print(f'The URL {url} is not indexable.The page has a status code of{response.status_code} ❌')
-            a = f'The URL {url} is not indexable.The page has a status code of{response.status_code} ❌'
+            say(f'The URL {url} is not indexable.The page has a status code of{page.status_code} ❌')
+            a = f'The URL {url} is not indexable.The page has a status code of{page.status_code} ❌'
          
-        #Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({"Canonical": [a]})
-        
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1)  
+        # Add the result to the URL's record
+        record.set("Canonical", a)
             
             
             
     except requests.exceptions.RequestException as e:  
         # Handle the exception
-        print(f"No index Response header test failed with errors: {e}🚫🚫🚫🚫")
+        say(f"Canonical test failed with errors: {e}🚫🚫🚫🚫")
         
-        # Create a new DataFrame with the row(s) to append
-        new_row = pd.DataFrame({ 'No index response header': f'No index response header failed with errors: {e} '})
-          
-        # Concatenate the new DataFrame with the existing DataFrame
-        df = pd.concat([df, new_row], axis=1) 
+        # Record the failure in the URL's record
+        record.error('Canonical', f'Canonical test failed with errors: {e} ')
         
-    return df  
+    return record
 
-def check_schema_org(url, df):
-    print(colored("- Schema.org Check -", 'black', attrs=['bold']))
+def check_schema_org(url, record, page=None):
+    say_colored("- Schema.org Check -", 'black', attrs=['bold'])
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            schema_types = set()
-
-            # JSON-LD
-            for script_tag in soup.find_all('script', type='application/ld+json'):
-                try:
-                    data = json.loads(script_tag.string)
-                    if isinstance(data, list):
-                        for item in data:
-                            if '@type' in item:
-                                schema_types.add(item['@type'])
-                    elif '@type' in data:
-                        schema_types.add(data['@type'])
-                except json.JSONDecodeError:
-                    pass
-
-            # Microdata
-            for microdata_tag in soup.find_all(attrs={"itemtype": True}):
-                schema_types.add(microdata_tag['itemtype'])
-
-            # RDFa
-            for rdfa_tag in soup.find_all(attrs={"typeof": True}):
-                schema_types.add(rdfa_tag['typeof'])
+        if page is None:
+            page = fetch_page(url)
+        page.raise_for_error()
+        if page.status_code == 200:
+            # JSON-LD, Microdata and RDFa
+            schema_types = page.document.schema_types()
 
             if schema_types:
-                print(f"The URL {url} has schema.org structure(s): {', '.join(schema_types)} ✅")
+                say(f"The URL {url} has schema.org structure(s): {', '.join(schema_types)} ✅")
                 a = f"The URL {url} has schema.org structure(s): {', '.join(schema_types)} ✅"
             else:
-                print(f"The URL {url} does not have any identifiable schema.org structures ❌")
+                say(f"The URL {url} does not have any identifiable schema.org structures ❌")
                 a = f"The URL {url} does not have any identifiable schema.org structures ❌"
         else:
-            print(f"The URL {url} could not be accessed. The page has a status code of {response.status_code} ❌")
-            a = f"The URL {url} could not be accessed. The page has a status code of {response.status_code} ❌"
-
-    except requests.exceptions.RequestException as e:
-        print(f"Schema.org check failed with errors: {e} 🚫")
-        a = f"Schema.org check failed with errors: {e} 🚫"
+            say(f"The URL {url} could not be accessed. The page has a status code of {page.status_code} ❌")
+            a = f"The URL {url} could not be accessed. The page has a status code of {page.status_code} ❌"
 
-    # Create a new DataFrame with the row(s) to append
-    new_row = pd.DataFrame({"Schema.org": [a]})
+        # Add the result to the URL's record
+        record.set("Schema.org", a)
 
-    # Concatenate the new DataFrame with the existing DataFrame
-    df = pd.concat([df, new_row], axis=1)
+    except requests.exceptions.RequestException as e:
+        say(f"Schema.org check failed with errors: {e} 🚫")
+        record.error("Schema.org", f"Schema.org check failed with errors: {e} 🚫")
 
-    return df
+    return record
     
     
    
     
      
-            
-checklist(url)
+
+# =============================================================================
+# Site Graph Check
+# =============================================================================
+
+def site_graph(url, record, page=None):
+    '''
+    Add the page to the site graph (see configure_site_graph()): its status,
+    whether it is noindex, its canonical and the SimHash of its content. The
+    problems are found across the whole site at the end of the audit, so this
+    check writes no column unless it fails.
+
+    Parameters
+    ----------
+    url (str): The URL to check.
+    record (AuditRecord): The URL's record.
+    page (Page, optional): The already fetched page. It is fetched if not given.
+
+    Returns
+    -------
+    AuditRecord: The record.
+
+    '''
+    graph = get_site_graph()
+    if graph is None:
+        return record
+    if page is None:
+        page = fetch_page(url)
+
+    # Pages that fail or redirect still go in, canonicals to them are problems
+    if page.error is not None:
+        graph.add(url, 0)
+        return record
+    status = page.redirects[0][0] if page.redirects else page.status_code
+    if status != 200:
+        graph.add(url, status)
+        return record
+
+    document = page.document
+    noindex = ('noindex' in (document.meta_robots or '').lower()
+               or 'noindex' in page.headers.get('X-Robots-Tag', '').lower())
+    canonical = urljoin(url, document.canonical.strip()) if document.canonical else None
+    graph.add(url, status, noindex, canonical, content_simhash(page.content))
+    return record
+
+
+if __name__ == '__main__':
+    main()
     
         
     
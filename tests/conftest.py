@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures for the tests.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+
+
+@pytest.fixture(scope='session')
+def seo():
+    '''
+    seo-checklist.py loaded as a module. The file name has a dash, so it can't
+    be imported with a normal import statement.
+    '''
+    if 'seo_checklist' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('seo_checklist', os.path.join(ROOT, 'seo-checklist.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['seo_checklist'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['seo_checklist']
+
+
+@pytest.fixture
+def fixture_path():
+    '''
+    Return the path of a file in tests/fixtures.
+    '''
+    return lambda name: os.path.join(FIXTURES, name)
+
+
+@pytest.fixture
+def http_server():
+    '''
+    A local HTTP server running in a background thread. Set server.pages to
+    map a path to a function taking the request headers and the query
+    string and returning (status, headers, body). Yields the server, its base URL is server.url.
+    server.requests lists the (method, path) of every request.
+    '''
+    pages = {}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path, _, query = self.path.partition('?')
+            requests.append((self.command, path))
+            page = pages.get(path)
+            status, headers, body = page(self.headers, query) if page else (404, {}, b'')
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        do_HEAD = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.pages = pages
+    server.requests = requests
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
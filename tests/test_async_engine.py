@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for how AsyncAuditEngine handles failures.
+"""
+
+import asyncio
+
+import pytest
+
+URLS = [f'https://example.com/{i}' for i in range(50)]
+
+
+@pytest.fixture
+def engine(seo):
+    engine = seo.AsyncAuditEngine(concurrency=4)
+
+    async def audit_url(url, record=None, checks=None):
+        await asyncio.sleep(0)
+        if url.endswith('/13'):
+            raise ValueError('boom')
+        return seo.AuditRecord(url)
+
+    engine.audit_url = audit_url
+    return engine
+
+
+def run(engine, urls, on_result=None):
+    # A hung engine fails the test instead of blocking the suite
+    return asyncio.run(asyncio.wait_for(engine.run(urls, on_result), timeout=10))
+
+
+def test_url_errors_are_reported_per_url(seo, engine):
+    records = run(engine, URLS)
+    assert [record.url for record in records] == URLS
+    failed = records[13]
+    assert failed.failed == {check.column for check in seo.selected_checks()}
+    assert 'boom' in failed['Canonical']
+    assert not any(record.failed for index, record in enumerate(records) if index != 13)
+
+
+def test_on_result_error_stops_the_run(engine):
+    written = []
+
+    def on_result(record):
+        if len(written) == 5:
+            raise OSError('disk full')
+        written.append(record)
+
+    with pytest.raises(OSError, match='disk full'):
+        run(engine, URLS, on_result)
+    assert len(written) == 5
+
+
+def test_broken_parse_pool_stops_the_run(seo, engine):
+    from concurrent.futures.process import BrokenProcessPool
+
+    async def audit_url(url, record=None, checks=None):
+        raise BrokenProcessPool('a parser died')
+
+    engine.audit_url = audit_url
+    with pytest.raises(BrokenProcessPool):
+        run(engine, iter(URLS))
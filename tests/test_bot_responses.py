@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the bot probes and the comparison of their responses.
+"""
+
+import datetime
+import io
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+
+URL = 'https://example.com/page'
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, body=b'', headers=None, history=()):
+        self.url = url
+        self.status_code = status_code
+        self.content = body
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.encoding = 'utf-8'
+        self.history = list(history)
+        self.elapsed = datetime.timedelta(milliseconds=5)
+        self.raw = io.BytesIO()
+
+    def iter_content(self, chunk_size):
+        self.raw = io.BytesIO(self.content)
+        return iter(lambda: self.raw.read(chunk_size), b'')
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    '''
+    Answers each User-Agent with its own page and records every request.
+
+    pages maps a bot name found in the User-Agent to (status, body, redirects),
+    redirects being the URLs redirected through before the final URL. The
+    final URL is URL unless pages gives it as a fourth item.
+    '''
+
+    retries = 0
+
+    def __init__(self, pages, refuse_head=False):
+        self.pages = pages
+        self.refuse_head = refuse_head
+        self.requests = []
+
+    def answer(self, url, headers):
+        for name, answer in self.pages.items():
+            if name in headers.get('User-Agent', ''):
+                break
+        status, body, redirects = answer[:3]
+        final_url = answer[3] if len(answer) > 3 else URL
+        history = [FakeResponse(redirect, 301) for redirect in redirects]
+        return FakeResponse(final_url, status, body, {'Content-Length': str(len(body))}, history)
+
+    def head(self, url, headers=None, **kwargs):
+        self.requests.append(('HEAD', headers))
+        if self.refuse_head:
+            return FakeResponse(url, 405)
+        response = self.answer(url, headers)
+        response.content = b''
+        return response
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(('GET', headers))
+        response = self.answer(url, headers)
+        if 'Range' in headers and response.status_code == 200:
+            response.status_code = 206
+            response.headers['Content-Range'] = f'bytes 0-0/{len(response.content)}'
+            response.content = response.content[:1]
+        return response
+
+
+def page(title, robots='index, follow', canonical=URL, body=''):
+    return (f'<html><head><title>{title}</title><meta name="robots" content="{robots}">'
+            f'<link rel="canonical" href="{canonical}"></head><body>{body}</body></html>').encode()
+
+
+@pytest.fixture
+def bots(seo, monkeypatch):
+    monkeypatch.setattr(seo, 'BOT_USER_AGENTS', {
+        'GoogleBot': 'Mozilla/5.0 (compatible; Googlebot/2.1)',
+        'Bingbot': 'Mozilla/5.0 (compatible; Bingbot/2.0)',
+    })
+    monkeypatch.setattr(seo, 'BOT_PROBE', 'head')
+    monkeypatch.setattr(seo, 'get_robots_cache', lambda: None)
+    return seo
+
+
+def audit(seo, monkeypatch, session):
+    monkeypatch.setattr(seo, 'get_session', lambda: session)
+    return seo.bot_accessibility(URL, seo.AuditRecord(URL), seo.PageFetcher())
+
+
+def test_identical_probes_are_collapsed(bots, monkeypatch):
+    # Dynamic pages differ in length on every request, that isn't a difference,
+    # and neither is a final URL that only differs in how it is written
+    session = FakeSession({
+        'Googlebot': (200, page('Shoes', body='token 1'), []),
+        'Bingbot': (200, page('Shoes', body='a much longer token 2'), [], 'https://EXAMPLE.com/page/'),
+    })
+    record = audit(bots, monkeypatch, session)
+
+    assert record['Bot Responses'] == 'All bots got the same response ✅'
+    assert [method for method, _ in session.requests] == ['HEAD', 'HEAD']
+
+
+def test_refused_head_falls_back_to_a_range_get(bots, monkeypatch):
+    session = FakeSession({
+        'Googlebot': (200, page('Shoes', body='token 1'), []),
+        'Bingbot': (200, page('Shoes', body='a much longer token 2'), []),
+    }, refuse_head=True)
+    record = audit(bots, monkeypatch, session)
+
+    gets = [headers for method, headers in session.requests if method == 'GET']
+    assert len(gets) == 2 and all(headers['Range'] == 'bytes=0-0' for headers in gets)
+    assert 'is accessible for  GoogleBot' in record['GoogleBot']
+    assert record['Bot Responses'] == 'All bots got the same response ✅'
+
+
+def test_other_redirects_to_the_same_page_are_the_same_page(bots, monkeypatch):
+    session = FakeSession({
+        'Googlebot': (200, page(' Shoes ', body='token 1'), []),
+        'Bingbot': (200, page('Shoes', robots='Index,Follow', canonical='https://EXAMPLE.com/page/',
+                              body='token 2'), ['http://example.com/page']),
+    })
+    record = audit(bots, monkeypatch, session)
+
+    assert record['Bot Responses'].startswith('Bots got 2 different responses but the same page')
+
+
+@pytest.mark.parametrize('bingbot', [
+    (200, page('Shoes', robots='noindex'), ['http://example.com/page']),
+    (200, page('Cheap pills'), ['http://example.com/page']),
+    (200, page('Shoes', canonical='https://example.com/elsewhere'), ['http://example.com/page']),
+    (200, page('Shoes'), [URL], 'https://example.com/elsewhere'),
+    (403, page('Forbidden'), []),
+])
+def test_real_divergence_is_reported(bots, monkeypatch, bingbot):
+    session = FakeSession({'Googlebot': (200, page('Shoes'), []), 'Bingbot': bingbot})
+    record = audit(bots, monkeypatch, session)
+
+    assert record['Bot Responses'].startswith('Bots got 2 different responses and the pages differ')
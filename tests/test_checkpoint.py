@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for resuming audits from a checkpoint and --retry-failed.
+"""
+
+import csv
+
+import pytest
+
+CHECKS = ['check_canonical', 'check_schema_org']
+URLS = [f'https://example.com/{i}' for i in range(3)]
+
+
+class FakeChecks:
+    '''
+    Stands in for run_checks(): records which checks ran for which URL, and
+    fails the checks listed in failing.
+    '''
+
+    def __init__(self, seo):
+        self.columns = {check.name: check.column for check in seo.CHECKS}
+        self.runs = []
+        self.failing = set()
+
+    def __call__(self, url, record=None, fetcher=None, checks=None):
+        self.runs.append((url, tuple(checks)))
+        for name in checks:
+            column = self.columns[name]
+            if (url, name) in self.failing:
+                record.error(column, f'{column} check failed with error: timeout ')
+            else:
+                record.set(column, f'{name} ok ✅')
+            record.checks[name] = [column]
+        return record
+
+
+@pytest.fixture
+def fake(seo, monkeypatch):
+    fake = FakeChecks(seo)
+    monkeypatch.setattr(seo, 'run_checks', fake)
+    yield fake
+    seo.set_quiet(False)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('\n'.join(URLS) + '\n')
+    return {'urls': str(urls), 'checkpoint': str(tmp_path / 'checkpoint.sqlite'), 'output': str(tmp_path / 'report.csv')}
+
+
+def audit(seo, paths, *extra):
+    seo.main(['--urls', paths['urls'], '--checkpoint', paths['checkpoint'], '--output', paths['output'],
+              '--include', *CHECKS, '--quiet', '--no-robots', *extra])
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_resumed_run_skips_what_succeeded(seo, fake, paths):
+    fake.failing = {(URLS[1], 'check_schema_org')}
+    audit(seo, paths)
+    assert sorted(fake.runs) == [(url, tuple(CHECKS)) for url in URLS]
+
+    # Only the failed check of the failed URL runs again
+    fake.runs.clear()
+    fake.failing.clear()
+    audit(seo, paths)
+    assert fake.runs == [(URLS[1], ('check_schema_org',))]
+
+    # Nothing is left to do
+    fake.runs.clear()
+    audit(seo, paths)
+    assert fake.runs == []
+
+
+def test_resumed_run_appends_to_the_report(seo, fake, paths):
+    fake.failing = {(URLS[1], 'check_schema_org')}
+    audit(seo, paths)
+    fake.failing.clear()
+    audit(seo, paths)
+
+    rows = read_rows(paths['output'])
+    header = rows[0]
+    assert rows.count(header) == 1
+    assert [row[0] for row in rows[1:]] == URLS + [URLS[1]]
+    # The re-checked row keeps the results of the check that succeeded before
+    retried = dict(zip(header, rows[-1]))
+    assert retried['Canonical'] == 'check_canonical ok ✅'
+    assert retried['Schema.org'] == 'check_schema_org ok ✅'
+
+    report = seo.read_report(paths['output'])
+    assert list(report['URL']) == [URLS[0], URLS[2], URLS[1]]
+    assert not report['Schema.org'].str.contains('failed').any()
+
+
+def test_retry_failed_only_runs_the_named_checks(seo, fake, paths):
+    fake.failing = {(URLS[0], 'check_canonical'), (URLS[2], 'check_schema_org')}
+    audit(seo, paths)
+    fake.runs.clear()
+    fake.failing.clear()
+
+    seo.main(['--retry-failed', 'check_schema_org', '--checkpoint', paths['checkpoint'],
+              '--output', paths['output'], '--include', *CHECKS, '--quiet', '--no-robots'])
+    assert fake.runs == [(URLS[2], ('check_schema_org',))]
+
+    # Without names every failed check is retried
+    fake.runs.clear()
+    seo.main(['--retry-failed', '--checkpoint', paths['checkpoint'], '--output', paths['output'],
+              '--include', *CHECKS, '--quiet', '--no-robots'])
+    assert fake.runs == [(URLS[0], ('check_canonical',))]
+    assert len(read_rows(paths['output'])) == 1 + len(URLS) + 2
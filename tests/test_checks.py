@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for picking the checks and fetching only as much of the page as they need.
+"""
+
+import pytest
+
+
+HEAD = (b'<html><head><title>Shoes</title><meta name="robots" content="index">'
+        b'<link rel="canonical" href="/page"></head>')
+BODY = HEAD + b'<body>' + b'<p>Shoes</p>' * 20000 + b'<script type="application/ld+json">{"@type": "Product"}</script></body></html>'
+
+
+@pytest.fixture
+def page_url(http_server):
+    http_server.pages['/page'] = lambda headers, query: (200, {'X-Robots-Tag': 'all'}, BODY)
+    return http_server.url + '/page'
+
+
+def test_select_checks_by_name_and_input(seo):
+    assert seo.select_checks() is None
+    assert seo.select_checks(['headers']) == ['bot_accessibility', 'check_x_robots_tag_noindex']
+    assert seo.select_checks(['head', 'check_schema_org'], ['check_canonical']) == [
+        'mobile_friendly', 'robots_meta_tag', 'check_schema_org']
+    assert 'core_web_vitals' not in seo.select_checks(exclude=['api'])
+    with pytest.raises(ValueError):
+        seo.select_checks(['check_everything'])
+
+
+@pytest.mark.parametrize('checks, mode', [
+    (['check_x_robots_tag_noindex'], 'probe'),
+    (['bot_accessibility', 'check_x_robots_tag_noindex'], 'probe'),
+    (['check_canonical', 'check_x_robots_tag_noindex'], True),
+    (['check_canonical', 'check_schema_org'], False),
+    (['indexation_status', 'core_web_vitals'], None),
+    (None, False),
+])
+def test_page_mode(seo, checks, mode):
+    assert seo.page_mode(checks) == mode
+
+
+def test_headers_checks_only_send_a_head_request(seo, http_server, page_url):
+    fetcher = seo.PageFetcher()
+    record = seo.run_checks(page_url, fetcher=fetcher, checks=['check_x_robots_tag_noindex'])
+
+    assert http_server.requests == [('HEAD', '/page')]
+    assert not fetcher.pages
+    assert '✅' in record['No index Response Header']
+
+
+def test_head_checks_stream_the_head_only(seo, http_server, page_url):
+    fetcher = seo.PageFetcher()
+    record = seo.run_checks(page_url, fetcher=fetcher, checks=['robots_meta_tag', 'check_canonical'])
+
+    assert http_server.requests == [('GET', '/page')]
+    page = fetcher.pages[page_url, None]
+    assert page.truncated and HEAD.startswith(page.content) and b'canonical' in page.content
+    assert page.size < len(BODY)
+    assert '✅' in record['Canonical']
+
+
+def test_schema_check_downloads_the_whole_page(seo, http_server, page_url):
+    fetcher = seo.PageFetcher()
+    record = seo.run_checks(page_url, fetcher=fetcher, checks=['check_canonical', 'check_schema_org'])
+
+    assert http_server.requests == [('GET', '/page')]
+    page = fetcher.pages[page_url, None]
+    assert not page.truncated and page.content == BODY
+    assert 'Product' in record['Schema.org']
+
+
+@pytest.fixture
+def site_graph_run(seo, tmp_path, monkeypatch):
+    '''
+    Runs main() with --site-graph and returns the checks run_checks() got.
+    '''
+    # configure_site_graph() registers its check, keep that out of the other tests
+    monkeypatch.setattr(seo, 'CHECKS', list(seo.CHECKS))
+    monkeypatch.setattr(seo, 'CHECK_NAMES', list(seo.CHECK_NAMES))
+    monkeypatch.setattr(seo, 'CHECK_COLUMNS', list(seo.CHECK_COLUMNS))
+    calls = []
+    monkeypatch.setattr(seo, 'run_checks', lambda url, record=None, fetcher=None, checks=None:
+                        calls.append(checks) or record)
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('https://example.com/a\n')
+
+    def run(*extra):
+        seo.main(['--urls', str(urls), '--output', str(tmp_path / 'report.csv'), '--quiet', '--no-robots',
+                  '--site-graph', str(tmp_path / 'graph.sqlite'), *extra])
+        return calls[-1]
+
+    yield run
+    seo.configure_site_graph()
+    seo.set_quiet(False)
+
+
+def test_include_keeps_the_site_graph_check(site_graph_run):
+    assert site_graph_run('--include', 'check_canonical') == ['check_canonical', 'site_graph']
+    assert site_graph_run('--exclude', 'api')[-1] == 'site_graph'
+
+
+def test_excluding_the_site_graph_check_is_an_error(site_graph_run):
+    with pytest.raises(SystemExit, match='--site-graph needs the site_graph check'):
+        site_graph_run('--exclude', 'dom')
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Core Web Vitals history and its regression report.
+"""
+
+import pytest
+
+GOOD = {'largest-contentful-paint': 2000, 'cumulative-layout-shift': 0.0, 'speed-index': 3000,
+        'first-contentful-paint': 1500, 'total-blocking-time': 0}
+
+
+def add_days(seo, path, days, urls, **changes):
+    for day in days:
+        history = seo.CWVHistory(path, day=day)
+        for url in urls:
+            values = dict(GOOD, **changes)
+            history.add(url, 'mobile', {audit: {'numericValue': value} for audit, value in values.items()})
+        history.close()
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return str(tmp_path / 'cwv.sqlite')
+
+
+def regressions(seo, path, **kwargs):
+    history = seo.CWVHistory(path)
+    try:
+        table = seo.cwv_regressions(history, days=7, **kwargs)
+    finally:
+        history.close()
+    return table.set_index(['template', 'metric'])
+
+
+def test_cwv_regression_is_flagged(seo, history_path):
+    urls = [f'https://example.com/shop/{i}' for i in range(5)]
+    add_days(seo, history_path, range(7), urls)
+    add_days(seo, history_path, range(7, 14), urls, **{'largest-contentful-paint': 3000})
+    table = regressions(seo, history_path)
+    assert table.loc[('example.com/shop/', 'lcp'), 'regression'] == 'regression ❌'
+    assert table.loc[('example.com/shop/', 'lcp'), 'change'] == pytest.approx(0.5)
+    assert (table.drop(('example.com/shop/', 'lcp'))['regression'] == 'ok ✅').all()
+
+
+def test_cwv_small_changes_from_zero_are_not_regressions(seo, history_path):
+    urls = [f'https://example.com/blog/{i}' for i in range(5)]
+    add_days(seo, history_path, range(7), urls)
+    add_days(seo, history_path, range(7, 14), urls, **{'total-blocking-time': 3})
+    table = regressions(seo, history_path)
+    tbt = table.loc[('example.com/blog/', 'tbt')]
+    assert tbt['regression'] == 'ok ✅'
+    assert tbt['change'] != tbt['change']  # NaN, not inf
+    cls = table.loc[('example.com/blog/', 'cls')]
+    assert cls['regression'] == 'ok ✅'
+    assert cls['change'] == 0
+
+
+def test_cwv_templates_without_enough_samples_are_left_out(seo, history_path):
+    add_days(seo, history_path, range(14), [f'https://example.com/shop/{i}' for i in range(5)])
+    add_days(seo, history_path, range(14), ['https://example.com/rare/1'])
+    templates = set(regressions(seo, history_path, min_samples=20).index.get_level_values('template'))
+    assert templates == {'example.com/shop/'}
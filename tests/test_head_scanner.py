@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for HeadScanner, which finds where the <head> of a streamed page ends.
+"""
+
+import pytest
+
+
+def scan(seo, html, chunk_size=None):
+    '''
+    Feed html to a HeadScanner, in chunks of chunk_size bytes if given, and
+    return where it found the end of the head.
+    '''
+    scanner = seo.HeadScanner()
+    chunk_size = chunk_size or len(html)
+    for start in range(0, len(html), chunk_size):
+        if scanner.feed(html[start:start + chunk_size]):
+            break
+    return scanner.end
+
+
+@pytest.mark.parametrize('html, marker', [
+    (b'<html><head><title>t</title></head><body>x</body></html>', b'</head>'),
+    (b'<html><head><meta charset=utf-8><BODY>x', b'<BODY>'),
+    (b'<html><head><link rel=canonical href=/a><div>x</div>', b'<div>'),
+    (b'<head><script>if (a<b) document.write("<body>")</script><p>', b'<p>'),
+    (b'<head><style>a<b{}</style><noscript><img src=x></noscript></head>', b'</head>'),
+    (b'<head><!-- <body> --><meta name=robots content=noindex></head>', b'</head>'),
+    (b'<head><title>a<b</title><meta name=robots content=noindex></head>', b'</head>'),
+    (b'<head><TITLE>a <div> b</TITLE><meta name=x></head>', b'</head>'),
+    (b'<head><template><div>x</div></template></head>', b'</head>'),
+])
+def test_head_end(seo, html, marker):
+    expected = html.index(marker)
+    assert scan(seo, html) == expected
+    # The same end whatever the chunks the body arrives in
+    for chunk_size in (1, 2, 3, 7):
+        assert scan(seo, html, chunk_size) == expected
+
+
+def test_head_not_ended_yet(seo):
+    scanner = seo.HeadScanner()
+    assert not scanner.feed(b'<html><head><title>still loading')
+    assert scanner.end is None
+    assert scanner.feed(b'</title></head>')
+    assert scanner.end == len(b'<html><head><title>still loading</title>')
+
+
+def test_head_end_in_title_regression(seo):
+    # The "<b" in the title used to be taken for a body tag
+    html = b'<title>a<b</title><meta name=robots content=noindex>'
+    assert scan(seo, html) is None
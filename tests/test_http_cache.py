@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the on disk HTTP cache and the parse results stored with it.
+"""
+
+import pytest
+
+
+def html(title, padding=0):
+    return (f'<html><head><title>{title}</title><meta name="robots" content="noindex"></head>'
+            f'<body>{"x" * padding}</body></html>').encode()
+
+
+class Site:
+    '''
+    Serves one page with an ETag, answering 304 while it hasn't changed.
+    '''
+
+    def __init__(self, body, etag='"v1"'):
+        self.body = body
+        self.etag = etag
+
+    def __call__(self, headers, query):
+        if headers.get('If-None-Match') == self.etag:
+            return 304, {'ETag': self.etag}, b''
+        return 200, {'ETag': self.etag, 'Content-Type': 'text/html'}, self.body
+
+
+@pytest.fixture
+def cache(seo, tmp_path):
+    cache = seo.configure_http_cache(str(tmp_path / 'http.sqlite'))
+    writes = []
+    store_document = cache.store_document
+    cache.store_document = lambda *args: (writes.append(args[:2]), store_document(*args))
+    cache.writes = writes
+    yield cache
+    seo.configure_http_cache(None)
+
+
+def test_document_is_stored_once_and_reused(seo, http_server, cache):
+    http_server.pages['/a'] = Site(html('first'))
+    url = http_server.url + '/a'
+    page = seo.fetch_page(url)
+    assert page.document.meta_robots == 'noindex'
+    page.set_document(page.document)
+    assert cache.writes == [(url, None)]
+
+    again = seo.fetch_page(url)
+    assert again.from_cache
+    assert again.document.meta_robots == 'noindex'
+    assert cache.writes == [(url, None)]
+
+
+def test_pages_not_cached_are_not_written(seo, http_server, cache):
+    http_server.pages['/plain'] = lambda headers, query: (200, {'Content-Type': 'text/html'}, html('plain'))
+    page = seo.fetch_page(http_server.url + '/plain')
+    assert page.document.meta_robots == 'noindex'
+    assert cache.writes == []
+
+
+def test_head_only_parse_keeps_the_full_document(seo, http_server, cache):
+    site = Site(html('full'))
+    http_server.pages['/b'] = site
+    url = http_server.url + '/b'
+    seo.fetch_page(url).document
+    assert cache.writes == [(url, None)]
+
+    # The page changed and is now fetched head only: its head-only parse
+    # mustn't replace the document of the complete cached body
+    site.body, site.etag = html('changed', padding=seo.HEAD_DRAIN_LIMIT * 2), '"v2"'
+    head = seo.fetch_page(url, head_only=True)
+    assert head.truncated
+    assert head.document.meta_robots == 'noindex'
+    assert cache.writes == [(url, None)]
+    assert cache.lookup(url, None)['etag'] == '"v1"'
+
+
+@pytest.mark.parametrize('head_only', [False, True])
+def test_not_modified_counts_the_bytes_received(seo, http_server, cache, head_only):
+    body = html('big', padding=50000)
+    http_server.pages['/c'] = Site(body)
+    url = http_server.url + '/c'
+    assert seo.fetch_timing(seo.fetch_page(url))['bytes'] == len(body)
+
+    # The 304 has no body, the cached one wasn't downloaded again
+    again = seo.fetch_page(url, head_only=head_only)
+    assert again.from_cache and again.content == body
+    assert seo.fetch_timing(again)['bytes'] == 0
+    assert cache.stats.bytes_saved == len(body)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the indexation backends.
+"""
+
+import threading
+import time
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class FakeSession:
+    '''
+    Answers every search with the same results page and records the queries.
+    '''
+
+    def __init__(self, text):
+        self.text = text
+        self.queries = []
+
+    def get(self, url, params=None, **kwargs):
+        self.queries.append(params['q'])
+        return FakeResponse(self.text)
+
+
+@pytest.fixture
+def search_session(seo, fixture_path, monkeypatch):
+    with open(fixture_path('google_results.html'), encoding='utf-8') as f:
+        session = FakeSession(f.read())
+    monkeypatch.setattr(seo, 'get_api_session', lambda: session)
+    return session
+
+
+@pytest.fixture
+def google(seo, search_session):
+    return seo.GoogleSearchBackend(rate=1000)
+
+
+def test_google_result_url_unwraps_redirects(seo):
+    result_url = seo.GoogleSearchBackend.result_url
+    assert result_url('/url?q=https://example.com/a&sa=U') == 'https://example.com/a'
+    assert result_url('https://www.google.com/url?url=https://example.com/a') == 'https://example.com/a'
+    assert result_url('https://example.com/b') == 'https://example.com/b'
+    assert result_url('/search?q=site:example.com') is None
+    assert result_url('#top') is None
+
+
+def test_google_search_returns_normalized_results(google):
+    assert google.search('site:example.com') == {
+        'https://accounts.google.com/ServiceLogin',
+        'https://example.com/blog/page-2',
+        'https://example.com/shop/%E2%82%AC',
+        'https://example.com/search?page=2&q=shoes',
+        'https://example.com/about',
+    }
+
+
+def test_google_lookup_needs_an_exact_match(google, search_session):
+    urls = ['https://example.com/blog/page', 'https://example.com/blog/page-2',
+            'https://example.com/shop/%E2%82%AC', 'https://example.com/search?q=shoes']
+    assert google.lookup(urls) == {
+        'https://example.com/blog/page': False,
+        'https://example.com/blog/page-2': True,
+        'https://example.com/shop/%E2%82%AC': True,
+        'https://example.com/search?q=shoes': False,
+    }
+    # One site:host search, then a site:url search for each URL it didn't list
+    assert search_session.queries == ['site:example.com', 'site:https://example.com/blog/page',
+                                    'site:https://example.com/search?q=shoes']
+
+
+def test_google_lookup_single_url(google):
+    assert google.lookup(['http://example.com/about/']) == {'http://example.com/about/': False}
+    assert google.lookup(['https://example.com/about/']) == {'https://example.com/about/': True}
+
+
+def test_google_lookup_skips_the_host_search_after_a_miss(google, search_session):
+    urls = ['https://example.com/new-1', 'https://example.com/new-2']
+    assert google.lookup(urls) == dict.fromkeys(urls, False)
+    assert google.lookup(['https://example.com/new-3', 'https://example.com/about']) == {
+        'https://example.com/new-3': False, 'https://example.com/about': True}
+    # The second batch doesn't search site:example.com again
+    assert search_session.queries == ['site:example.com'] + [f'site:{url}' for url in urls] + [
+        'site:https://example.com/new-3', 'site:https://example.com/about']
+
+
+def test_static_backend(seo, tmp_path):
+    backend = seo.StaticBackend(['https://example.com/a'])
+    assert backend.lookup(['https://example.com/a', 'https://example.com/b']) == {
+        'https://example.com/a': True, 'https://example.com/b': False}
+
+    path = tmp_path / 'indexed.txt'
+    path.write_text('# indexed\nhttps://example.com/b\n')
+    backend = seo.StaticBackend(str(path), unknown=True)
+    assert backend.lookup(['https://example.com/a', 'https://example.com/b']) == {
+        'https://example.com/a': None, 'https://example.com/b': True}
+
+
+WRITTEN_DIFFERENTLY = {
+    'https://example.com/a/': 'https://example.com/a',
+    'https://EXAMPLE.com/a': 'https://example.com/a',
+    'https://example.com/s?b=2&a=1': 'https://example.com/s?a=1&b=2',
+}
+
+
+@pytest.mark.parametrize('listed, checked', list(WRITTEN_DIFFERENTLY.items()))
+def test_static_backend_compares_normalized_urls(seo, listed, checked):
+    assert seo.StaticBackend([listed]).lookup([checked]) == {checked: True}
+    assert seo.StaticBackend([checked]).lookup([listed]) == {listed: True}
+
+
+@pytest.mark.parametrize('listed, checked', list(WRITTEN_DIFFERENTLY.items()))
+def test_search_console_backend_compares_normalized_urls(seo, tmp_path, listed, checked):
+    path = tmp_path / 'coverage.csv'
+    path.write_text(f'URL,Coverage\n"{listed}",Submitted and indexed\n')
+    assert seo.SearchConsoleBackend(str(path)).lookup([checked]) == {checked: True}
+
+
+def test_search_console_backend_with_status(seo, tmp_path):
+    path = tmp_path / 'coverage.csv'
+    path.write_text('URL,Coverage\n'
+                    'https://example.com/a,Submitted and indexed\n'
+                    'https://example.com/b,Crawled - currently not indexed\n'
+                    'https://example.com/c,URL is on Google\n'
+                    'https://example.com/d,Excluded by noindex tag\n')
+    backend = seo.SearchConsoleBackend(str(path))
+    urls = [f'https://example.com/{page}' for page in 'abcde']
+    assert backend.lookup(urls) == dict(zip(urls, [True, False, True, False, False]))
+
+
+def test_search_console_backend_url_list(seo, tmp_path):
+    path = tmp_path / 'pages.csv'
+    path.write_text('Top pages,Clicks\nhttps://example.com/a,10\n')
+    backend = seo.SearchConsoleBackend(str(path))
+    assert backend.lookup(['https://example.com/a', 'https://example.com/b']) == {
+        'https://example.com/a': True, 'https://example.com/b': False}
+
+
+def test_search_console_backend_needs_urls(seo, tmp_path):
+    path = tmp_path / 'bad.csv'
+    path.write_text('Query,Clicks\nshoes,10\n')
+    with pytest.raises(ValueError):
+        seo.SearchConsoleBackend(str(path))
+
+
+def test_indexation_checker_batches_per_host(seo):
+    backend = seo.StaticBackend(['https://example.com/a', 'https://example.org/a'])
+    checker = seo.IndexationChecker(backend, batch_size=2)
+    urls = ['https://example.com/a', 'https://example.com/b', 'https://example.com/c', 'https://example.org/a']
+    checker.expect(urls)
+    assert [checker.is_indexed(url) for url in urls] == [True, False, False, True]
+    # example.com/a and /b in one lookup, then /c, then example.org/a
+    assert backend.lookups == 3
+
+
+def test_indexation_checker_cache(seo, tmp_path):
+    path = str(tmp_path / 'indexed.sqlite')
+    backend = seo.StaticBackend(['https://example.com/a'])
+    checker = seo.IndexationChecker(backend, seo.IndexationCache(path))
+    assert checker.is_indexed('https://example.com/a') is True
+    assert checker.is_indexed('https://example.com/b') is False
+
+    # Indexed URLs come from the cache, the others are looked up again
+    backend = seo.StaticBackend()
+    checker = seo.IndexationChecker(backend, seo.IndexationCache(path))
+    assert checker.is_indexed('https://example.com/a') is True
+    assert backend.lookups == 0
+    assert checker.is_indexed('https://example.com/b') is False
+    assert backend.lookups == 1
+
+
+class SlowBackend:
+    '''
+    Holds every lookup until release is set, and counts the URLs looked up.
+    '''
+
+    def __init__(self, seo):
+        self.static = seo.StaticBackend(['https://example.com/a'])
+        self.release = threading.Event()
+        self.looked_up = []
+
+    def lookup(self, urls):
+        self.looked_up.extend(urls)
+        self.release.wait(5)
+        return self.static.lookup(urls)
+
+
+@pytest.mark.parametrize('other', ['https://example.com/a', 'https://EXAMPLE.com/a/', 'https://example.com/b'])
+def test_indexation_checker_waits_for_the_lookup_in_flight(seo, other):
+    backend = SlowBackend(seo)
+    checker = seo.IndexationChecker(backend)
+    checker.expect(['https://example.com/a', 'https://example.com/b'])
+
+    answers = {}
+    first = threading.Thread(target=lambda: answers.setdefault('a', checker.is_indexed('https://example.com/a')))
+    first.start()
+    while not backend.looked_up:
+        time.sleep(0.001)
+    second = threading.Thread(target=lambda: answers.setdefault('other', checker.is_indexed(other)))
+    second.start()
+    time.sleep(0.05)
+    backend.release.set()
+    first.join(5)
+    second.join(5)
+
+    # /a and /b went in one lookup, the second check waited for it
+    assert backend.looked_up == ['https://example.com/a', 'https://example.com/b']
+    assert answers == {'a': True, 'other': other != 'https://example.com/b'}
+
+
+def test_indexation_checker_shares_a_failed_lookup(seo):
+    class FailingBackend(seo.IndexationBackend):
+        def lookup(self, urls):
+            raise IOError('blocked')
+
+    checker = seo.IndexationChecker(FailingBackend())
+    checker.expect(['https://example.com/a', 'https://example.com/b'])
+    for url in ['https://example.com/a', 'https://example.com/b']:
+        with pytest.raises(IOError):
+            checker.is_indexed(url)
+    assert checker.futures == {}
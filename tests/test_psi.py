@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the PageSpeed Insights client's batching.
+"""
+
+import json
+import threading
+import time
+from urllib.parse import parse_qs
+
+
+class RecordingPSIClient:
+    '''
+    Wraps a PSIClient so fetch() answers from memory and records its calls.
+    '''
+
+    def __init__(self, seo, **kwargs):
+        self.client = seo.PSIClient(endpoint='http://psi.invalid', **kwargs)
+        self.calls = []
+        self._lock = threading.Lock()
+        self.client.fetch = self.fetch
+        self.error = seo.PSIError
+
+    def fetch(self, url, strategy='mobile'):
+        with self._lock:
+            self.calls.append((url, strategy))
+        if url.endswith('/broken'):
+            raise self.error('Error 400: bad url')
+        return {'url': url, 'strategy': strategy}
+
+
+def test_psi_lookup_fetches_every_strategy(seo):
+    psi = RecordingPSIClient(seo)
+    results = psi.client.lookup('https://example.com/a', ['mobile', 'desktop'])
+    assert results == {'mobile': {'url': 'https://example.com/a', 'strategy': 'mobile'},
+                       'desktop': {'url': 'https://example.com/a', 'strategy': 'desktop'}}
+    assert sorted(psi.calls) == [('https://example.com/a', 'desktop'), ('https://example.com/a', 'mobile')]
+
+
+def test_psi_lookup_prefetches_expected_urls(seo):
+    psi = RecordingPSIClient(seo, max_workers=4)
+    urls = [f'https://example.com/{i}' for i in range(5)]
+    psi.client.expect(urls)
+
+    # 4 calls in flight at most, so 2 URLs per batch with 2 strategies
+    psi.client.lookup(urls[0], ['mobile', 'desktop'])
+    assert sorted({url for url, _ in psi.calls}) == urls[:2]
+
+    psi.client.lookup(urls[1], ['mobile', 'desktop'])
+    assert len(psi.calls) == 4
+
+    for url in urls[2:]:
+        assert psi.client.lookup(url, ['mobile', 'desktop'])['mobile']['url'] == url
+    assert len(psi.calls) == 10
+    assert not psi.client.pending and not psi.client.prefetched
+
+
+def test_psi_lookup_returns_errors(seo):
+    psi = RecordingPSIClient(seo)
+    psi.client.expect(['https://example.com/broken'])
+    results = psi.client.lookup('https://example.com/ok')
+    assert results['mobile']['url'] == 'https://example.com/ok'
+    assert isinstance(psi.client.lookup('https://example.com/broken')['mobile'], seo.PSIError)
+
+
+
+def test_psi_broken_answer_only_fails_its_url(seo, http_server):
+    audits = {audit: {'displayValue': '1', 'numericValue': 1} for audit in seo.PSI_AUDITS}
+    good = json.dumps({'lighthouseResult': {'audits': audits}}).encode()
+    answers = {'https://example.com/a': good, 'https://example.com/b': b'{}',
+               'https://example.com/c': good, 'https://example.com/d': b'not json'}
+    http_server.pages['/psi'] = lambda headers, query: (
+        200, {'Content-Type': 'application/json'}, answers[parse_qs(query)['url'][0]])
+    client = seo.PSIClient(endpoint=http_server.url + '/psi', rate=1000, retries=0)
+    client.expect(answers)
+
+    results = {url: client.lookup(url)['mobile'] for url in answers}
+    assert isinstance(results['https://example.com/a'], dict)
+    assert isinstance(results['https://example.com/c'], dict)
+    assert isinstance(results['https://example.com/b'], seo.PSIError)
+    assert isinstance(results['https://example.com/d'], seo.PSIError)
+
+
+def test_psi_calls_skip_the_site_limits(seo, http_server):
+    # The audited sites get one request at a time and a long crawl delay, the API mustn't
+    audits = {audit: {'displayValue': '1', 'numericValue': 1} for audit in seo.PSI_AUDITS}
+    body = json.dumps({'lighthouseResult': {'audits': audits}}).encode()
+    http_server.pages['/psi'] = lambda headers, query: (200, {'Content-Type': 'application/json'}, body)
+    seo.configure_session(per_host=1, delay=5.0)
+    try:
+        client = seo.PSIClient(endpoint=http_server.url + '/psi', rate=1000)
+        start = time.monotonic()
+        results = client.fetch_many([f'https://example.com/{i}' for i in range(4)])
+        assert time.monotonic() - start < 2
+        assert all(isinstance(metrics, dict) for metrics in results.values())
+    finally:
+        seo.configure_session()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for robots.txt parsing and the per host robots.txt cache.
+"""
+
+import pytest
+
+GOOGLEBOT = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
+
+ROBOTS = """
+# Everyone
+User-agent: *
+Disallow: /private/
+Allow: /private/public/
+Disallow: /*.pdf$
+Disallow: /search?
+Disallow:
+
+User-agent: Googlebot
+User-agent: Googlebot-Image
+Disallow: /no-google/
+Allow: /page    # same length as the Disallow below, Allow wins
+Disallow: /page
+
+User-agent: googlebot
+Disallow: /merged/
+"""
+
+
+@pytest.fixture
+def rules(seo):
+    return seo.RobotsRules(ROBOTS)
+
+
+@pytest.mark.parametrize('url, allowed', [
+    ('https://example.com/', True),
+    ('https://example.com/private/', False),
+    ('https://example.com/private/page', False),
+    ('https://example.com/private/public/page', True),
+    ('https://example.com/files/report.pdf', False),
+    ('https://example.com/files/report.pdf?download=1', True),
+    ('https://example.com/search?q=shoes', False),
+    ('https://example.com/search', True),
+    ('/private/x', False),
+])
+def test_robots_default_group(rules, url, allowed):
+    assert rules.can_fetch('SomeBot/1.0', url) is allowed
+
+
+@pytest.mark.parametrize('url, allowed', [
+    # Googlebot only follows its own group, not the '*' one
+    ('https://example.com/private/', True),
+    ('https://example.com/no-google/a', False),
+    ('https://example.com/page', True),
+    ('https://example.com/merged/a', False),
+])
+def test_robots_most_specific_group(rules, url, allowed):
+    assert rules.can_fetch(GOOGLEBOT, url) is allowed
+
+
+def test_robots_longest_agent_wins(rules):
+    assert not rules.can_fetch('Googlebot-Image/1.0', 'https://example.com/no-google/a.png')
+    assert rules.can_fetch('Googlebot-Image/1.0', 'https://example.com/private/')
+
+
+def test_robots_no_matching_group_allows(seo):
+    rules = seo.RobotsRules('User-agent: Bingbot\nDisallow: /')
+    assert rules.can_fetch(GOOGLEBOT, 'https://example.com/a')
+    assert not rules.can_fetch('Bingbot', 'https://example.com/a')
+
+
+def test_robots_allow_and_disallow_all(seo):
+    assert seo.RobotsRules.allow_all().can_fetch(GOOGLEBOT, 'https://example.com/a')
+    assert not seo.RobotsRules.disallow_all().can_fetch(GOOGLEBOT, 'https://example.com/a')
+    assert seo.RobotsRules('').can_fetch(GOOGLEBOT, '/')
+
+
+def test_robots_wildcards(seo):
+    rules = seo.RobotsRules('User-agent: *\nDisallow: /*/edit$\nDisallow: /tmp*\nAllow: /tmp/keep')
+    assert not rules.can_fetch('bot', '/posts/1/edit')
+    assert rules.can_fetch('bot', '/posts/1/edit/more')
+    assert not rules.can_fetch('bot', '/tmpfile')
+    assert rules.can_fetch('bot', '/tmp/keep/this')
+
+
+@pytest.fixture
+def no_retries(seo):
+    seo.configure_session(retries=0)
+    yield
+    seo.configure_session()
+
+
+@pytest.mark.parametrize('status, body, allowed', [
+    (200, b'User-agent: *\nDisallow: /a', [False, True]),
+    (404, b'', [True, True]),
+    (403, b'', [True, True]),
+    (503, b'', [False, False]),
+])
+def test_robots_cache_status_codes(seo, http_server, no_retries, status, body, allowed):
+    http_server.pages['/robots.txt'] = lambda headers, query: (status, {}, body)
+    cache = seo.RobotsCache()
+    assert [cache.can_fetch(GOOGLEBOT, http_server.url + path) for path in ('/a', '/b')] == allowed
+
+
+def test_robots_cache_fetches_each_host_once(seo, http_server, no_retries):
+    requests = []
+
+    def robots(headers, query):
+        requests.append(headers)
+        return 200, {}, b'User-agent: *\nDisallow: /'
+
+    http_server.pages['/robots.txt'] = robots
+    cache = seo.RobotsCache()
+    for path in ('/a', '/b', '/c'):
+        assert not cache.can_fetch(GOOGLEBOT, http_server.url + path)
+    assert len(requests) == 1
+
+
+def test_robots_cache_unreachable_host_disallows(seo, no_retries):
+    cache = seo.RobotsCache(timeout=1)
+    assert not cache.can_fetch(GOOGLEBOT, 'http://127.0.0.1:9/a')
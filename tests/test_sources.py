@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for reading the URLs to audit from URL lists and sitemaps.
+"""
+
+import gzip
+
+SITEMAP = '''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc>
+    https://example.com/a
+  </loc></url>
+  <url><lastmod>2024-01-01</lastmod></url>
+  <url><loc>https://example.com/b?x=1&amp;y=2</loc></url>
+</urlset>
+'''
+
+INDEX = '''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{first}</loc></sitemap>
+  <sitemap><loc>{second}</loc></sitemap>
+</sitemapindex>
+'''
+
+URLS = ['https://example.com/', 'https://example.com/a', 'https://example.com/b?x=1&y=2']
+
+
+def test_read_url_list(seo, tmp_path):
+    path = tmp_path / 'urls.txt'
+    path.write_text('# pages to audit\nhttps://example.com/\n\n  https://example.com/a  \n#https://example.com/b\n')
+    assert list(seo.read_url_list(str(path))) == ['https://example.com/', 'https://example.com/a']
+
+
+def test_sitemap_file(seo, tmp_path):
+    path = tmp_path / 'sitemap.xml'
+    path.write_text(SITEMAP)
+    assert list(seo.iter_sitemap_urls(str(path))) == URLS
+
+
+def test_sitemap_without_namespace(seo, tmp_path):
+    path = tmp_path / 'sitemap.xml'
+    path.write_text('<urlset><url><loc>https://example.com/</loc></url></urlset>')
+    assert list(seo.iter_sitemap_urls(str(path))) == ['https://example.com/']
+
+
+def test_gzipped_sitemap(seo, tmp_path):
+    path = tmp_path / 'sitemap.xml.gz'
+    path.write_bytes(gzip.compress(SITEMAP.encode()))
+    assert list(seo.iter_sitemap_urls(str(path))) == URLS
+
+
+def test_sitemap_index_is_followed(seo, tmp_path):
+    first, second = tmp_path / 'first.xml', tmp_path / 'second.xml.gz'
+    first.write_text(SITEMAP)
+    second.write_bytes(gzip.compress(SITEMAP.replace('example.com', 'example.org').encode()))
+    index = tmp_path / 'index.xml'
+    index.write_text(INDEX.format(first=first, second=second))
+    assert list(seo.iter_sitemap_urls(str(index))) == URLS + [url.replace('example.com', 'example.org') for url in URLS]
+
+
+def test_sitemap_over_http(seo, http_server):
+    http_server.pages['/sitemap.xml'] = lambda headers, query: (200, {'Content-Type': 'application/xml'}, SITEMAP.encode())
+    http_server.pages['/sitemap.xml.gz'] = lambda headers, query: (200, {}, gzip.compress(SITEMAP.encode()))
+    http_server.pages['/index.xml'] = lambda headers, query: (200, {}, INDEX.format(
+        first=http_server.url + '/sitemap.xml', second=http_server.url + '/sitemap.xml.gz').encode())
+    assert list(seo.iter_sitemap_urls(http_server.url + '/index.xml')) == URLS * 2
+
+
+def test_sitemap_indexes_listing_each_other_are_read_once(seo, http_server):
+    http_server.pages['/sitemap.xml'] = lambda headers, query: (200, {}, SITEMAP.encode())
+    # The first index lists itself (written differently) and the second one,
+    # which lists the first one back
+    http_server.pages['/index.xml'] = lambda headers, query: (200, {}, INDEX.format(
+        first=http_server.url + '/index.xml/',
+        second=http_server.url + '/other-index.xml').encode())
+    http_server.pages['/other-index.xml'] = lambda headers, query: (200, {}, INDEX.format(
+        first=http_server.url + '/index.xml', second=http_server.url + '/sitemap.xml').encode())
+
+    assert list(seo.iter_sitemap_urls(http_server.url + '/index.xml')) == URLS
+    assert sorted(path for _, path in http_server.requests) == ['/index.xml', '/other-index.xml', '/sitemap.xml']
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the timing instrumentation.
+"""
+
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize('values, p, expected', [
+    ([], 50, None),
+    ([7], 99, 7),
+    ([1, 2], 50, 1),
+    ([1, 2, 3, 4], 50, 2),
+    ([1, 2, 3, 4], 75, 3),
+    (list(range(1, 11)), 50, 5),
+    (list(range(1, 11)), 95, 10),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 99, 99),
+    (list(range(1, 101)), 100, 100),
+    ([3, 1, 2], 0, 1),
+])
+def test_percentile_nearest_rank(seo, values, p, expected):
+    assert seo.percentile(values, p) == expected
+
+
+def test_quiet_mode_silences_check_output(seo, capsys):
+    try:
+        seo.set_quiet()
+        seo.say('checking')
+        seo.spinner(text='').stop_and_persist(text='done')
+        assert capsys.readouterr().out == ''
+    finally:
+        seo.set_quiet(False)
+    seo.say('checking')
+    assert capsys.readouterr().out == 'checking\n'
+
+
+def test_quiet_mode_does_not_import_termcolor(seo, monkeypatch, capsys):
+    # Another test may have imported it already
+    monkeypatch.delitem(sys.modules, 'termcolor', raising=False)
+    page = seo.Page('https://example.com/', status_code=200,
+                    content=b'<html><head><link rel="canonical" href="https://example.com/"></head></html>')
+    record = seo.AuditRecord(page.url)
+    try:
+        seo.set_quiet()
+        for check in (seo.robots_meta_tag, seo.check_x_robots_tag_noindex, seo.check_canonical,
+                      seo.check_schema_org):
+            check(page.url, record, page)
+    finally:
+        seo.set_quiet(False)
+
+    assert capsys.readouterr().out == ''
+    assert 'termcolor' not in sys.modules
+    assert '✅' in record['Canonical']
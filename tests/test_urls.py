@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for URL normalization.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://example.com', 'https://example.com/'),
+    ('HTTPS://Example.COM/Path', 'https://example.com/Path'),
+    ('https://example.com:443/a/', 'https://example.com/a'),
+    ('http://example.com:80/a', 'http://example.com/a'),
+    ('https://example.com:8443/a', 'https://example.com:8443/a'),
+    ('https://example.com./a', 'https://example.com/a'),
+    ('https://example.com/a#section', 'https://example.com/a'),
+    ('https://example.com/%e2%82%ac', 'https://example.com/%E2%82%AC'),
+    ('https://example.com/a?b=2&a=1&', 'https://example.com/a?a=1&b=2'),
+    ('  https://example.com/a  ', 'https://example.com/a'),
+    ('//example.com/a', 'https://example.com/a'),
+    ('https://[::1]:8080/a', 'https://[::1]:8080/a'),
+])
+def test_normalize_url(seo, url, expected):
+    assert seo.normalize_url(url) == expected
+
+
+@pytest.mark.parametrize('url, base, expected', [
+    ('/b', 'https://example.com/a/page', 'https://example.com/b'),
+    ('c/', 'https://example.com/a/page', 'https://example.com/a/c'),
+    ('../d?x=1#top', 'https://example.com/a/b/page', 'https://example.com/a/d?x=1'),
+    ('https://other.com/', 'https://example.com/a', 'https://other.com/'),
+])
+def test_normalize_url_relative(seo, url, base, expected):
+    assert seo.normalize_url(url, base) == expected
+
+
+def test_normalize_url_is_idempotent(seo):
+    url = seo.normalize_url('HTTP://Example.com:80/a/%7e/?z=1&y=2#f')
+    assert seo.normalize_url(url) == url
+
+
+def test_url_key_ignores_the_scheme(seo):
+    assert seo.url_key('http://example.com/a/') == seo.url_key('https://EXAMPLE.com/a') == 'example.com/a'
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the SQLite work queue the worker processes share.
+"""
+
+import threading
+import time
+
+import pytest
+
+URLS = [f'https://site{host}.example/{page}' for host in range(5) for page in range(40)]
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / 'queue.sqlite')
+
+
+def test_claimers_never_share_a_url(seo, queue_path):
+    seo.WorkQueue(queue_path, per_host=100).put(URLS)
+    claimed = []
+    lock = threading.Lock()
+
+    def claimer(worker):
+        # Every worker has a connection of its own, like separate processes
+        queue = seo.WorkQueue(queue_path, per_host=100)
+        while True:
+            batch = queue.claim(worker, size=3)
+            if batch is None:
+                break
+            host, urls = batch
+            assert all(url.startswith(f'https://{host}/') for url in urls)
+            with lock:
+                claimed.extend(urls)
+            for url in urls:
+                queue.done(url)
+            queue.release(host, worker)
+        queue.close()
+
+    threads = [threading.Thread(target=claimer, args=(f'worker-{i}',)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(URLS)
+
+
+def test_per_host_caps_the_leases(seo, queue_path):
+    queue = seo.WorkQueue(queue_path, per_host=2)
+    queue.put(URLS[:40])
+    assert queue.claim('a', size=5)[0] == 'site0.example'
+    assert queue.claim('b', size=5)[0] == 'site0.example'
+    # Two leases on the only host, a third worker has to wait
+    assert queue.claim('c', size=5) is None
+    leases = queue.connection.execute('SELECT COUNT(*) FROM leases').fetchone()[0]
+    assert leases == 2
+
+    queue.release('site0.example', 'a')
+    assert queue.claim('c', size=5)[0] == 'site0.example'
+
+
+def test_expired_lease_is_reclaimed(seo, queue_path):
+    queue = seo.WorkQueue(queue_path, per_host=1, lease_timeout=0.2)
+    queue.put(URLS[:3])
+    host, urls = queue.claim('dead', size=10)
+    assert queue.claim('alive', size=10) is None
+
+    # The dead worker never renews, its lease expires and its URLs go back
+    time.sleep(0.3)
+    batch = queue.claim('alive', size=10)
+    assert batch == (host, urls)
+    attempts = queue.connection.execute('SELECT attempts FROM queue WHERE url = ?', (urls[0],)).fetchone()[0]
+    assert attempts == 1
+
+
+def test_renewed_lease_is_kept(seo, queue_path):
+    queue = seo.WorkQueue(queue_path, per_host=1, lease_timeout=0.3)
+    queue.put(URLS[:3])
+    host, _ = queue.claim('slow', size=10)
+    for _ in range(3):
+        time.sleep(0.15)
+        queue.renew(host, 'slow')
+        assert queue.claim('other', size=10) is None
+
+
+def test_release_returns_unfinished_urls(seo, queue_path):
+    queue = seo.WorkQueue(queue_path)
+    queue.put(URLS[:3])
+    host, urls = queue.claim('a', size=10)
+    queue.done(urls[0])
+    queue.release(host, 'a')
+    assert queue.counts() == {'pending': 2, 'leased': 0, 'done': 1}
+
+
+def test_wait_turn_spaces_requests_across_connections(seo, queue_path):
+    delay = 0.1
+    starts = []
+    lock = threading.Lock()
+
+    def requester():
+        queue = seo.WorkQueue(queue_path, delay=delay)
+        for _ in range(3):
+            queue.wait_turn('site0.example')
+            with lock:
+                starts.append(time.time())
+        queue.close()
+
+    threads = [threading.Thread(target=requester) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert min(gaps) >= delay * 0.9
+    # Other hosts don't wait
+    start = time.time()
+    seo.WorkQueue(queue_path, delay=delay).wait_turn('site1.example')
+    assert time.time() - start < delay
+
+
+def test_rerun_resumes_instead_of_duplicating(seo, queue_path, tmp_path, monkeypatch):
+    runs = []
+
+    def run_checks(url, record, checks=None):
+        runs.append(url)
+        record.set('Canonical', 'ok ✅')
+        record.checks['check_canonical'] = ['Canonical']
+        return record
+
+    monkeypatch.setattr(seo, 'run_checks', run_checks)
+    checkpoint = seo.CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    urls = URLS[:6]
+
+    queue = seo.WorkQueue(queue_path)
+    assert queue.put(urls) == 6
+    assert seo.run_worker(queue, checkpoint, checks=['check_canonical'], poll=0.01) == 6
+    assert sorted(runs) == sorted(urls)
+
+    # The same command again: nothing is queued twice and nothing runs again
+    queue = seo.WorkQueue(queue_path)
+    assert queue.put(urls) == 0
+    assert seo.run_worker(queue, checkpoint, checks=['check_canonical'], poll=0.01) == 0
+    assert len(runs) == 6
+
+    # Even URLs queued again only run the checks that haven't succeeded
+    assert queue.put(urls, reset=True) == 6
+    seo.run_worker(queue, checkpoint, checks=['check_canonical'], poll=0.01)
+    assert len(runs) == 6
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 6}
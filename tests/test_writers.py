@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the report writers and the Excel conversion.
+"""
+
+import csv
+import json
+import os
+
+import pytest
+
+COLUMNS = ['URL', 'Canonical', 'Schema.org']
+
+
+def record(seo, i, canonical='✅'):
+    record = seo.AuditRecord(f'https://example.com/{i}')
+    record.set('Canonical', f'{canonical} {i}')
+    record.set('Schema.org', f'Product {i}')
+    return record
+
+
+def write(seo, path, numbers, append=False, **options):
+    writer = seo.open_writer(path, append=append, columns=COLUMNS)
+    for key, value in options.items():
+        setattr(writer, key, value)
+    with writer:
+        for i in numbers:
+            writer.write(record(seo, i))
+    return writer
+
+
+def test_csv_append_writes_the_header_once(seo, tmp_path):
+    path = str(tmp_path / 'report.csv')
+    write(seo, path, [0, 1])
+    write(seo, path, [2], append=True)
+
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == COLUMNS
+    assert [row[0] for row in rows[1:]] == [f'https://example.com/{i}' for i in range(3)]
+    assert rows[3] == ['https://example.com/2', '✅ 2', 'Product 2']
+
+
+def test_csv_append_to_an_empty_file_writes_the_header(seo, tmp_path):
+    path = tmp_path / 'report.csv'
+    path.write_text('')
+    write(seo, str(path), [0], append=True)
+    assert path.read_text(encoding='utf-8').splitlines()[0] == ','.join(COLUMNS)
+
+
+def test_jsonl_append(seo, tmp_path):
+    path = str(tmp_path / 'report.jsonl')
+    write(seo, path, [0])
+    write(seo, path, [1], append=True)
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line)['URL'] for line in f] == ['https://example.com/0', 'https://example.com/1']
+
+
+def test_parquet_append_continues_the_part_numbering(seo, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'report.parquet')
+    write(seo, path, range(3), row_group_size=2)
+    assert sorted(os.listdir(path)) == ['part-00000.parquet', 'part-00001.parquet']
+
+    # A part removed in between doesn't make the next run overwrite the last one
+    os.remove(os.path.join(path, 'part-00000.parquet'))
+    write(seo, path, [3], append=True)
+    assert sorted(os.listdir(path)) == ['part-00001.parquet', 'part-00002.parquet']
+    assert list(seo.read_report(path)['URL']) == ['https://example.com/2', 'https://example.com/3']
+
+    # Without --append the dataset starts over
+    write(seo, path, [4])
+    assert os.listdir(path) == ['part-00000.parquet']
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.jsonl', '.parquet'])
+def test_convert_report_round_trips_the_rows(seo, tmp_path, extension):
+    pytest.importorskip('openpyxl')
+    if extension == '.parquet':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'report{extension}')
+    write(seo, path, range(3))
+    # A URL checked again by a resumed run keeps its latest row only
+    with seo.open_writer(path, append=True, columns=COLUMNS) as writer:
+        writer.write(record(seo, 1, canonical='❌'))
+
+    excel_path = str(tmp_path / 'report.xlsx')
+    seo.convert_report(path, excel_path)
+    rows = seo.pd.read_excel(excel_path).to_dict('records')
+    assert rows == [
+        {'URL': 'https://example.com/0', 'Canonical': '✅ 0', 'Schema.org': 'Product 0'},
+        {'URL': 'https://example.com/2', 'Canonical': '✅ 2', 'Schema.org': 'Product 2'},
+        {'URL': 'https://example.com/1', 'Canonical': '❌ 1', 'Schema.org': 'Product 1'},
+    ]
+
+
+def test_excel_option_converts_the_finished_report(seo, tmp_path, monkeypatch):
+    pytest.importorskip('openpyxl')
+
+    def run_checks(url, record=None, fetcher=None, checks=None):
+        record.set('Canonical', f'{url} ✅')
+        record.checks['check_canonical'] = ['Canonical']
+        return record
+
+    monkeypatch.setattr(seo, 'run_checks', run_checks)
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('https://example.com/a\nhttps://example.com/b\n')
+    output, excel_path = str(tmp_path / 'report.csv'), str(tmp_path / 'report.xlsx')
+    try:
+        seo.main(['--urls', str(urls), '--output', output, '--excel', excel_path,
+                  '--include', 'check_canonical', '--quiet', '--no-robots'])
+    finally:
+        seo.set_quiet(False)
+
+    excel = seo.pd.read_excel(excel_path)
+    assert list(excel['URL']) == ['https://example.com/a', 'https://example.com/b']
+    assert list(excel['Canonical']) == ['https://example.com/a ✅', 'https://example.com/b ✅']
+    assert excel.shape == seo.read_report(output).shape